@@ -0,0 +1,68 @@
+"""Create analytics_events table, range-partitioned by month.
+
+Revision ID: 005_create_analytics_events
+Revises: 004_create_auth_codes_table
+Create Date: 2026-10-19 12:00:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers
+revision = '005_create_analytics_events'
+down_revision = '004_create_auth_codes_table'
+branch_labels = None
+depends_on = None
+
+
+# Monthly partitions created up front, starting with the current month
+PARTITION_MONTHS = 12
+
+
+def upgrade() -> None:
+    """Create partitioned analytics_events with monthly and default partitions."""
+
+    # Partition key has to be part of the primary key
+    op.execute("""
+        CREATE TABLE analytics_events (
+            id BIGINT GENERATED BY DEFAULT AS IDENTITY,
+            event VARCHAR(100) NOT NULL,
+            user_id BIGINT,
+            handler VARCHAR(100),
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+
+    # Rows outside the pre-created months land here instead of failing
+    op.execute(
+        "CREATE TABLE analytics_events_default "
+        "PARTITION OF analytics_events DEFAULT"
+    )
+
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month_start DATE;
+        BEGIN
+            FOR i IN 0..{PARTITION_MONTHS - 1} LOOP
+                month_start := date_trunc('month', now())::date + make_interval(months => i);
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF analytics_events '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    'analytics_events_' || to_char(month_start, 'YYYY_MM'),
+                    month_start,
+                    (month_start + interval '1 month')::date
+                );
+            END LOOP;
+        END $$
+    """)
+
+    # Indexes on the parent are created on every partition
+    op.create_index('idx_analytics_created', 'analytics_events', ['created_at'])
+    op.create_index('idx_analytics_event_created', 'analytics_events', ['event', 'created_at'])
+
+
+def downgrade() -> None:
+    """Drop analytics_events and all of its partitions."""
+    op.execute('DROP TABLE IF EXISTS analytics_events CASCADE')
@@ -0,0 +1,54 @@
+"""Composite (user_id, created_at DESC) index for transaction history.
+
+Revision ID: 006_transaction_user_created
+Revises: 005_create_analytics_events
+Create Date: 2026-10-19 14:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = '006_transaction_user_created'
+down_revision = '005_create_analytics_events'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Replace the user_id index with (user_id, created_at DESC)."""
+    # CONCURRENTLY can't run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_transaction_user_created',
+            'transactions',
+            ['user_id', sa.text('created_at DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Covered by the composite index's leading column
+        op.drop_index(
+            'idx_transaction_user',
+            table_name='transactions',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Restore the single-column user_id index."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_transaction_user',
+            'transactions',
+            ['user_id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'idx_transaction_user_created',
+            table_name='transactions',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,53 @@
+"""Add id to the transaction history index for keyset pagination.
+
+Revision ID: 007_transaction_history_keyset
+Revises: 006_transaction_user_created
+Create Date: 2026-10-19 16:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = '007_transaction_history_keyset'
+down_revision = '006_transaction_user_created'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Replace (user_id, created_at DESC) with (user_id, created_at DESC, id DESC)."""
+    # CONCURRENTLY can't run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_transaction_user_created_id',
+            'transactions',
+            ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'idx_transaction_user_created',
+            table_name='transactions',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Restore the (user_id, created_at DESC) index."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_transaction_user_created',
+            'transactions',
+            ['user_id', sa.text('created_at DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'idx_transaction_user_created_id',
+            table_name='transactions',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
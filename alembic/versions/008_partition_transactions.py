@@ -0,0 +1,156 @@
+"""Range-partition transactions by month on created_at.
+
+Revision ID: 008_partition_transactions
+Revises: 007_transaction_history_keyset
+Create Date: 2026-10-19 18:00:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers
+revision = '008_partition_transactions'
+down_revision = '007_transaction_history_keyset'
+branch_labels = None
+depends_on = None
+
+
+# Future months created up front; PartitionMaintenanceJob keeps extending them
+PARTITION_MONTHS_AHEAD = 3
+
+COLUMNS = """
+    user_id BIGINT NOT NULL REFERENCES users(id),
+    type VARCHAR(50) NOT NULL,
+    amount NUMERIC(10, 2) NOT NULL,
+    balance_after NUMERIC(10, 2) NOT NULL,
+    description VARCHAR(500) NOT NULL,
+    extra_metadata JSONB,
+    payment_id VARCHAR(255),
+    payment_status VARCHAR(50),
+    website_transaction_id INTEGER,
+    is_synced BOOLEAN,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()
+"""
+
+COPY_COLUMNS = (
+    "id, user_id, type, amount, balance_after, description, extra_metadata, "
+    "payment_id, payment_status, website_transaction_id, is_synced, created_at"
+)
+
+
+def _rename_table(old: str, new: str) -> None:
+    # Free the names the new table's primary key, sequence and indexes take
+    op.execute(f"ALTER TABLE {old} RENAME TO {new}")
+    op.execute(f"ALTER INDEX IF EXISTS {old}_pkey RENAME TO {new}_pkey")
+    op.execute(f"ALTER SEQUENCE IF EXISTS {old}_id_seq RENAME TO {new}_id_seq")
+    for index in ("idx_transaction_user_created_id", "idx_transaction_created", "idx_transaction_type"):
+        op.execute(f"ALTER INDEX IF EXISTS {index} RENAME TO {index}_{new}")
+
+
+def _create_indexes() -> None:
+    # Only two indexes per insert: history pages by user, and a BRIN on
+    # created_at for time ranges (rows arrive in created_at order, so it
+    # stays a few pages per partition). The type index is gone: every type
+    # query also filters by user_id.
+    op.execute(
+        "CREATE INDEX idx_transaction_user_created_id "
+        "ON transactions (user_id, created_at DESC, id DESC)"
+    )
+    op.execute(
+        "CREATE INDEX idx_transaction_created ON transactions USING brin (created_at)"
+    )
+
+
+def upgrade() -> None:
+    """Move transactions into a partitioned table with monthly partitions."""
+
+    # A foreign key can't reference a partitioned table by id alone
+    op.execute(
+        "ALTER TABLE tickets DROP CONSTRAINT IF EXISTS tickets_transaction_id_fkey"
+    )
+    _rename_table("transactions", "transactions_unpartitioned")
+
+    # Partition key has to be part of the primary key
+    op.execute(f"""
+        CREATE TABLE transactions (
+            id INTEGER GENERATED BY DEFAULT AS IDENTITY,
+            {COLUMNS},
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("CREATE TABLE transactions_default PARTITION OF transactions DEFAULT")
+
+    # One partition per month from the oldest row up to the months ahead
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month_start DATE;
+        BEGIN
+            month_start := date_trunc(
+                'month', coalesce((SELECT min(created_at) FROM transactions_unpartitioned), now())
+            )::date;
+            WHILE month_start <= date_trunc('month', now())::date
+                    + make_interval(months => {PARTITION_MONTHS_AHEAD}) LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF transactions '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    'transactions_' || to_char(month_start, 'YYYY_MM'),
+                    month_start,
+                    (month_start + interval '1 month')::date
+                );
+                month_start := (month_start + interval '1 month')::date;
+            END LOOP;
+        END $$
+    """)
+
+    op.execute(f"""
+        INSERT INTO transactions ({COPY_COLUMNS})
+        SELECT {COPY_COLUMNS.replace('created_at', 'coalesce(created_at, now())')}
+        FROM transactions_unpartitioned
+    """)
+    op.execute("""
+        SELECT setval(
+            pg_get_serial_sequence('transactions', 'id'),
+            (SELECT coalesce(max(id), 0) + 1 FROM transactions),
+            false
+        )
+    """)
+    op.execute("DROP TABLE transactions_unpartitioned")
+
+    # Indexes on the parent are created on every partition
+    _create_indexes()
+
+
+def downgrade() -> None:
+    """Copy transactions back into a plain table."""
+    _rename_table("transactions", "transactions_partitioned")
+
+    op.execute(f"""
+        CREATE TABLE transactions (
+            id SERIAL PRIMARY KEY,
+            {COLUMNS}
+        )
+    """)
+    op.execute(f"""
+        INSERT INTO transactions ({COPY_COLUMNS})
+        SELECT {COPY_COLUMNS} FROM transactions_partitioned
+    """)
+    op.execute("""
+        SELECT setval(
+            pg_get_serial_sequence('transactions', 'id'),
+            (SELECT coalesce(max(id), 0) + 1 FROM transactions),
+            false
+        )
+    """)
+    op.execute("DROP TABLE transactions_partitioned CASCADE")
+
+    op.execute(
+        "CREATE INDEX idx_transaction_user_created_id "
+        "ON transactions (user_id, created_at DESC, id DESC)"
+    )
+    op.execute("CREATE INDEX idx_transaction_type ON transactions (type)")
+    op.execute("CREATE INDEX idx_transaction_created ON transactions (created_at)")
+    op.execute(
+        "ALTER TABLE tickets ADD CONSTRAINT tickets_transaction_id_fkey "
+        "FOREIGN KEY (transaction_id) REFERENCES transactions(id)"
+    )
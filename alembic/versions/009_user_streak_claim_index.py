@@ -0,0 +1,41 @@
+"""Partial index for streak expiry and reminder scans.
+
+Revision ID: 009_user_streak_claim
+Revises: 008_partition_transactions
+Create Date: 2026-10-19 20:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = '009_user_streak_claim'
+down_revision = '008_partition_transactions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Index (last_daily_claim, id) of users with an active streak."""
+    # CONCURRENTLY can't run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_user_streak_claim',
+            'users',
+            ['last_daily_claim', 'id'],
+            postgresql_where=sa.text('daily_streak > 0'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Drop the streak index."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'idx_user_streak_claim',
+            table_name='users',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
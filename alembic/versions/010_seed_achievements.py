@@ -0,0 +1,79 @@
+"""Seed the achievements previously hardcoded in the achievements screen.
+
+Revision ID: 010_seed_achievements
+Revises: 009_user_streak_claim
+Create Date: 2026-10-19 21:00:00.000000
+"""
+
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = '010_seed_achievements'
+down_revision = '009_user_streak_claim'
+branch_labels = None
+depends_on = None
+
+
+# code, title, description, requirement_type, requirement_value, up_coins_reward
+ACHIEVEMENTS = [
+    ("first_event", "Первая вечеринка", "Посетить первое событие клуба", "events_attended", 1, 50),
+    ("regular", "Завсегдатай (5+ событий)", "Посетить 5 событий", "events_attended", 5, 100),
+    ("club_legend", "Легенда клуба (10+ событий)", "Посетить 10 событий", "events_attended", 10, 250),
+    ("ambassador", "Амбассадор (3+ приглашения)", "Пригласить 3 друзей", "referrals", 3, 100),
+    ("referral_king", "Король рефералов (8+ приглашений)", "Пригласить 8 друзей", "referrals", 8, 250),
+    ("week_streak", "Неделя подряд", "Забирать ежедневный бонус 7 дней подряд", "daily_streak", 7, 50),
+    ("month_streak", "Месяц преданности", "Забирать ежедневный бонус 30 дней подряд", "daily_streak", 30, 200),
+    ("rich", "Богач (1000+ UP Coins)", "Накопить 1000 UP Coins", "up_coins", 1000, 0),
+]
+
+
+def upgrade() -> None:
+    """Insert the achievements unless codes already exist."""
+    achievements = sa.table(
+        'achievements',
+        sa.column('code', sa.String),
+        sa.column('title', sa.String),
+        sa.column('description', sa.Text),
+        sa.column('requirement_type', sa.String),
+        sa.column('requirement_value', sa.Integer),
+        sa.column('up_coins_reward', sa.Integer),
+        sa.column('is_active', sa.Boolean),
+        sa.column('order', sa.Integer),
+        sa.column('created_at', sa.DateTime),
+    )
+    now = datetime.utcnow()
+    existing = {
+        row.code for row in op.get_bind().execute(sa.select(achievements.c.code))
+    }
+    op.bulk_insert(achievements, [
+        {
+            'code': code,
+            'title': title,
+            'description': description,
+            'requirement_type': requirement_type,
+            'requirement_value': requirement_value,
+            'up_coins_reward': reward,
+            'is_active': True,
+            'order': order,
+            'created_at': now,
+        }
+        for order, (code, title, description, requirement_type, requirement_value, reward)
+        in enumerate(ACHIEVEMENTS)
+        if code not in existing
+    ])
+
+
+def downgrade() -> None:
+    """Remove the seeded achievements and their awards."""
+    codes = [achievement[0] for achievement in ACHIEVEMENTS]
+    op.execute(
+        sa.text('DELETE FROM user_achievements WHERE achievement_id IN '
+                '(SELECT id FROM achievements WHERE code = ANY(:codes))').bindparams(codes=codes)
+    )
+    op.execute(
+        sa.text('DELETE FROM achievements WHERE code = ANY(:codes)').bindparams(codes=codes)
+    )
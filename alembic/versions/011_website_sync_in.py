@@ -0,0 +1,59 @@
+"""Website change times on events/tickets and the upcoming-events index.
+
+Revision ID: 011_website_sync_in
+Revises: 010_seed_achievements
+Create Date: 2026-10-19 22:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = '011_website_sync_in'
+down_revision = '010_seed_achievements'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add website_updated_at and replace idx_event_status with (status, event_date)."""
+    op.add_column('events', sa.Column('website_updated_at', sa.DateTime(), nullable=True))
+    op.add_column('tickets', sa.Column('website_updated_at', sa.DateTime(), nullable=True))
+
+    # CONCURRENTLY can't run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_event_status_date',
+            'events',
+            ['status', 'event_date'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'idx_event_status',
+            table_name='events',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Restore idx_event_status and drop website_updated_at."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_event_status',
+            'events',
+            ['status'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'idx_event_status_date',
+            table_name='events',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+    op.drop_column('tickets', 'website_updated_at')
+    op.drop_column('events', 'website_updated_at')
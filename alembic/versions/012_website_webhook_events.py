@@ -0,0 +1,34 @@
+"""Dedupe table for inbound website webhook events.
+
+Revision ID: 012_website_webhook_events
+Revises: 011_website_sync_in
+Create Date: 2026-10-19 23:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = '012_website_webhook_events'
+down_revision = '011_website_sync_in'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create website_webhook_events."""
+    op.create_table(
+        'website_webhook_events',
+        sa.Column('event_id', sa.String(length=100), nullable=False),
+        sa.Column('type', sa.String(length=50), nullable=False),
+        sa.Column('received_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('event_id'),
+    )
+    op.create_index('idx_website_webhook_received', 'website_webhook_events', ['received_at'])
+
+
+def downgrade() -> None:
+    """Drop website_webhook_events."""
+    op.drop_index('idx_website_webhook_received', table_name='website_webhook_events')
+    op.drop_table('website_webhook_events')
@@ -0,0 +1,52 @@
+"""Indexes for the incremental export watermarks.
+
+Revision ID: 013_export_watermark_indexes
+Revises: 012_website_webhook_events
+Create Date: 2026-10-20 10:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = '013_export_watermark_indexes'
+down_revision = '012_website_webhook_events'
+branch_labels = None
+depends_on = None
+
+
+# (index, table, columns): the export reads each table in this order
+INDEXES = (
+    ('idx_user_updated_id', 'users', ['updated_at', 'id']),
+    ('idx_ticket_created_id', 'tickets', ['created_at', 'id']),
+)
+
+
+def upgrade() -> None:
+    """Backfill users.updated_at, keep it NOT NULL and index the watermarks."""
+    op.execute("UPDATE users SET updated_at = COALESCE(created_at, now()) WHERE updated_at IS NULL")
+    op.alter_column('users', 'updated_at', existing_type=sa.DateTime(), nullable=False)
+
+    # CONCURRENTLY can't run inside the migration transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Drop the watermark indexes."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
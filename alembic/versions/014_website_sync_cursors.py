@@ -0,0 +1,33 @@
+"""Poll positions of the website change sync.
+
+Revision ID: 014_website_sync_cursors
+Revises: 013_export_watermark_indexes
+Create Date: 2026-10-20 11:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = '014_website_sync_cursors'
+down_revision = '013_export_watermark_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create website_sync_cursors; the first poll after it re-reads everything."""
+    op.create_table(
+        'website_sync_cursors',
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('updated_since', sa.DateTime(), nullable=False),
+        sa.Column('after_id', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('kind'),
+    )
+
+
+def downgrade() -> None:
+    """Drop website_sync_cursors."""
+    op.drop_table('website_sync_cursors')
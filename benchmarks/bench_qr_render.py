@@ -0,0 +1,100 @@
+"""
+Benchmark: event-loop latency while QR codes render in parallel.
+
+A probe task sleeps 1 ms in a loop and records how late it wakes up; that
+lag is what every other user's update waits while the loop is busy. The
+same burst of concurrent QR requests (ERROR_CORRECT_H, box_size=10, unique
+payloads so nothing is cached) is rendered three ways:
+
+- inline: render_qr_png called directly in the coroutine (old behavior)
+- thread: QRRenderService(workers=0), default thread pool
+- process: QRRenderService(workers=N), process pool
+
+Usage:
+    python benchmarks/bench_qr_render.py [requests] [workers]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Settings are required at import time; benchmark never touches these services
+os.environ.setdefault("BOT_TOKEN", "0:benchmark")
+os.environ.setdefault("BOT_USERNAME", "benchmark_bot")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from bot.services.qr_render import QRRenderService, QRStyle, render_qr_png
+
+
+STYLE = QRStyle()
+PROBE_INTERVAL = 0.001
+
+
+def payloads(requests: int, run: str) -> list[str]:
+    return [
+        f"https://under-people-club.vercel.app/auth/callback?code={run}-{i:06d}"
+        for i in range(requests)
+    ]
+
+
+async def probe(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - start - PROBE_INTERVAL)
+
+
+async def measure(render, requests: int, run: str) -> tuple[float, list[float]]:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop))
+    await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(render(data) for data in payloads(requests, run)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe_task
+    return elapsed, lags
+
+
+def report(name: str, elapsed: float, lags: list[float]) -> None:
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    p99 = lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))]
+    print(
+        f"{name:<8} total {elapsed * 1000:8.1f} ms | loop lag "
+        f"p50 {statistics.median(lags_ms):7.2f} ms  p99 {p99:7.2f} ms  "
+        f"max {lags_ms[-1]:7.2f} ms"
+    )
+
+
+async def main(requests: int, workers: int) -> None:
+    async def inline(data: str) -> bytes:
+        return render_qr_png(data, STYLE)
+
+    threads = QRRenderService(workers=0)
+    processes = QRRenderService(workers=workers)
+    # Start the pool (spawn + worker warm-up) outside the measurement
+    await processes.render("warmup", STYLE)
+
+    print(f"requests: {requests}, process workers: {workers}")
+    try:
+        report("inline", *await measure(inline, requests, "inline"))
+        report("thread", *await measure(lambda d: threads.render(d, STYLE), requests, "thread"))
+        report("process", *await measure(lambda d: processes.render(d, STYLE), requests, "process"))
+    finally:
+        processes.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 64,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 2,
+    ))
@@ -0,0 +1,83 @@
+"""
+Benchmark: economy report over synthetic ledger arrays.
+
+Generates users and transactions shaped like the export (random signup
+times over 12 weeks, a third referred, transactions spread over the same
+period with ~15% spends) and times build_report on them.
+
+Usage:
+    python benchmarks/bench_reports.py [transactions] [users]
+"""
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Settings are required at import time; benchmark never touches these services
+os.environ.setdefault("BOT_TOKEN", "0:benchmark")
+os.environ.setdefault("BOT_USERNAME", "benchmark_bot")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import numpy as np
+
+from bot.services.reports import build_report
+
+
+NOW = datetime(2024, 6, 1)
+PERIOD_US = 12 * 7 * 24 * 3600 * 10**6
+
+
+def synthetic(transactions: int, users: int, seed: int = 1) -> tuple[dict, dict]:
+    rng = np.random.default_rng(seed)
+    now = np.datetime64(NOW, "us")
+    signup = now - rng.integers(0, PERIOD_US, users).astype("timedelta64[us]")
+    user_data = {
+        "id": np.arange(1, users + 1, dtype=np.int64),
+        "membership_level": rng.choice(["guest", "member", "vip"], users, p=[0.7, 0.25, 0.05]),
+        "is_member": rng.random(users) < 0.3,
+        "up_coins": rng.gamma(2.0, 50.0, users),
+        "referred_by_id": np.where(rng.random(users) < 0.33, rng.integers(1, users, users), 0),
+        "daily_streak": rng.geometric(0.3, users) - 1,
+        "created_at": signup,
+        "updated_at": signup,
+    }
+
+    tx_user = rng.integers(1, users + 1, transactions)
+    # Transactions happen after the user's signup
+    tx_time = signup[tx_user - 1] + (
+        rng.random(transactions) * (now - signup[tx_user - 1]).astype(np.int64)
+    ).astype("timedelta64[us]")
+    spend = rng.random(transactions) < 0.15
+    tx_data = {
+        "id": np.arange(1, transactions + 1, dtype=np.int64),
+        "user_id": tx_user,
+        "type": np.where(spend, "ticket_purchase", "daily_bonus"),
+        "amount": np.where(spend, -rng.integers(10, 500, transactions), rng.integers(10, 45, transactions)).astype(float),
+        "created_at": tx_time,
+    }
+    return user_data, tx_data
+
+
+def main() -> None:
+    transactions = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+
+    start = time.perf_counter()
+    user_data, tx_data = synthetic(transactions, users)
+    print(f"generated {transactions:,} transactions / {users:,} users in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    report = build_report(user_data, tx_data, now=NOW, weeks=12)
+    elapsed = time.perf_counter() - start
+
+    print(f"build_report: {elapsed:.2f}s ({transactions / elapsed:,.0f} transactions/s)")
+    print(f"velocity_30d={report.velocity_30d:.3f} funnel={report.funnel}")
+
+
+if __name__ == "__main__":
+    main()
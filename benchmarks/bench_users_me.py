@@ -0,0 +1,101 @@
+"""
+Microbenchmark: /api/users/me serialization path, before vs after orjson.
+
+Both apps serve the same UserProfileResponse through the full ASGI stack
+(routing, response model handling, rendering) with the database lookup
+replaced by a prebuilt profile, so the numbers isolate framework and
+serialization cost:
+
+- before: default JSONResponse, handler returns the model and FastAPI
+  re-validates it, runs jsonable_encoder and json.dumps
+- after: ORJSONResponse default class, handler returns ModelResponse that
+  renders with the model's prebuilt pydantic-core serializer
+
+Usage:
+    python benchmarks/bench_users_me.py [requests]
+"""
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Settings are required at import time; benchmark never touches these services
+os.environ.setdefault("BOT_TOKEN", "0:benchmark")
+os.environ.setdefault("BOT_USERNAME", "benchmark_bot")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+
+from bot.api_server import ModelResponse, UserProfileResponse
+
+
+PROFILE = dict(
+    id=928761243,
+    username="under_people",
+    first_name="Андрей",
+    membership_level="member",
+    up_coins=1234.5,
+    daily_streak=12,
+    total_events_attended=7,
+    referral_count=5,
+    referral_earnings=350.0,
+    referral_code="UP-A7K9M2",
+    photo_url="https://api.dicebear.com/9.x/avataaars/svg?seed=UP-A7K9M2",
+)
+
+
+def build_before_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/users/me", response_model=UserProfileResponse)
+    async def get_user_profile():
+        return UserProfileResponse(**PROFILE)
+
+    return app
+
+
+def build_after_app() -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+
+    @app.get("/api/users/me", response_model=UserProfileResponse)
+    async def get_user_profile():
+        return ModelResponse(UserProfileResponse(**PROFILE))
+
+    return app
+
+
+async def measure(app: FastAPI, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up routing and serializer caches
+        for _ in range(200):
+            await client.get("/api/users/me")
+
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = await client.get("/api/users/me")
+            assert response.status_code == 200
+        elapsed = time.perf_counter() - start
+
+    return requests / elapsed
+
+
+async def main(requests: int) -> None:
+    before = await measure(build_before_app(), requests)
+    after = await measure(build_after_app(), requests)
+
+    print(f"requests: {requests}")
+    print(f"before (JSONResponse + response_model): {before:,.0f} req/s")
+    print(f"after  (ORJSONResponse + ModelResponse): {after:,.0f} req/s")
+    print(f"speedup: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
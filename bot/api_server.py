@@ -8,16 +8,29 @@ from typing import Optional
 from datetime import datetime, timedelta
 from uuid import uuid4
 
-from fastapi import FastAPI, HTTPException, Body, Depends, Header
+from fastapi import FastAPI, HTTPException, Body, Depends, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from pydantic import BaseModel, Field
+from telegram import Update
 import jwt
 
 from bot.config import settings
 from bot.database.session import db_manager
+from bot.database.repositories.transaction_repository import TransactionRepository
 from bot.database.repositories.user_repository import UserRepository
+from bot.services.checkin_service import checkin_services
+from bot.services.qr_generator import ticket_qr_store
+from bot.services.website_webhooks import (
+    WebhookEvent,
+    verify_signature,
+    webhooks_enabled,
+    website_webhooks,
+)
 from bot.utils.logger import logger
+from bot.utils.metrics import registry, webhook_updates, website_webhook_events
+from bot.utils.serialization import dumps, loads
 from bot.utils.token_storage import TokenStorage
 
 
@@ -25,7 +38,8 @@ from bot.utils.token_storage import TokenStorage
 app = FastAPI(
     title="UPC World API",
     description="Backend API for Under People Club Bot",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS - Allow requests from website and localhost
@@ -63,12 +77,113 @@ app.add_middleware(
 logger.info("cors_configured", origins=cors_origins)
 
 
+# ========== RESPONSE CACHING ==========
+# Cache-Control policy per route. Exact paths win over prefixes (ending with "/").
+# Profile data is private and must be revalidated - cheap thanks to ETags.
+CACHE_CONTROL_POLICIES = {
+    "/api/users/me": "private, no-cache",
+    "/api/users/me/transactions": "private, no-cache",
+    "/api/health": "no-store",
+    "/metrics": "no-store",
+    "/api/auth/": "no-store",
+}
+
+# Bump when the shape of a cached response changes so old ETags stop matching
+PROFILE_ETAG_VERSION = 1
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def cache_control_for(path: str) -> Optional[str]:
+    """Resolve Cache-Control policy for a request path."""
+    policy = CACHE_CONTROL_POLICIES.get(path)
+    if policy is not None:
+        return policy
+    
+    best_prefix = ""
+    for prefix, prefix_policy in CACHE_CONTROL_POLICIES.items():
+        if prefix.endswith("/") and path.startswith(prefix) and len(prefix) > len(best_prefix):
+            best_prefix = prefix
+            policy = prefix_policy
+    return policy
+
+
+def make_weak_etag(resource_id: int, updated_at: Optional[datetime], version: int = 1) -> Optional[str]:
+    """
+    Build weak ETag from row identity and its updated_at timestamp.
+    Returns None when the row has no timestamp (caller must skip caching).
+    """
+    if updated_at is None:
+        return None
+    micros = (updated_at.replace(tzinfo=None) - _EPOCH) // timedelta(microseconds=1)
+    return f'W/"{version:x}-{resource_id:x}-{micros:x}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """Weak comparison of If-None-Match header against current ETag (RFC 9110)."""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    
+    current = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == current:
+            return True
+    return False
+
+
+class CacheControlMiddleware:
+    """Pure ASGI middleware adding per-route Cache-Control when handler didn't set one."""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        policy = cache_control_for(scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_with_cache_control(message):
+            if message["type"] == "http.response.start":
+                headers = message.setdefault("headers", [])
+                if not any(name.lower() == b"cache-control" for name, _ in headers):
+                    headers.append((b"cache-control", policy.encode("latin-1")))
+            await send(message)
+        
+        await self.app(scope, receive, send_with_cache_control)
+
+
+app.add_middleware(CacheControlMiddleware)
+
+# Compress large payloads (leaderboards, event lists). Brotli is optional.
+if settings.api_compression == "brotli":
+    try:
+        from brotli_asgi import BrotliMiddleware
+        app.add_middleware(BrotliMiddleware, minimum_size=settings.api_compression_min_size)
+        logger.info("api_compression_configured", algorithm="brotli")
+    except ImportError:
+        logger.warning("api_brotli_unavailable", fallback="gzip")
+        app.add_middleware(GZipMiddleware, minimum_size=settings.api_compression_min_size)
+elif settings.api_compression == "gzip":
+    app.add_middleware(GZipMiddleware, minimum_size=settings.api_compression_min_size)
+    logger.info("api_compression_configured", algorithm="gzip")
+
+
 # ========== CORS PREFLIGHT HANDLER ==========
 # Handle OPTIONS requests for CORS preflight (CRITICAL FIX)
 @app.options("/{path:path}")
 async def options_handler(path: str):
     """Handle all OPTIONS preflight requests."""
-    return JSONResponse(
+    return ORJSONResponse(
         content={"status": "ok"},
         headers={
             "Access-Control-Allow-Origin": "*",
@@ -128,6 +243,51 @@ class UserProfileResponse(BaseModel):
     photo_url: Optional[str]
 
 
+class TransactionItem(BaseModel):
+    """Single ledger entry."""
+    id: int
+    type: str
+    amount: float
+    balance_after: float
+    description: str
+    created_at: datetime
+
+
+class TransactionPageResponse(BaseModel):
+    """Page of transaction history, newest first."""
+    items: list[TransactionItem]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class CheckInRequest(BaseModel):
+    """Scanned ticket QR payload."""
+    payload: str = Field(..., max_length=255)
+
+
+class CheckInResponse(BaseModel):
+    """Door check-in result."""
+    ok: bool
+    reason: str
+    ticket_id: Optional[int] = None
+    used_at: Optional[datetime] = None
+
+
+class ModelResponse(Response):
+    """
+    JSON response rendered by the model's prebuilt pydantic-core serializer.
+    
+    Returning it from an endpoint skips FastAPI's response_model re-validation
+    and jsonable_encoder pass; response_model stays declared for OpenAPI docs.
+    """
+    media_type = "application/json"
+    
+    def render(self, content) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return dumps(content)
+
+
 # ========== AUTHENTICATION FUNCTIONS ==========
 def verify_telegram_data(data: dict, bot_token: str) -> bool:
     """
@@ -202,6 +362,15 @@ def verify_access_token(token: str) -> dict:
         raise HTTPException(status_code=401, detail="Invalid token")
 
 
+def user_id_from_token(token: str) -> int:
+    """Verify a JWT and return its numeric sub claim; 401 otherwise."""
+    sub = verify_access_token(token).get("sub")
+    try:
+        return int(sub)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+
 # ========== ENDPOINTS ==========
 
 # CRITICAL FIX: Add POST /api/auth/callback endpoint (was missing!)
@@ -254,7 +423,7 @@ async def auth_callback(request: AuthCodeRequest):
         
         logger.info("auth_success", user_id=user_id)
         
-        return AuthResponse(
+        return ModelResponse(AuthResponse(
             access_token=access_token,
             user={
                 "id": user_id,
@@ -262,7 +431,7 @@ async def auth_callback(request: AuthCodeRequest):
                 "first_name": user.first_name,
                 "role": "member" if getattr(user, 'is_member', False) else "guest"
             }
-        )
+        ))
         
     except HTTPException:
         raise
@@ -322,7 +491,7 @@ async def exchange_auth_code(request: AuthCodeRequest):
             code=code[:8] + "..."
         )
         
-        return AuthResponse(
+        return ModelResponse(AuthResponse(
             access_token=access_token,
             user={
                 "id": user_id,
@@ -330,7 +499,7 @@ async def exchange_auth_code(request: AuthCodeRequest):
                 "first_name": user.first_name,
                 "role": "member" if user.is_member else "guest"
             }
-        )
+        ))
         
     except HTTPException:
         raise
@@ -485,7 +654,7 @@ async def telegram_login(auth_data: TelegramAuthData):
             token_issued=True
         )
         
-        return AuthResponse(
+        return ModelResponse(AuthResponse(
             access_token=access_token,
             user={
                 "id": auth_data.id,
@@ -493,7 +662,7 @@ async def telegram_login(auth_data: TelegramAuthData):
                 "first_name": auth_data.first_name,
                 "role": "member" if user.is_member else "guest"
             }
-        )
+        ))
         
     except HTTPException:
         raise
@@ -510,11 +679,15 @@ async def telegram_login(auth_data: TelegramAuthData):
 
 
 @app.get("/api/users/me", response_model=UserProfileResponse)
-async def get_user_profile(authorization: str = Header(None)):
+async def get_user_profile(
+    authorization: str = Header(None),
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Get current user's profile using JWT token.
     
     Authorization header format: "Bearer {token}"
+    Supports conditional GET: send back the ETag in If-None-Match to get 304.
     """
     try:
         if not authorization:
@@ -534,12 +707,28 @@ async def get_user_profile(authorization: str = Header(None)):
         token = parts[1]
         
         # Verify token
-        payload = verify_access_token(token)
-        user_id = int(payload.get("sub"))
+        user_id = user_id_from_token(token)
         
         # Get user from database
         async with db_manager.session() as session:
             user_repo = UserRepository(session)
+            
+            # Cheap freshness check first - skip loading/serializing unchanged profiles
+            etag = make_weak_etag(
+                user_id,
+                await user_repo.get_updated_at(user_id),
+                version=PROFILE_ETAG_VERSION
+            )
+            if etag_matches(if_none_match, etag):
+                return Response(
+                    status_code=304,
+                    headers={
+                        "ETag": etag,
+                        "Cache-Control": CACHE_CONTROL_POLICIES["/api/users/me"],
+                        "Vary": "Authorization",
+                    }
+                )
+            
             user = await user_repo.get_by_id(user_id)
             
             if not user:
@@ -550,7 +739,11 @@ async def get_user_profile(authorization: str = Header(None)):
             
             logger.info("profile_requested", user_id=user_id)
             
-            return UserProfileResponse(
+            headers = {"Vary": "Authorization"}
+            if etag:
+                headers["ETag"] = etag
+            
+            profile = UserProfileResponse(
                 id=user.id,
                 username=user.username,
                 first_name=user.first_name,
@@ -563,6 +756,7 @@ async def get_user_profile(authorization: str = Header(None)):
                 referral_code=user.referral_code,
                 photo_url=user.photo_url
             )
+            return ModelResponse(profile, headers=headers)
         
     except HTTPException:
         raise
@@ -577,6 +771,58 @@ async def get_user_profile(authorization: str = Header(None)):
         )
 
 
+@app.get("/api/users/me/transactions", response_model=TransactionPageResponse)
+async def get_user_transactions(
+    cursor: Optional[str] = Query(None, max_length=32),
+    direction: str = Query("next", pattern="^(next|prev)$"),
+    limit: int = Query(20, ge=1, le=100),
+    authorization: str = Header(None),
+):
+    """
+    Get current user's transaction history by cursor.
+    
+    Without a cursor returns the newest page. Pass next_cursor back with
+    direction=next for older entries, prev_cursor with direction=prev for
+    newer ones; a missing cursor in the response means there is no such page.
+    """
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Missing Authorization header")
+    parts = authorization.split()
+    if len(parts) != 2 or parts[0].lower() != "bearer":
+        raise HTTPException(status_code=401, detail="Invalid Authorization header format")
+    user_id = user_id_from_token(parts[1])
+    
+    async with db_manager.session() as session:
+        try:
+            page = await TransactionRepository(session).get_user_transactions_page(
+                user_id,
+                limit=limit,
+                cursor=cursor,
+                backward=direction == "prev"
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        
+        return ModelResponse(
+            TransactionPageResponse(
+                items=[
+                    TransactionItem(
+                        id=t.id,
+                        type=t.type,
+                        amount=float(t.amount),
+                        balance_after=float(t.balance_after),
+                        description=t.description,
+                        created_at=t.created_at
+                    )
+                    for t in page.items
+                ],
+                next_cursor=page.next_cursor,
+                prev_cursor=page.prev_cursor
+            ),
+            headers={"Vary": "Authorization"}
+        )
+
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint for deployment monitoring."""
@@ -587,13 +833,194 @@ async def health_check():
     }
 
 
+# ========== TELEGRAM WEBHOOK ==========
+# PTB Application receiving webhook updates; attached by run_bot_async in webhook mode
+_telegram_application = None
+
+
+def attach_telegram_application(application) -> None:
+    """Route webhook updates into this application's update queue."""
+    global _telegram_application
+    _telegram_application = application
+
+
+@app.post("/telegram/webhook", include_in_schema=False)
+async def telegram_webhook(
+    request: Request,
+    x_telegram_bot_api_secret_token: Optional[str] = Header(None)
+):
+    """
+    Telegram webhook ingestion.
+    Validates the secret token and pushes the update into the PTB update queue.
+    Answers 503 while the queue is too deep or the update processor is
+    saturated - Telegram retries delivery later.
+    """
+    secret = settings.webhook_secret_token
+    if not secret or not hmac.compare_digest(x_telegram_bot_api_secret_token or "", secret):
+        webhook_updates.labels("rejected").inc()
+        logger.warning("webhook_invalid_secret", client=request.client.host if request.client else None)
+        raise HTTPException(status_code=403, detail="Forbidden")
+    
+    application = _telegram_application
+    if application is None:
+        webhook_updates.labels("unavailable").inc()
+        return Response(status_code=503, headers={"Retry-After": "1"})
+    
+    update_queue = application.update_queue
+    processor = getattr(application, "update_processor", None)
+    if (
+        update_queue.qsize() >= settings.webhook_max_queue_size
+        or getattr(processor, "is_saturated", False)
+    ):
+        webhook_updates.labels("shed").inc()
+        logger.warning("webhook_backpressure", queue_depth=update_queue.qsize())
+        return Response(status_code=503, headers={"Retry-After": "1"})
+    
+    try:
+        update = Update.de_json(loads(await request.body()), application.bot)
+    except Exception as e:
+        webhook_updates.labels("invalid").inc()
+        logger.warning("webhook_invalid_update", error=str(e))
+        raise HTTPException(status_code=400, detail="Invalid update")
+    
+    await update_queue.put(update)
+    webhook_updates.labels("accepted").inc()
+    return Response(status_code=200)
+
+
+# ========== DOOR CHECK-IN ==========
+# Ticket indexes: preloaded by the checkin_preload job, else built on the first scan
+async def shutdown_checkin() -> None:
+    """Write pending check-ins of all loaded events."""
+    await checkin_services.shutdown()
+
+
+@app.post("/api/checkin/{event_id}", response_model=CheckInResponse, include_in_schema=False)
+async def checkin(
+    event_id: int,
+    request: CheckInRequest,
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Validate a scanned ticket at the door and mark it used.
+    Signature check and lookup are in memory; used marks reach the
+    database in batches (CHECKIN_SYNC_INTERVAL). Disabled without CHECKIN_TOKEN.
+    """
+    if not settings.checkin_token or not hmac.compare_digest(
+        authorization or "", f"Bearer {settings.checkin_token}"
+    ):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    
+    service = await checkin_services.get(event_id)
+    result = await service.check_in(request.payload)
+    
+    logger.info(
+        "ticket_checkin",
+        event_id=event_id,
+        ticket_id=result.ticket_id,
+        ok=result.ok,
+        reason=result.reason
+    )
+    return ModelResponse(CheckInResponse(
+        ok=result.ok, reason=result.reason, ticket_id=result.ticket_id, used_at=result.used_at
+    ))
+
+
+# ========== WEBSITE WEBHOOKS ==========
+# Tickets bought or changed on the website must scan at the door
+website_webhooks.on_tickets_changed = checkin_services.reload
+
+
+@app.post("/api/webhooks/website", include_in_schema=False)
+async def website_webhook(
+    request: Request,
+    x_website_signature: Optional[str] = Header(None)
+):
+    """
+    Website change notifications: users, membership, events and tickets.
+    Body is one event {"id", "type", "data"} or a list of them, signed with
+    WEBSITE_WEBHOOK_SECRET in X-Website-Signature. Events are queued and
+    applied in batches (202); 503 asks the website to redeliver later.
+    Redelivered event ids are applied once. 404 while the secret is unset
+    or still the default, which anyone could sign with.
+    """
+    if not webhooks_enabled():
+        website_webhook_events.labels("rejected").inc()
+        logger.warning("website_webhook_disabled", reason="WEBSITE_WEBHOOK_SECRET unset or default")
+        raise HTTPException(status_code=404, detail="Not found")
+    
+    body = await request.body()
+    if not verify_signature(body, x_website_signature):
+        website_webhook_events.labels("rejected").inc()
+        logger.warning(
+            "website_webhook_invalid_signature",
+            client=request.client.host if request.client else None
+        )
+        raise HTTPException(status_code=403, detail="Forbidden")
+    
+    try:
+        payload = loads(body)
+        events = [
+            WebhookEvent.from_payload(item)
+            for item in (payload if isinstance(payload, list) else [payload])
+        ]
+    except ValueError as e:
+        website_webhook_events.labels("invalid").inc()
+        logger.warning("website_webhook_invalid_payload", error=str(e))
+        raise HTTPException(status_code=400, detail="Invalid payload")
+    
+    await website_webhooks.start()
+    if not website_webhooks.push(events):
+        logger.warning("website_webhook_backpressure", queue_depth=website_webhooks.pending)
+        return Response(status_code=503, headers={"Retry-After": "5"})
+    return Response(status_code=202)
+
+
+# ========== TICKET QR IMAGES ==========
+_QR_KEY_LENGTH = 64
+
+
+@app.get("/api/qr/tickets/{key}.png", include_in_schema=False)
+async def ticket_qr_image(key: str):
+    """
+    Pre-generated ticket QR (see bot/jobs/ticket_qr.py).
+    Content-addressed, so the response never changes and can be cached forever.
+    """
+    if len(key) != _QR_KEY_LENGTH or any(c not in "0123456789abcdef" for c in key):
+        raise HTTPException(status_code=404, detail="Not found")
+    
+    data = await asyncio.to_thread(ticket_qr_store.read, key)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    
+    return Response(
+        content=data,
+        media_type="image/png",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus metrics; requires METRICS_TOKEN as bearer token when set."""
+    if settings.metrics_token and not hmac.compare_digest(
+        authorization or "", f"Bearer {settings.metrics_token}"
+    ):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.options("/{full_path:path}")
 async def options_handler(full_path: str):
     """
     Handle CORS preflight requests (OPTIONS method).
     Browser sends OPTIONS before POST/PUT/DELETE for cross-domain requests.
     """
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=200,
         headers={
             "Access-Control-Allow-Origin": "*",
@@ -608,7 +1035,7 @@ async def options_handler(full_path: str):
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Handle HTTP exceptions with CORS headers."""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
         headers={
@@ -626,7 +1053,7 @@ async def general_exception_handler(request, exc):
         error_type=type(exc).__name__,
         path=request.url.path
     )
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"detail": "Internal server error"},
         headers={
@@ -38,6 +38,81 @@ class Settings(BaseSettings):
         alias="WEBSITE_WEBHOOK_SECRET"
     )
     
+    # Update delivery: "polling" (getUpdates) or "webhook" (POST /telegram/webhook)
+    bot_mode: str = Field("polling", alias="BOT_MODE")
+    webhook_url: str | None = Field(None, alias="WEBHOOK_URL")  # public base URL
+    webhook_secret_token: str | None = Field(None, alias="WEBHOOK_SECRET_TOKEN")
+    webhook_max_queue_size: int = Field(1000, alias="WEBHOOK_MAX_QUEUE_SIZE")
+    
+    # Update processing: global concurrency cap and load-shedding limits
+    update_max_concurrency: int = Field(64, alias="UPDATE_MAX_CONCURRENCY")
+    update_max_pending: int = Field(1000, alias="UPDATE_MAX_PENDING")
+    update_max_pending_per_user: int = Field(10, alias="UPDATE_MAX_PENDING_PER_USER")
+    
+    # context.user_data persistence in Redis (navigation state etc.)
+    user_data_persistence: bool = Field(True, alias="USER_DATA_PERSISTENCE")
+    user_data_update_interval: float = Field(10.0, alias="USER_DATA_UPDATE_INTERVAL")
+    user_data_ttl_days: int = Field(30, alias="USER_DATA_TTL_DAYS")
+    
+    # Analytics events: bounded in-memory queue, written to the DB in batches
+    analytics_enabled: bool = Field(True, alias="ANALYTICS_ENABLED")
+    analytics_queue_size: int = Field(10000, alias="ANALYTICS_QUEUE_SIZE")
+    analytics_batch_size: int = Field(500, alias="ANALYTICS_BATCH_SIZE")
+    analytics_flush_interval: float = Field(5.0, alias="ANALYTICS_FLUSH_INTERVAL")
+    
+    # Rendered QR codes: in-memory LRU + content-addressed files (empty dir = memory only)
+    qr_cache_dir: str | None = Field("data/qr_cache", alias="QR_CACHE_DIR")
+    qr_cache_memory_items: int = Field(256, alias="QR_CACHE_MEMORY_ITEMS")
+    # QR rendering process pool (0 = thread pool) and max renders submitted at once
+    qr_render_workers: int = Field(2, alias="QR_RENDER_WORKERS")
+    qr_render_max_pending: int = Field(32, alias="QR_RENDER_MAX_PENDING")
+    # Pre-generated ticket QR images (content-addressed, never evicted)
+    ticket_qr_dir: str = Field("data/ticket_qr", alias="TICKET_QR_DIR")
+    # Public base URL of the API server; stored ticket QR URLs point here
+    api_public_url: str | None = Field(None, alias="API_PUBLIC_URL")
+    # Ticket QR signatures (falls back to SECRET_KEY) and door check-in API
+    ticket_signing_key: str | None = Field(None, alias="TICKET_SIGNING_KEY")
+    checkin_token: str | None = Field(None, alias="CHECKIN_TOKEN")
+    checkin_sync_interval: float = Field(5.0, alias="CHECKIN_SYNC_INTERVAL")
+    # Ticket indexes of events starting within this many hours are loaded in advance
+    checkin_preload_hours: float = Field(24, alias="CHECKIN_PRELOAD_HOURS")
+    
+    # Ledger: reconcile users' total_earned/total_spent with transactions (0 = off)
+    ledger_reconcile_interval_hours: float = Field(24, alias="LEDGER_RECONCILE_INTERVAL_HOURS")
+    ledger_reconcile_chunk_size: int = Field(500, alias="LEDGER_RECONCILE_CHUNK_SIZE")
+    ledger_reconcile_fix: bool = Field(True, alias="LEDGER_RECONCILE_FIX")
+
+    # Monthly partitions of transactions/analytics_events (0 = off / keep forever)
+    partition_maintenance_interval_hours: float = Field(24, alias="PARTITION_MAINTENANCE_INTERVAL_HOURS")
+    partition_months_ahead: int = Field(3, alias="PARTITION_MONTHS_AHEAD")
+    partition_archive_dir: str = Field("data/archive", alias="PARTITION_ARCHIVE_DIR")
+    transactions_retention_months: int = Field(0, alias="TRANSACTIONS_RETENTION_MONTHS")
+    analytics_retention_months: int = Field(12, alias="ANALYTICS_RETENTION_MONTHS")
+
+    # Daily streaks: expire lapsed streaks, remind before they lapse (0 = off)
+    streak_maintenance_interval_minutes: float = Field(60, alias="STREAK_MAINTENANCE_INTERVAL_MINUTES")
+    streak_reminder_hours: float = Field(4, alias="STREAK_REMINDER_HOURS")
+    streak_reminder_rate: float = Field(20, alias="STREAK_REMINDER_RATE")
+    streak_chunk_size: int = Field(1000, alias="STREAK_CHUNK_SIZE")
+
+    # Inbound website sync: events/tickets mirrored locally (0 = off)
+    website_sync_interval_seconds: float = Field(60, alias="WEBSITE_SYNC_INTERVAL_SECONDS")
+    website_sync_page_size: int = Field(200, alias="WEBSITE_SYNC_PAGE_SIZE")
+    # Full re-read, e.g. for tickets of users who started the bot after buying (0 = off)
+    website_sync_full_interval_hours: float = Field(24, alias="WEBSITE_SYNC_FULL_INTERVAL_HOURS")
+
+    # Website webhooks (POST /api/webhooks/website, signed with WEBSITE_WEBHOOK_SECRET);
+    # applied event ids are remembered for dedupe (0 = forever)
+    website_webhook_queue_size: int = Field(5000, alias="WEBSITE_WEBHOOK_QUEUE_SIZE")
+    website_webhook_batch_size: int = Field(200, alias="WEBSITE_WEBHOOK_BATCH_SIZE")
+    website_webhook_flush_interval: float = Field(1.0, alias="WEBSITE_WEBHOOK_FLUSH_INTERVAL")
+    website_webhook_dedupe_days: int = Field(7, alias="WEBSITE_WEBHOOK_DEDUPE_DAYS")
+
+    # Offline analytics export (/export): parquet, arrow or jsonl
+    export_dir: str = Field("data/exports", alias="EXPORT_DIR")
+    export_format: str = Field("parquet", alias="EXPORT_FORMAT")
+    export_chunk_size: int = Field(10000, alias="EXPORT_CHUNK_SIZE")
+    
     # Telegram Login Widget
     telegram_bot_id: int = Field(
         default=8446133461,
@@ -78,6 +153,13 @@ class Settings(BaseSettings):
     # Sentry
     sentry_dsn: str | None = Field(None, alias="SENTRY_DSN")
     
+    # Database diagnostics
+    db_slow_query_ms: int = Field(200, alias="DB_SLOW_QUERY_MS")
+    db_repeated_query_threshold: int = Field(5, alias="DB_REPEATED_QUERY_THRESHOLD")
+    
+    # Metrics: bearer token required by /metrics when set
+    metrics_token: str | None = Field(None, alias="METRICS_TOKEN")
+    
     # Feature Flags
     enable_card_game: bool = Field(True, alias="ENABLE_CARD_GAME")
     enable_mini_games: bool = Field(True, alias="ENABLE_MINI_GAMES")
@@ -90,7 +172,19 @@ class Settings(BaseSettings):
     # Logging
     log_level: str = Field("INFO", alias="LOG_LEVEL")
     log_format: str = Field("json", alias="LOG_FORMAT")
-    
+    # Sampling: "event=head:every" rules, per window; every=0 drops after head
+    log_sample_window: float = Field(1.0, alias="LOG_SAMPLE_WINDOW")
+    log_sample_rules: str = Field(
+        default="update_processed=20:10,cache_hit=5:100,cache_stored=5:100",
+        alias="LOG_SAMPLE_RULES"
+    )
+    log_burst_limit: int = Field(50, alias="LOG_BURST_LIMIT")
+    log_hot_path_budget: int = Field(500, alias="LOG_HOT_PATH_BUDGET")
+
+    # API response compression: gzip, brotli (needs brotli-asgi) or off
+    api_compression: str = Field("gzip", alias="API_COMPRESSION")
+    api_compression_min_size: int = Field(1024, alias="API_COMPRESSION_MIN_SIZE")
+
     @field_validator("admin_ids", mode="before")
     @classmethod
     def parse_admin_ids(cls, v):
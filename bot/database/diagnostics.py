@@ -0,0 +1,115 @@
+"""Query diagnostics built on SQLAlchemy cursor events.
+
+Every statement is timed and recorded in the DB metrics. Statements slower
+than DB_SLOW_QUERY_MS are logged together with the handler that issued
+them. Handlers run inside a query scope (opened by logging_middleware);
+the same SQL executed DB_REPEATED_QUERY_THRESHOLD times within one scope
+is reported as a likely N+1 pattern.
+
+The scope lives in a context variable, which SQLAlchemy's async greenlet
+bridge carries into the synchronous event hooks.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from bot.config import settings
+from bot.utils.logger import logger
+from bot.utils.metrics import db_query_latency
+
+
+@dataclass
+class QueryScope:
+    """Queries issued while handling one update (or one budgeted block)."""
+
+    name: str
+    count: int = 0
+    total_time: float = 0.0
+    statements: dict[str, int] = field(default_factory=dict)
+
+
+_current_scope: ContextVar[Optional[QueryScope]] = ContextVar("query_scope", default=None)
+
+
+def current_scope() -> Optional[QueryScope]:
+    """Get the active query scope, if any."""
+    return _current_scope.get()
+
+
+@contextmanager
+def query_scope(name: str) -> Iterator[QueryScope]:
+    """Attribute queries executed in this block to ``name``."""
+    scope = QueryScope(name)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int, name: str = "query_budget") -> Iterator[QueryScope]:
+    """
+    Fail with AssertionError if the block runs more than ``max_queries``.
+
+    Intended for tests:
+        with query_budget(2):
+            await service.get_user_profile(user_id)
+    """
+    with query_scope(name) as scope:
+        yield scope
+
+    if scope.count > max_queries:
+        statements = "\n".join(
+            f"  {count}x {statement[:200]}"
+            for statement, count in sorted(scope.statements.items(), key=lambda item: -item[1])
+        )
+        raise AssertionError(
+            f"{name}: {scope.count} queries executed, budget is {max_queries}\n{statements}"
+        )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Stored on the execution context so failed statements leave nothing behind
+    context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - context._query_start_time
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement else "UNKNOWN"
+    db_query_latency.labels(operation).observe(duration)
+
+    scope = _current_scope.get()
+    if scope is not None:
+        scope.count += 1
+        scope.total_time += duration
+        repeats = scope.statements.get(statement, 0) + 1
+        scope.statements[statement] = repeats
+
+        # Report once per statement and scope, when the threshold is crossed
+        if repeats == settings.db_repeated_query_threshold:
+            logger.warning(
+                "repeated_query_detected",
+                handler=scope.name,
+                repeats=repeats,
+                statement=statement[:500]
+            )
+
+    if duration * 1000 >= settings.db_slow_query_ms:
+        logger.warning(
+            "slow_query",
+            handler=scope.name if scope else None,
+            duration_ms=round(duration * 1000, 1),
+            statement=statement[:500]
+        )
+
+
+def install(engine: Engine) -> None:
+    """Attach diagnostics hooks to a (sync) engine."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
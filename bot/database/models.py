@@ -7,7 +7,7 @@ import string
 
 from sqlalchemy import (
     BigInteger, String, Integer, Boolean, DateTime, Text,
-    Numeric, ForeignKey, Index, CheckConstraint, UniqueConstraint
+    Numeric, ForeignKey, Identity, Index, CheckConstraint, UniqueConstraint, text
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import JSONB
@@ -49,7 +49,8 @@ class User(Base):
     referral_count: Mapped[int] = mapped_column(Integer, default=0)
     referral_earnings: Mapped[Decimal] = mapped_column(Numeric(10, 2), default=0)
     
-    # QR Code
+    # QR Code: Telegram file reference of the uploaded referral QR
+    # ("tg:<cache key prefix>:<file_id>", see bot/services/qr_cache.py)
     qr_code_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     public_profile_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     
@@ -94,6 +95,15 @@ class User(Base):
         Index("idx_user_referral_code", "referral_code"),
         Index("idx_user_website_id", "website_user_id"),
         Index("idx_user_membership", "membership_level"),
+        # Incremental export: WHERE (updated_at, id) > (?, ?) ORDER BY updated_at, id
+        Index("idx_user_updated_id", "updated_at", "id"),
+        # Streak expiry/reminder scans; users without a streak aren't indexed
+        Index(
+            "idx_user_streak_claim",
+            "last_daily_claim",
+            "id",
+            postgresql_where=text("daily_streak > 0"),
+        ),
     )
     
     @staticmethod
@@ -116,7 +126,13 @@ class User(Base):
 
 
 class Transaction(Base):
-    """Transaction history for UP Coins and payments."""
+    """
+    Transaction history for UP Coins and payments.
+    
+    Append-only; in PostgreSQL the table is range-partitioned by month on
+    created_at (see migration 008), with old months archived by
+    PartitionMaintenanceJob. Filtering on created_at prunes partitions.
+    """
     __tablename__ = "transactions"
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -139,15 +155,20 @@ class Transaction(Base):
     website_transaction_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     is_synced: Mapped[bool] = mapped_column(Boolean, default=False)
     
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
     
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="transactions")
     
     __table_args__ = (
-        Index("idx_transaction_user", "user_id"),
-        Index("idx_transaction_type", "type"),
-        Index("idx_transaction_created", "created_at"),
+        # History pages: WHERE user_id = ? AND (created_at, id) < (?, ?)
+        # ORDER BY created_at DESC, id DESC
+        Index(
+            "idx_transaction_user_created_id",
+            "user_id", text("created_at DESC"), text("id DESC")
+        ),
+        # Rows arrive in created_at order: a BRIN index is tiny and cheap to insert into
+        Index("idx_transaction_created", "created_at", postgresql_using="brin"),
     )
 
 
@@ -177,9 +198,10 @@ class Event(Base):
     cover_image_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     gallery_urls: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True)
     
-    # Website sync
+    # Website sync (website_updated_at: the website's own change time, the sync watermark)
     website_event_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, unique=True)
     is_synced: Mapped[bool] = mapped_column(Boolean, default=False)
+    website_updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -189,7 +211,8 @@ class Event(Base):
     
     __table_args__ = (
         Index("idx_event_date", "event_date"),
-        Index("idx_event_status", "status"),
+        # Upcoming events: status = 'upcoming' AND event_date >= now ORDER BY event_date
+        Index("idx_event_status_date", "status", "event_date"),
     )
 
 
@@ -215,13 +238,13 @@ class Ticket(Base):
     
     # Payment
     payment_method: Mapped[str] = mapped_column(String(50), nullable=False)
-    transaction_id: Mapped[Optional[int]] = mapped_column(
-        Integer, ForeignKey("transactions.id"), nullable=True
-    )
+    # No foreign key: transactions is partitioned, its primary key is (id, created_at)
+    transaction_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     
     # Website sync
     website_ticket_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     is_synced: Mapped[bool] = mapped_column(Boolean, default=False)
+    website_updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     
@@ -233,6 +256,8 @@ class Ticket(Base):
         Index("idx_ticket_user", "user_id"),
         Index("idx_ticket_event", "event_id"),
         Index("idx_ticket_qr", "qr_code"),
+        # Incremental export: WHERE (created_at, id) > (?, ?) ORDER BY created_at, id
+        Index("idx_ticket_created_id", "created_at", "id"),
         UniqueConstraint("user_id", "event_id", name="uq_user_event"),
     )
 
@@ -327,6 +352,33 @@ class AdminLog(Base):
     )
 
 
+class AnalyticsEvent(Base):
+    """
+    Tracked user action.
+    
+    Written in batches by AnalyticsPipeline; in PostgreSQL the table is
+    range-partitioned by month on created_at (see migration 005), with
+    partitions created and archived by PartitionMaintenanceJob. The
+    partition key is part of the primary key, (id, created_at); SQLite
+    can't generate ids for a composite key, so rows there need an id.
+    """
+    __tablename__ = "analytics_events"
+    
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), Identity(), primary_key=True
+    )
+    event: Mapped[str] = mapped_column(String(100), nullable=False)
+    user_id: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    handler: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    
+    created_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("idx_analytics_created", "created_at"),
+        Index("idx_analytics_event_created", "event", "created_at"),
+    )
+
+
 class AuthCode(Base):
     """Temporary authentication codes for one-time use."""
     __tablename__ = "auth_codes"
@@ -350,3 +402,38 @@ class AuthCode(Base):
     def is_expired(self) -> bool:
         """Check if auth code has expired."""
         return datetime.utcnow() > self.expires_at
+
+
+class WebsiteWebhookEvent(Base):
+    """
+    Website webhook event already applied.
+    
+    Inserted in the same transaction as the event's changes, so a
+    redelivered event is recognised and skipped; rows older than
+    WEBSITE_WEBHOOK_DEDUPE_DAYS are pruned.
+    """
+    __tablename__ = "website_webhook_events"
+    
+    event_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    type: Mapped[str] = mapped_column(String(50), nullable=False)
+    received_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("idx_website_webhook_received", "received_at"),
+    )
+
+
+class WebsiteSyncCursor(Base):
+    """
+    Where the website change poll continues, per kind ("events", "tickets").
+    
+    Advanced only by WebsiteInboundSync, with each page it applies.
+    Webhooks write website_updated_at as well, so a cursor derived from
+    that column would skip changes the poll hasn't read yet.
+    """
+    __tablename__ = "website_sync_cursors"
+    
+    kind: Mapped[str] = mapped_column(String(20), primary_key=True)
+    updated_since: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    after_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
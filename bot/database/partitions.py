@@ -0,0 +1,111 @@
+"""Monthly range partitions of append-only tables (PostgreSQL)."""
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# Tables created with PARTITION BY RANGE (created_at) - migrations 005, 008
+PARTITIONED_TABLES = ("analytics_events", "transactions")
+
+
+def month_start(value: date) -> date:
+    """First day of the month containing value."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month months after (or before) month."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Name of table's partition holding month, e.g. transactions_2024_05."""
+    return f"{table}_{month:%Y_%m}"
+
+
+def partition_month(table: str, name: str) -> Optional[date]:
+    """Month of a monthly partition of table; None for the default or foreign names."""
+    match = re.fullmatch(rf"{re.escape(table)}_(\d{{4}})_(\d{{2}})", name)
+    if not match:
+        return None
+    return date(int(match[1]), int(match[2]), 1)
+
+
+@dataclass
+class PartitionPlan:
+    """Partitions to create and to archive, oldest first."""
+
+    create: list[date] = field(default_factory=list)
+    archive: list[str] = field(default_factory=list)
+
+
+def plan_partitions(
+    table: str,
+    existing: Iterable[str],
+    today: date,
+    months_ahead: int,
+    retention_months: int
+) -> PartitionPlan:
+    """
+    Decide maintenance for one table.
+
+    Creates the current month and months_ahead following ones if missing.
+    With retention_months > 0, partitions ending before the start of the
+    month retention_months before the current one are archived; 0 keeps
+    everything.
+    """
+    current = month_start(today)
+    months = {}
+    for name in existing:
+        month = partition_month(table, name)
+        if month is not None:
+            months[month] = name
+
+    plan = PartitionPlan()
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if month not in months:
+            plan.create.append(month)
+
+    if retention_months > 0:
+        cutoff = add_months(current, -retention_months)
+        plan.archive = [months[m] for m in sorted(months) if m < cutoff]
+    return plan
+
+
+async def list_partitions(session: AsyncSession, table: str) -> list[str]:
+    """Names of table's attached partitions."""
+    result = await session.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "WHERE parent.relname = :table "
+            "ORDER BY child.relname"
+        ),
+        {"table": table}
+    )
+    return list(result.scalars().all())
+
+
+async def create_partition(session: AsyncSession, table: str, month: date) -> str:
+    """Create table's partition for month; no-op if it exists."""
+    name = partition_name(table, month)
+    await session.execute(text(
+        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" '
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    ))
+    return name
+
+
+async def drop_partition(session: AsyncSession, table: str, name: str) -> None:
+    """Detach and drop a partition; waits at most 5 s for the parent's lock."""
+    # Plain DETACH briefly locks the parent; don't queue writers behind it
+    await session.execute(text("SET LOCAL lock_timeout = '5s'"))
+    await session.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+    await session.execute(text(f'DROP TABLE "{name}"'))
@@ -0,0 +1,65 @@
+"""Achievement repository."""
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.database.models import Achievement, UserAchievement
+
+
+# Rows per INSERT; 3 parameters each stays well under PostgreSQL's 32767
+AWARD_BATCH_SIZE = 5000
+
+
+class AchievementRepository:
+    """Repository for achievement definitions and awards."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_active(self) -> list[Achievement]:
+        """Get active achievements in display order."""
+        result = await self.session.execute(
+            select(Achievement)
+            .where(Achievement.is_active.is_(True))
+            .order_by(Achievement.order, Achievement.id)
+        )
+        return list(result.scalars().all())
+
+    async def get_user_achievement_ids(self, user_id: int) -> set[int]:
+        """Get ids of achievements the user has earned."""
+        result = await self.session.execute(
+            select(UserAchievement.achievement_id).where(UserAchievement.user_id == user_id)
+        )
+        return set(result.scalars().all())
+
+    async def award(self, pairs: list[tuple[int, int]]) -> set[tuple[int, int]]:
+        """
+        Insert (user_id, achievement_id) awards in one statement.
+
+        Pairs already earned are skipped by the unique constraint; returns
+        only the pairs inserted now, so callers reward each award once even
+        when evaluations race.
+        """
+        if not pairs:
+            return set()
+
+        if self.session.bind.dialect.name == "postgresql":
+            insert = postgresql.insert
+        else:
+            insert = sqlite.insert
+        now = datetime.utcnow()
+        inserted = set()
+        for start in range(0, len(pairs), AWARD_BATCH_SIZE):
+            result = await self.session.execute(
+                insert(UserAchievement)
+                .values([
+                    {"user_id": user_id, "achievement_id": achievement_id, "earned_at": now}
+                    for user_id, achievement_id in pairs[start:start + AWARD_BATCH_SIZE]
+                ])
+                .on_conflict_do_nothing(index_elements=["user_id", "achievement_id"])
+                .returning(UserAchievement.user_id, UserAchievement.achievement_id)
+            )
+            inserted.update(tuple(row) for row in result.all())
+        return inserted
@@ -0,0 +1,54 @@
+"""Analytics event repository."""
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import Date, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.database.models import AnalyticsEvent
+
+
+class AnalyticsRepository:
+    """Repository for analytics events and aggregates."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def insert_many(self, events: list[dict]) -> None:
+        """Bulk insert events (executemany, no ORM objects)."""
+        if events:
+            await self.session.execute(insert(AnalyticsEvent), events)
+
+    async def daily_active_users(self, days: int = 7) -> list[tuple[date, int]]:
+        """Distinct users per day for the last `days` days, oldest first."""
+        since = datetime.combine(datetime.utcnow().date() - timedelta(days=days - 1), datetime.min.time())
+        day = func.date(AnalyticsEvent.created_at, type_=Date).label("day")
+        result = await self.session.execute(
+            select(day, func.count(func.distinct(AnalyticsEvent.user_id)))
+            .where(AnalyticsEvent.created_at >= since)
+            .where(AnalyticsEvent.user_id.is_not(None))
+            .group_by(day)
+            .order_by(day)
+        )
+        return [(row[0], row[1]) for row in result.all()]
+
+    async def events_per_handler(
+        self,
+        since: datetime,
+        until: Optional[datetime] = None,
+        limit: int = 20
+    ) -> list[tuple[str, int]]:
+        """Event counts per handler in a time range, most frequent first."""
+        total = func.count().label("total")
+        query = (
+            select(AnalyticsEvent.handler, total)
+            .where(AnalyticsEvent.created_at >= since)
+            .where(AnalyticsEvent.handler.is_not(None))
+        )
+        if until is not None:
+            query = query.where(AnalyticsEvent.created_at < until)
+
+        result = await self.session.execute(
+            query.group_by(AnalyticsEvent.handler).order_by(total.desc()).limit(limit)
+        )
+        return [(row[0], row[1]) for row in result.all()]
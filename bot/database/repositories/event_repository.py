@@ -2,10 +2,32 @@
 from typing import Optional
 from datetime import datetime
 
-from sqlalchemy import select, func
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
-from bot.database.models import Event
+from bot.database.models import Event, Ticket, User, WebsiteSyncCursor
+
+
+# Columns the website owns; local-only ones (QR codes, counters) are kept
+WEBSITE_EVENT_COLUMNS = (
+    "title", "description", "theme", "location", "event_date", "doors_open",
+    "doors_close", "max_capacity", "current_attendees", "status", "cover_image_url",
+)
+WEBSITE_TICKET_COLUMNS = (
+    "ticket_type", "price", "status", "used_at", "payment_method", "website_ticket_id",
+)
+
+
+def _latest(rows: list[dict], *key: str) -> list[dict]:
+    # One row per conflict key: a single INSERT ... ON CONFLICT can't touch a row twice
+    latest = {}
+    for row in rows:
+        k = tuple(row[name] for name in key)
+        if k not in latest or row["website_updated_at"] >= latest[k]["website_updated_at"]:
+            latest[k] = row
+    return list(latest.values())
 
 
 class EventRepository:
@@ -43,3 +65,122 @@ class EventRepository:
             .limit(limit)
         )
         return list(result.scalars().all())
+    
+    async def get_user_tickets(self, user_id: int, limit: int = 5) -> list[Ticket]:
+        """Get user's latest tickets with their events."""
+        result = await self.session.execute(
+            select(Ticket)
+            .options(joinedload(Ticket.event))
+            .where(Ticket.user_id == user_id)
+            .order_by(Ticket.created_at.desc())
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+    
+    async def get_sync_cursor(self, kind: str) -> Optional[tuple[datetime, int]]:
+        """(updated_since, after_id) the change poll of "events" or "tickets" continues from."""
+        cursor = await self.session.get(WebsiteSyncCursor, kind)
+        return (cursor.updated_since, cursor.after_id) if cursor else None
+    
+    async def set_sync_cursor(self, kind: str, updated_since: datetime, after_id: int) -> None:
+        """Store the poll position of kind (last change read); it only moves forward."""
+        values = {
+            "updated_since": updated_since,
+            "after_id": after_id,
+            "updated_at": datetime.utcnow(),
+        }
+        statement = self._insert()(WebsiteSyncCursor).values(kind=kind, **values)
+        await self.session.execute(
+            statement.on_conflict_do_update(
+                index_elements=["kind"],
+                set_=values,
+                where=tuple_(WebsiteSyncCursor.updated_since, WebsiteSyncCursor.after_id)
+                < tuple_(statement.excluded.updated_since, statement.excluded.after_id),
+            )
+        )
+    
+    def _insert(self):
+        if self.session.bind.dialect.name == "postgresql":
+            return postgresql.insert
+        return sqlite.insert
+    
+    async def upsert_website_events(self, rows: list[dict]) -> int:
+        """
+        Insert or update events by website_event_id in one statement.
+        
+        Rows carry website_event_id, website_updated_at and
+        WEBSITE_EVENT_COLUMNS; an update older than the stored one is
+        ignored, so replayed or reordered changes can't roll an event back.
+        Returns the number of rows written.
+        """
+        if not rows:
+            return 0
+        now = datetime.utcnow()
+        insert = self._insert()
+        statement = insert(Event).values([
+            {**row, "is_synced": True, "created_at": now, "updated_at": now}
+            for row in _latest(rows, "website_event_id")
+        ])
+        statement = statement.on_conflict_do_update(
+            index_elements=["website_event_id"],
+            set_={
+                **{name: statement.excluded[name] for name in WEBSITE_EVENT_COLUMNS},
+                "website_updated_at": statement.excluded.website_updated_at,
+                "is_synced": True,
+                "updated_at": now,
+            },
+            where=func.coalesce(
+                Event.website_updated_at <= statement.excluded.website_updated_at, True
+            ),
+        )
+        result = await self.session.execute(statement)
+        return result.rowcount
+    
+    async def upsert_website_tickets(self, rows: list[dict]) -> int:
+        """
+        Insert or update tickets by (user_id, event_id) in one statement.
+        
+        Rows carry user_id, website_event_id, qr_code, website_updated_at
+        and WEBSITE_TICKET_COLUMNS. A user has one ticket per event, so a
+        ticket bought in the bot is matched and linked to its website id.
+        Tickets of users or events not known locally are skipped, as are
+        updates older than the stored one. Returns the number of rows
+        written.
+        """
+        if not rows:
+            return 0
+        event_ids = dict((await self.session.execute(
+            select(Event.website_event_id, Event.id)
+            .where(Event.website_event_id.in_({row["website_event_id"] for row in rows}))
+        )).all())
+        user_ids = set((await self.session.execute(
+            select(User.id).where(User.id.in_({row["user_id"] for row in rows}))
+        )).scalars().all())
+        
+        values = [
+            {
+                **{name: value for name, value in row.items() if name != "website_event_id"},
+                "event_id": event_ids[row["website_event_id"]],
+                "is_synced": True,
+            }
+            for row in rows
+            if row["website_event_id"] in event_ids and row["user_id"] in user_ids
+        ]
+        if not values:
+            return 0
+        
+        insert = self._insert()
+        statement = insert(Ticket).values(_latest(values, "user_id", "event_id"))
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id", "event_id"],
+            set_={
+                **{name: statement.excluded[name] for name in WEBSITE_TICKET_COLUMNS},
+                "website_updated_at": statement.excluded.website_updated_at,
+                "is_synced": True,
+            },
+            where=func.coalesce(
+                Ticket.website_updated_at <= statement.excluded.website_updated_at, True
+            ),
+        )
+        result = await self.session.execute(statement)
+        return result.rowcount
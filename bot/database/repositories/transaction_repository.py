@@ -1,12 +1,42 @@
 """Transaction repository."""
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Mapping, Optional
 from datetime import datetime, timedelta
 from decimal import Decimal
 
-from sqlalchemy import select, func
+from sqlalchemy import Update, func, insert, literal, select, true, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
-from bot.database.models import Transaction
+from bot.database.models import Transaction, User
+from bot.utils.pagination import decode_cursor, encode_cursor
+
+
+_users = User.__table__
+_transactions = Transaction.__table__
+# User columns every ledger write returns (see LedgerEntry)
+LEDGER_USER_COLUMNS = ("id", "up_coins", "total_earned", "total_spent")
+
+
+@dataclass(frozen=True)
+class LedgerEntry:
+    """A recorded transaction and the user's summary right after it."""
+    transaction_id: int
+    user_id: int
+    amount: Decimal
+    balance_after: Decimal
+    total_earned: Decimal
+    total_spent: Decimal
+    # Further user columns returned by a record_update() UPDATE
+    returned: dict = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class TransactionPage:
+    """One page of history, newest first, with cursors to its neighbours."""
+    items: list[Transaction]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 class TransactionRepository:
@@ -15,26 +45,242 @@ class TransactionRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
     
-    async def get_by_id(self, transaction_id: int) -> Optional[Transaction]:
-        """Get transaction by ID."""
-        result = await self.session.execute(
-            select(Transaction).where(Transaction.id == transaction_id)
-        )
+    async def get_by_id(
+        self,
+        transaction_id: int,
+        created_at: Optional[datetime] = None
+    ) -> Optional[Transaction]:
+        """
+        Get transaction by ID.
+        
+        The table is partitioned by created_at: pass it when known so only
+        one partition is searched instead of every month's id index.
+        """
+        query = select(Transaction).where(Transaction.id == transaction_id)
+        if created_at is not None:
+            query = query.where(Transaction.created_at == created_at)
+        result = await self.session.execute(query)
         return result.scalar_one_or_none()
     
+    async def record(
+        self,
+        user_id: int,
+        amount: Decimal,
+        transaction_type: str,
+        description: str,
+        metadata: Optional[dict] = None
+    ) -> Optional[LedgerEntry]:
+        """
+        Insert a transaction and apply it to the user's summary.
+        
+        Balance, total_earned and total_spent change in the same statement
+        as the insert (PostgreSQL: UPDATE ... RETURNING feeding the INSERT
+        through a CTE), so the summary can't diverge from the ledger and
+        concurrent writes can't lose updates. Debits only apply while the
+        balance covers them. Returns None when nothing was written (unknown
+        user or insufficient balance).
+        """
+        now = datetime.utcnow()
+        earned = amount if amount > 0 else Decimal(0)
+        spent = -amount if amount < 0 else Decimal(0)
+        
+        user_update = (
+            update(_users)
+            .where(_users.c.id == user_id)
+            .values(
+                up_coins=_users.c.up_coins + amount,
+                total_earned=_users.c.total_earned + earned,
+                total_spent=_users.c.total_spent + spent,
+                updated_at=now,
+            )
+        )
+        if amount < 0:
+            user_update = user_update.where(_users.c.up_coins >= -amount)
+        user_update = user_update.returning(
+            literal(amount, _transactions.c.amount.type).label("amount"),
+            literal(description, _transactions.c.description.type).label("description"),
+            literal(metadata or {}, _transactions.c.extra_metadata.type).label("extra_metadata"),
+        )
+        return await self.record_update(user_update, transaction_type, now)
+    
+    async def record_update(
+        self,
+        user_update: Update,
+        transaction_type: str,
+        now: Optional[datetime] = None
+    ) -> Optional[LedgerEntry]:
+        """
+        Run a prepared UPDATE of one user and insert the transaction it yields.
+        
+        For changes whose amount is only known inside the statement (a
+        bonus computed from the streak it updates, say). user_update must
+        RETURN amount, description and extra_metadata; the user's id and
+        summary are appended here, and any other returned User columns are
+        synced into an already loaded User and kept in LedgerEntry.returned.
+        Returns None when the UPDATE matched no row.
+        """
+        now = now or datetime.utcnow()
+        user_update = user_update.returning(*(_users.c[name] for name in LEDGER_USER_COLUMNS))
+        columns = {
+            "type": transaction_type,
+            "is_synced": False,
+            "created_at": now,
+        }
+        
+        if self.session.bind.dialect.name == "postgresql":
+            summary = user_update.cte("ledger_user")
+            inserted = (
+                insert(_transactions)
+                .from_select(
+                    ["user_id", "balance_after", "amount", "description", "extra_metadata", *columns],
+                    select(
+                        summary.c.id,
+                        summary.c.up_coins,
+                        summary.c.amount,
+                        summary.c.description,
+                        summary.c.extra_metadata,
+                        *(
+                            literal(value, _transactions.c[name].type)
+                            for name, value in columns.items()
+                        ),
+                    ),
+                )
+                .returning(_transactions.c.id)
+                .cte("ledger_transaction")
+            )
+            row = (await self.session.execute(
+                select(inserted.c.id.label("transaction_id"), summary)
+                .select_from(inserted.join(summary, true()))
+            )).one_or_none()
+            if row is None:
+                return None
+            transaction_id = row.transaction_id
+        else:
+            # Same transaction, two statements (no data-modifying CTEs)
+            row = (await self.session.execute(user_update)).one_or_none()
+            if row is None:
+                return None
+            transaction_id = (await self.session.execute(
+                insert(_transactions)
+                .values(
+                    user_id=row.id,
+                    balance_after=row.up_coins,
+                    amount=row.amount,
+                    description=row.description,
+                    extra_metadata=row.extra_metadata,
+                    **columns
+                )
+                .returning(_transactions.c.id)
+            )).scalar_one()
+        
+        values = row._mapping
+        self._sync_loaded_user(values["id"], values)
+        return LedgerEntry(
+            transaction_id=transaction_id,
+            user_id=values["id"],
+            amount=values["amount"],
+            balance_after=values["up_coins"],
+            total_earned=values["total_earned"],
+            total_spent=values["total_spent"],
+            returned={
+                name: value for name, value in values.items()
+                if name in _users.c and name not in LEDGER_USER_COLUMNS
+            },
+        )
+    
+    def _sync_loaded_user(self, user_id: int, values: Mapping) -> None:
+        # The UPDATE bypassed the ORM; refresh an already loaded User
+        # without a lazy load (not possible under asyncio)
+        sync_session = self.session.sync_session
+        user = sync_session.identity_map.get(sync_session.identity_key(User, user_id))
+        if user is None:
+            return
+        for name, value in values.items():
+            if name != "id" and name in _users.c:
+                set_committed_value(user, name, value)
+    
     async def get_user_transactions(
         self,
         user_id: int,
-        limit: int = 50,
-        offset: int = 0
+        limit: int = 50
+    ) -> list[Transaction]:
+        """Get user's latest transactions."""
+        return (await self.get_user_transactions_page(user_id, limit=limit)).items
+    
+    async def get_user_transactions_page(
+        self,
+        user_id: int,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        backward: bool = False
+    ) -> TransactionPage:
+        """
+        Get a page of user's transaction history by keyset.
+        
+        Pages are anchored at (created_at, id) of a row instead of an
+        OFFSET, so each one is a range scan of the (user_id, created_at, id)
+        index and deep pages cost the same as the first. Without a cursor
+        the newest page is returned; otherwise the page after it (older
+        rows) or, with backward=True, the page before it.
+        
+        Raises ValueError for a malformed cursor.
+        """
+        position = None
+        if cursor is not None:
+            position = decode_cursor(cursor)
+            if position is None:
+                raise ValueError("Invalid cursor")
+        
+        key = tuple_(Transaction.created_at, Transaction.id)
+        query = select(Transaction).where(Transaction.user_id == user_id)
+        if backward and position is not None:
+            query = query.where(key > tuple_(*position)).order_by(
+                Transaction.created_at, Transaction.id
+            )
+        else:
+            if position is not None:
+                query = query.where(key < tuple_(*position))
+            query = query.order_by(Transaction.created_at.desc(), Transaction.id.desc())
+        
+        # One extra row tells whether there is anything beyond this page
+        rows = list((await self.session.execute(query.limit(limit + 1))).scalars().all())
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        if backward and position is not None:
+            if not has_more:
+                # Reached the newest rows: show a full first page instead
+                return await self.get_user_transactions_page(user_id, limit)
+            rows.reverse()
+            has_next, has_prev = True, True
+        else:
+            has_next, has_prev = has_more, position is not None
+        
+        if not rows:
+            return TransactionPage(items=[])
+        return TransactionPage(
+            items=rows,
+            next_cursor=encode_cursor(rows[-1].created_at, rows[-1].id) if has_next else None,
+            prev_cursor=encode_cursor(rows[0].created_at, rows[0].id) if has_prev else None,
+        )
+    
+    async def get_user_transactions_between(
+        self,
+        user_id: int,
+        since: datetime,
+        until: datetime,
+        limit: int = 100
     ) -> list[Transaction]:
-        """Get user's transaction history."""
+        """Get user's transactions with since <= created_at < until; scans only those months' partitions."""
         result = await self.session.execute(
             select(Transaction)
-            .where(Transaction.user_id == user_id)
-            .order_by(Transaction.created_at.desc())
+            .where(
+                Transaction.user_id == user_id,
+                Transaction.created_at >= since,
+                Transaction.created_at < until
+            )
+            .order_by(Transaction.created_at.desc(), Transaction.id.desc())
             .limit(limit)
-            .offset(offset)
         )
         return list(result.scalars().all())
     
@@ -1,22 +1,46 @@
 """User repository with business logic."""
-from typing import Optional
+from typing import Any, Awaitable, Callable, Optional
 from datetime import datetime, timedelta
 from decimal import Decimal
 
-from sqlalchemy import select, update, func
+from sqlalchemy import String, case, cast, func, literal, literal_column, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from bot.database.models import User, Transaction
+from bot.database.models import Transaction, User
+from bot.database.repositories.transaction_repository import LedgerEntry, TransactionRepository
+from bot.database.snapshots import UserSnapshot
 from bot.utils.logger import logger
 
 
+# A claim opens this long after the previous one; the streak continues
+# while the previous claim is younger than DAILY_STREAK_WINDOW
+DAILY_CLAIM_COOLDOWN = timedelta(hours=20)
+DAILY_STREAK_WINDOW = timedelta(hours=48)
+
+# Columns the website owns, applied by upsert_website_users
+WEBSITE_USER_COLUMNS = ("website_user_id", "username", "first_name", "last_name")
+WEBSITE_MEMBERSHIP_COLUMNS = ("is_member", "membership_level", "joined_at")
+
+# Called with (session, user_id, {counter: (old, new)}) in the transaction
+# that changed the counters
+CountersChanged = Callable[[AsyncSession, int, dict[str, tuple]], Awaitable[Any]]
+
+
 class UserRepository:
     """Repository for user operations."""
     
+    # Set at startup (achievement_engine.evaluate); None until then
+    on_counters_changed: Optional[CountersChanged] = None
+    
     def __init__(self, session: AsyncSession):
         self.session = session
     
+    async def _counters_changed(self, user_id: int, changes: dict[str, tuple]) -> None:
+        if self.on_counters_changed is not None:
+            await self.on_counters_changed(self.session, user_id, changes)
+    
     async def get_by_id(self, user_id: int) -> Optional[User]:
         """Get user by Telegram ID with referrals loaded."""
         result = await self.session.execute(
@@ -32,6 +56,21 @@ class UserRepository:
         
         return user
     
+    async def get_updated_at(self, user_id: int) -> Optional[datetime]:
+        """Get only the user's updated_at (cheap freshness check for ETags)."""
+        result = await self.session.execute(
+            select(User.updated_at).where(User.id == user_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_snapshot(self, user_id: int) -> Optional[UserSnapshot]:
+        """Get immutable user snapshot with a column-only query (no ORM identity)."""
+        result = await self.session.execute(
+            select(*UserSnapshot.columns()).where(User.id == user_id)
+        )
+        row = result.one_or_none()
+        return UserSnapshot(*row) if row else None
+
     async def get_by_referral_code(self, code: str) -> Optional[User]:
         """Get user by referral code."""
         result = await self.session.execute(
@@ -64,6 +103,62 @@ class UserRepository:
         )
         return await self.get_by_id(user_id)
     
+    async def upsert_website_users(self, rows: list[dict], columns: tuple[str, ...]) -> set[int]:
+        """
+        Apply website profile or membership changes in one statement.
+        
+        Rows carry id and `columns` (WEBSITE_USER_COLUMNS or
+        WEBSITE_MEMBERSHIP_COLUMNS); a None value keeps the stored one and
+        the last row per user wins. Users who never started the bot are
+        skipped: /start creates them, with their referrer. Returns the ids
+        updated.
+        """
+        if not rows:
+            return set()
+        latest = {row["id"]: row for row in rows}
+        # The proposed row must pass NOT NULL checks although it always
+        # conflicts: carry the stored referral code
+        codes = dict((await self.session.execute(
+            select(User.id, User.referral_code).where(User.id.in_(latest))
+        )).all())
+        values = [
+            {**row, "referral_code": codes[user_id]}
+            for user_id, row in latest.items()
+            if user_id in codes
+        ]
+        if not values:
+            return set()
+        
+        if self.session.bind.dialect.name == "postgresql":
+            insert = postgresql.insert
+        else:
+            insert = sqlite.insert
+        now = datetime.utcnow()
+        statement = insert(User).values(values)
+        statement = statement.on_conflict_do_update(
+            index_elements=["id"],
+            set_={
+                **{
+                    name: func.coalesce(statement.excluded[name], User.__table__.c[name])
+                    for name in columns
+                },
+                "is_synced": True,
+                "last_sync_at": now,
+                "updated_at": now,
+            },
+        ).returning(User.id)
+        result = await self.session.execute(statement)
+        return set(result.scalars().all())
+    
+    async def set_qr_code_url(self, user_id: int, value: Optional[str]) -> None:
+        """Store the QR file reference (not profile data: updated_at is kept)."""
+        await self.session.execute(
+            update(User)
+            .where(User.id == user_id)
+            # Overrides the column's onupdate, which would change the profile ETag
+            .values(qr_code_url=value, updated_at=User.updated_at)
+        )
+    
     async def add_coins(
         self,
         user_id: int,
@@ -71,34 +166,25 @@ class UserRepository:
         transaction_type: str,
         description: str,
         metadata: Optional[dict] = None
-    ) -> tuple[User, Transaction]:
+    ) -> LedgerEntry:
         """Add UP Coins to user balance with transaction record."""
-        user = await self.get_by_id(user_id)
-        if not user:
+        entry = await TransactionRepository(self.session).record(
+            user_id, amount, transaction_type, description, metadata
+        )
+        if entry is None:
             raise ValueError(f"User {user_id} not found")
-        
-        user.up_coins += amount
-        user.total_earned += amount
-        
-        transaction = Transaction(
-            user_id=user_id,
-            type=transaction_type,
-            amount=amount,
-            balance_after=user.up_coins,
-            description=description,
-            extra_metadata=metadata or {}
+        await self._counters_changed(
+            user_id, {"up_coins": (entry.balance_after - amount, entry.balance_after)}
         )
-        self.session.add(transaction)
-        await self.session.flush()
         
         logger.info(
             "coins_added",
             user_id=user_id,
             amount=float(amount),
-            new_balance=float(user.up_coins)
+            new_balance=float(entry.balance_after)
         )
         
-        return user, transaction
+        return entry
     
     async def deduct_coins(
         self,
@@ -107,85 +193,116 @@ class UserRepository:
         transaction_type: str,
         description: str,
         metadata: Optional[dict] = None
-    ) -> tuple[User, Transaction]:
+    ) -> LedgerEntry:
         """Deduct UP Coins from user balance."""
-        user = await self.get_by_id(user_id)
-        if not user:
-            raise ValueError(f"User {user_id} not found")
-        
-        if user.up_coins < amount:
-            raise ValueError("Insufficient balance")
-        
-        user.up_coins -= amount
-        user.total_spent += amount
-        
-        transaction = Transaction(
-            user_id=user_id,
-            type=transaction_type,
-            amount=-amount,
-            balance_after=user.up_coins,
-            description=description,
-            extra_metadata=metadata or {}
+        entry = await TransactionRepository(self.session).record(
+            user_id, -amount, transaction_type, description, metadata
         )
-        self.session.add(transaction)
-        await self.session.flush()
+        if entry is None:
+            if await self.get_updated_at(user_id) is None:
+                raise ValueError(f"User {user_id} not found")
+            raise ValueError("Insufficient balance")
         
         logger.info(
             "coins_deducted",
             user_id=user_id,
             amount=float(amount),
-            new_balance=float(user.up_coins)
+            new_balance=float(entry.balance_after)
         )
         
-        return user, transaction
+        return entry
     
     async def claim_daily_bonus(self, user_id: int) -> tuple[bool, Optional[Decimal]]:
-        """Claim daily bonus and update streak."""
-        user = await self.get_by_id(user_id)
-        if not user:
-            return False, None
+        """
+        Claim daily bonus and update streak.
         
+        One conditional UPDATE: it only matches while the last claim is
+        20+ hours old, computes the streak (kept if the previous claim is
+        under 48 hours old) and the bonus from it, and feeds the
+        daily_bonus transaction in the same statement. Of concurrent
+        claims exactly one matches; the rest see the new last_daily_claim.
+        """
         now = datetime.utcnow()
+        users = User.__table__
         
-        # Check if already claimed today
-        if user.last_daily_claim:
-            time_since_claim = now - user.last_daily_claim
-            if time_since_claim < timedelta(hours=20):
-                return False, None
-        
-        # Update streak
-        if user.last_daily_claim:
-            time_diff = now - user.last_daily_claim
-            if time_diff < timedelta(hours=48):
-                user.daily_streak += 1
-            else:
-                user.daily_streak = 1
-        else:
-            user.daily_streak = 1
+        streak = case(
+            (users.c.last_daily_claim >= now - DAILY_STREAK_WINDOW, users.c.daily_streak + 1),
+            else_=1
+        )
+        
+        def bonus(days):
+            # 10 + 5 per streak day, up to 7 days
+            return Decimal("10") + Decimal("5") * case((days > 7, 7), else_=days)
         
-        # Calculate bonus based on streak
-        base_bonus = Decimal("10")
-        streak_bonus = Decimal(min(user.daily_streak, 7)) * Decimal("5")
-        total_bonus = base_bonus + streak_bonus
+        if self.session.bind.dialect.name == "postgresql":
+            json_object = func.jsonb_build_object
+        else:
+            json_object = func.json_object
+        metadata_type = Transaction.__table__.c.extra_metadata.type
         
-        user.last_daily_claim = now
-        await self.add_coins(
-            user_id,
-            total_bonus,
-            "daily_bonus",
-            f"Daily bonus (Streak: {user.daily_streak})",
-            {"streak": user.daily_streak}
+        claim = (
+            update(users)
+            .where(
+                users.c.id == user_id,
+                or_(
+                    users.c.last_daily_claim.is_(None),
+                    users.c.last_daily_claim < now - DAILY_CLAIM_COOLDOWN
+                )
+            )
+            .values(
+                daily_streak=streak,
+                last_daily_claim=now,
+                up_coins=users.c.up_coins + bonus(streak),
+                total_earned=users.c.total_earned + bonus(streak),
+                updated_at=now,
+            )
+            .returning(
+                users.c.daily_streak,
+                users.c.last_daily_claim,
+                # RETURNING sees the updated row, i.e. the new streak
+                cast(bonus(users.c.daily_streak), Transaction.__table__.c.amount.type).label("amount"),
+                (
+                    literal("Daily bonus (Streak: ")
+                    + cast(users.c.daily_streak, String)
+                    + literal(")")
+                ).label("description"),
+                # Inline key: a bind parameter in a variadic "any" call has no type
+                json_object(
+                    literal_column("'streak'"), users.c.daily_streak, type_=metadata_type
+                ).label("extra_metadata"),
+            )
+        )
+        entry = await TransactionRepository(self.session).record_update(
+            claim, "daily_bonus", now
         )
+        if entry is None:
+            return False, None
+        streak = entry.returned["daily_streak"]
+        await self._counters_changed(user_id, {
+            "daily_streak": (streak - 1, streak),
+            "up_coins": (entry.balance_after - entry.amount, entry.balance_after),
+        })
         
-        return True, total_bonus
+        logger.info(
+            "coins_added",
+            user_id=user_id,
+            amount=float(entry.amount),
+            new_balance=float(entry.balance_after)
+        )
+        return True, entry.amount
     
     async def increment_referral_count(self, user_id: int) -> User:
         """Increment referral count."""
-        await self.session.execute(
+        referral_count = (await self.session.execute(
             update(User)
             .where(User.id == user_id)
             .values(referral_count=User.referral_count + 1)
-        )
+            .returning(User.referral_count)
+        )).scalar_one_or_none()
+        if referral_count is not None:
+            await self._counters_changed(
+                user_id, {"referrals": (referral_count - 1, referral_count)}
+            )
         return await self.get_by_id(user_id)
     
     async def get_top_referrers(self, limit: int = 10) -> list[User]:
@@ -0,0 +1,48 @@
+"""Website webhook event repository."""
+from datetime import datetime
+
+from sqlalchemy import delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.database.models import WebsiteWebhookEvent
+
+
+class WebhookEventRepository:
+    """Repository for the website webhook dedupe table."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def record(self, events: list[tuple[str, str]]) -> set[str]:
+        """
+        Insert (event_id, type) pairs in one statement.
+
+        Ids already recorded are skipped by the primary key; returns only
+        the ids inserted now, i.e. the events not applied before.
+        """
+        if not events:
+            return set()
+
+        if self.session.bind.dialect.name == "postgresql":
+            insert = postgresql.insert
+        else:
+            insert = sqlite.insert
+        now = datetime.utcnow()
+        result = await self.session.execute(
+            insert(WebsiteWebhookEvent)
+            .values([
+                {"event_id": event_id, "type": event_type, "received_at": now}
+                for event_id, event_type in events
+            ])
+            .on_conflict_do_nothing(index_elements=["event_id"])
+            .returning(WebsiteWebhookEvent.event_id)
+        )
+        return set(result.scalars().all())
+
+    async def prune(self, before: datetime) -> int:
+        """Delete events received before `before`; returns the count."""
+        result = await self.session.execute(
+            delete(WebsiteWebhookEvent).where(WebsiteWebhookEvent.received_at < before)
+        )
+        return result.rowcount
@@ -1,6 +1,6 @@
 """Database session management with connection pooling."""
-from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from typing import AsyncGenerator, Callable
 
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -11,7 +11,13 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.pool import NullPool, AsyncAdaptedQueuePool
 
 from bot.config import settings
+from bot.database import diagnostics
 from bot.utils.logger import logger
+from bot.utils.metrics import db_pool_connections
+
+
+# Zero-argument callable returning a session context, e.g. db_manager.session
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
 
 
 class DatabaseManager:
@@ -35,6 +41,14 @@ class DatabaseManager:
             pool_pre_ping=True,  # Test connections before using
         )
         
+        # Query timing, slow-query/N+1 diagnostics and pool usage metrics
+        sync_engine = self._engine.sync_engine
+        diagnostics.install(sync_engine)
+        pool = sync_engine.pool
+        db_pool_connections.labels("checked_out").set_function(pool.checkedout)
+        db_pool_connections.labels("idle").set_function(pool.checkedin)
+        db_pool_connections.labels("overflow").set_function(lambda: max(pool.overflow(), 0))
+        
         self._session_factory = async_sessionmaker(
             bind=self._engine,
             class_=AsyncSession,
@@ -63,25 +77,11 @@ class DatabaseManager:
             await session.commit()
         except Exception as e:
             await session.rollback()
-            
-            # CRITICAL: Print full error to stdout
-            print("=" * 60)
-            print("\u274c DATABASE SESSION ERROR")
-            print("=" * 60)
-            print(f"Error Type: {type(e).__name__}")
-            print(f"Error Message: {str(e)}")
-            print()
-            print("Full Traceback:")
-            import traceback
-            traceback.print_exc()
-            print("=" * 60)
-            
-            # Also log structured
             logger.error(
                 "database_session_error", 
                 error=str(e),
                 error_type=type(e).__name__,
-                traceback=traceback.format_exc()
+                exc_info=True
             )
             raise
         finally:
@@ -0,0 +1,42 @@
+"""Immutable, session-independent views of database rows."""
+from dataclasses import dataclass, fields
+from decimal import Decimal
+from typing import Optional
+
+from telegram.ext import ContextTypes
+
+from bot.database.models import User
+
+
+# context.user_data key; set by the auth middlewares for the current update only
+USER_SNAPSHOT_KEY = "user_snapshot"
+
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    """The user fields handlers read, loaded with a column-only query."""
+
+    id: int
+    username: Optional[str]
+    first_name: Optional[str]
+    is_member: bool
+    membership_level: str
+    up_coins: Decimal
+    referral_code: Optional[str]
+    is_banned: bool
+    ban_reason: Optional[str]
+
+    @classmethod
+    def columns(cls) -> list:
+        """User columns to select, in field order."""
+        return [getattr(User, field.name) for field in fields(cls)]
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        """Build from an already loaded ORM instance (no extra query)."""
+        return cls(**{field.name: getattr(user, field.name) for field in fields(cls)})
+
+
+def get_user_snapshot(context: ContextTypes.DEFAULT_TYPE) -> Optional[UserSnapshot]:
+    """Snapshot of the user behind the current update, if authenticated."""
+    return context.user_data.get(USER_SNAPSHOT_KEY)
@@ -1,4 +1,5 @@
 """Admin panel handlers."""
+import asyncio
 from decimal import Decimal
 from telegram import Update
 from telegram.ext import ContextTypes, CommandHandler, CallbackQueryHandler
@@ -8,6 +9,10 @@ from bot.keyboards.inline import kb
 from bot.database.session import db_manager
 from bot.database.repositories.user_repository import UserRepository
 from bot.database.models import User
+from bot.jobs.export import EXPORT_SPECS, exporter
+from bot.jobs.ticket_qr import TicketQRBatchJob
+from bot.services.achievements import achievement_engine
+from bot.services.reports import build_report_from_export, format_report, render_report_png
 from bot.utils.decorators import admin_only, handle_errors
 from bot.utils.formatters import fmt
 from bot.utils.logger import logger
@@ -82,7 +87,8 @@ async def admin_users_callback(update: Update, context: ContextTypes.DEFAULT_TYP
         "`/ban [user\\_id]` \\- заблокировать пользователя\n"
         "`/unban [user\\_id]` \\- разблокировать\n"
         "`/makemember [user\\_id]` \\- сделать членом клуба\n"
-        "`/export` \\- экспорт базы пользователей\n\n"
+        "`/export [таблицы] [full]` \\- выгрузка для аналитики\n"
+        "`/achievements` \\- перечитать и выдать достижения всем\n\n"
         "_Используйте команды в чате с ботом\\._"
     )
     
@@ -93,6 +99,44 @@ async def admin_users_callback(update: Update, context: ContextTypes.DEFAULT_TYP
     )
 
 
+@admin_only
+@handle_errors
+async def admin_analytics_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Referral and economy report over the analytics export."""
+    query = update.callback_query
+    await query.answer()
+    
+    await query.edit_message_text("⏳ Собираем аналитику...")
+    
+    # Bring the export up to date (incremental, usually a few new rows)
+    if not exporter.running:
+        await exporter.run(["users", "transactions"])
+    
+    try:
+        report = await asyncio.to_thread(build_report_from_export, str(exporter.directory))
+    except RuntimeError as e:
+        logger.warning("admin_analytics_unavailable", error=str(e))
+        await query.edit_message_text(
+            "❌ Аналитика недоступна: не установлены numpy/pyarrow",
+            reply_markup=kb.back_button("admin_back")
+        )
+        return
+    
+    chart = await asyncio.to_thread(render_report_png, report)
+    await query.message.reply_photo(photo=chart)
+    await query.edit_message_text(
+        format_report(report),
+        reply_markup=kb.back_button("admin_back")
+    )
+    
+    logger.info(
+        "admin_analytics_generated",
+        admin_id=query.from_user.id,
+        users=report.users,
+        transactions=report.transactions
+    )
+
+
 @admin_only
 @handle_errors
 async def admin_broadcast_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -180,7 +224,7 @@ async def addcoins_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         user_repo = UserRepository(session)
         
         try:
-            user, transaction = await user_repo.add_coins(
+            entry = await user_repo.add_coins(
                 user_id,
                 amount,
                 "admin_grant",
@@ -190,7 +234,7 @@ async def addcoins_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -
             
             await update.message.reply_text(
                 f"✅ Начислено {fmt.format_coins(amount)} пользователю {user_id}\n"
-                f"Новый баланс: {fmt.format_coins(user.up_coins)}"
+                f"Новый баланс: {fmt.format_coins(entry.balance_after)}"
             )
             
             logger.info(
@@ -286,6 +330,101 @@ async def admin_back_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
     )
 
 
+@admin_only
+@handle_errors
+async def ticketqr_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Pre-generate QR images for all active tickets of an event."""
+    if len(context.args) < 1:
+        await update.message.reply_text("Использование: /ticketqr [event_id]")
+        return
+    
+    try:
+        event_id = int(context.args[0])
+    except ValueError:
+        await update.message.reply_text("❌ Неверные параметры")
+        return
+    
+    await update.message.reply_text(f"⏳ Генерируем QR-коды билетов мероприятия {event_id}...")
+    
+    result = await TicketQRBatchJob().run(event_id)
+    if result.skipped:
+        await update.message.reply_text("❌ API_PUBLIC_URL не задан: ссылки на QR некуда вести")
+        return
+    
+    await update.message.reply_text(
+        f"✅ Готово: {result.tickets} билетов\n"
+        f"Сгенерировано: {result.rendered}, уже были: {result.reused}\n"
+        f"Время: {result.duration_ms / 1000:.1f} с"
+    )
+    
+    logger.info(
+        "admin_ticket_qr_generated",
+        admin_id=update.effective_user.id,
+        event_id=event_id,
+        tickets=result.tickets
+    )
+
+
+@admin_only
+@handle_errors
+async def export_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Export transactions, users and tickets for offline analytics."""
+    full = "full" in context.args
+    tables = [arg for arg in context.args if arg != "full"]
+    unknown = [table for table in tables if table not in EXPORT_SPECS]
+    if unknown:
+        await update.message.reply_text(
+            f"Использование: /export [{' | '.join(EXPORT_SPECS)}] [full]"
+        )
+        return
+    
+    if exporter.running:
+        await update.message.reply_text("⏳ Выгрузка уже выполняется")
+        return
+    
+    await update.message.reply_text("⏳ Выгружаем данные...")
+    
+    result = await exporter.run(tables or None, full=full)
+    
+    text = f"✅ Выгрузка завершена ({result.file_format})\n\n"
+    for table in result.tables:
+        text += f"{table.table}: {table.rows} строк"
+        if table.rows:
+            text += f", {table.rows_per_second:,.0f} строк/с"
+        text += "\n"
+    text += f"\nВремя: {result.duration_ms / 1000:.1f} с"
+    
+    await update.message.reply_text(text)
+    
+    logger.info(
+        "admin_export_completed",
+        admin_id=update.effective_user.id,
+        full=full,
+        rows=result.rows
+    )
+
+
+@admin_only
+@handle_errors
+async def achievements_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Reload achievement rules and award them to all users."""
+    await update.message.reply_text("⏳ Проверяем достижения всех пользователей...")
+    
+    result = await achievement_engine.backfill()
+    
+    await update.message.reply_text(
+        f"✅ Готово: {result.users} пользователей\n"
+        f"Выдано достижений: {result.awarded}, наград: {fmt.format_coins(result.coins)}\n"
+        f"Время: {result.duration_ms / 1000:.1f} с"
+    )
+    
+    logger.info(
+        "admin_achievements_backfilled",
+        admin_id=update.effective_user.id,
+        awarded=result.awarded
+    )
+
+
 # Register handlers
 def register_admin_handlers(application):
     """Register admin-related handlers."""
@@ -293,8 +432,12 @@ def register_admin_handlers(application):
     application.add_handler(CommandHandler("userinfo", userinfo_command))
     application.add_handler(CommandHandler("addcoins", addcoins_command))
     application.add_handler(CommandHandler("broadcast", broadcast_command))
+    application.add_handler(CommandHandler("ticketqr", ticketqr_command))
+    application.add_handler(CommandHandler("export", export_command))
+    application.add_handler(CommandHandler("achievements", achievements_command))
     
     application.add_handler(CallbackQueryHandler(admin_stats_callback, pattern="^admin_stats$"))
     application.add_handler(CallbackQueryHandler(admin_users_callback, pattern="^admin_users$"))
+    application.add_handler(CallbackQueryHandler(admin_analytics_callback, pattern="^admin_analytics$"))
     application.add_handler(CallbackQueryHandler(admin_broadcast_callback, pattern="^admin_broadcast$"))
     application.add_handler(CallbackQueryHandler(admin_back_callback, pattern="^admin_back$"))
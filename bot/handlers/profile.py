@@ -7,9 +7,11 @@ from telegram.ext import ContextTypes, CallbackQueryHandler, CommandHandler, Mes
 
 from bot.keyboards.inline import kb
 from bot.database.session import db_manager
+from bot.services.achievements import METRIC_COLUMNS
 from bot.services.user_service import UserService
 from bot.services.qr_generator import QRCodeGenerator
 from bot.services.website_sync import WebsiteSyncService
+from bot.database.repositories.achievement_repository import AchievementRepository
 from bot.database.repositories.user_repository import UserRepository
 from bot.database.repositories.transaction_repository import TransactionRepository
 from bot.utils.decorators import handle_errors
@@ -125,23 +127,35 @@ async def profile_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -
 
 @handle_errors
 async def transactions_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Show transaction history."""
+    """Show transaction history, 10 operations per page."""
     query = update.callback_query
     
+    # "transactions", "transactions:n:<cursor>" (older) or "transactions:p:<cursor>" (newer)
+    _, direction, cursor = (query.data.split(":", 2) + ["", ""])[:3]
+    
     async with db_manager.session() as session:
         transaction_repo = TransactionRepository(session)
-        transactions = await transaction_repo.get_user_transactions(
-            query.from_user.id,
-            limit=10
-        )
+        try:
+            page = await transaction_repo.get_user_transactions_page(
+                query.from_user.id,
+                limit=10,
+                cursor=cursor or None,
+                backward=direction == "p"
+            )
+        except ValueError:
+            page = None
+        if page is None or (cursor and not page.items):
+            # Stale or tampered button: start over from the newest page
+            page = await transaction_repo.get_user_transactions_page(query.from_user.id, limit=10)
         
-        if not transactions:
+        if not page.items:
             text = "📊 *ИСТОРИЯ ТРАНЗАКЦИЙ*\n\nУ вас пока нет транзакций\\."
         else:
             text = "📊 *ИСТОРИЯ ТРАНЗАКЦИЙ*\n\n"
-            text += "Последние 10 операций:\n\n"
+            if page.prev_cursor is None:
+                text += "Последние 10 операций:\n\n"
             
-            for trans in transactions:
+            for trans in page.items:
                 trans_dict = {
                     "amount": str(trans.amount),
                     "description": trans.description,
@@ -153,7 +167,7 @@ async def transactions_callback(update: Update, context: ContextTypes.DEFAULT_TY
             update,
             context,
             text,
-            reply_markup=kb.back_button("profile")
+            reply_markup=kb.transactions_nav(page.next_cursor, page.prev_cursor)
         )
 
 
@@ -163,30 +177,21 @@ async def achievements_callback(update: Update, context: ContextTypes.DEFAULT_TY
     query = update.callback_query
     
     async with db_manager.session() as session:
-        user_repo = UserRepository(session)
-        user = await user_repo.get_by_id(query.from_user.id)
+        user = await UserRepository(session).get_by_id(query.from_user.id)
+        achievement_repo = AchievementRepository(session)
+        achievements = await achievement_repo.get_active()
+        earned = await achievement_repo.get_user_achievement_ids(user.id)
         
         text = "🎯 *ДОСТИЖЕНИЯ*\n\n"
         
-        if user.total_events_attended >= 1:
-            text += "✅ Первая вечеринка\n"
-        if user.total_events_attended >= 5:
-            text += "✅ Завсегдатай \\(5\\+ событий\\)\n"
-        if user.total_events_attended >= 10:
-            text += "✅ Легенда клуба \\(10\\+ событий\\)\n"
-        
-        if user.referral_count >= 3:
-            text += "✅ Амбассадор \\(3\\+ приглашения\\)\n"
-        if user.referral_count >= 8:
-            text += "✅ Король рефералов \\(8\\+ приглашений\\)\n"
-        
-        if user.daily_streak >= 7:
-            text += "✅ Неделя подряд\n"
-        if user.daily_streak >= 30:
-            text += "✅ Месяц преданности\n"
-        
-        if user.up_coins >= 1000:
-            text += "✅ Богач \\(1000\\+ UP Coins\\)\n"
+        # Awarded by the achievement engine; locked ones show progress
+        for achievement in achievements:
+            title = fmt.escape_markdown(achievement.title)
+            if achievement.id in earned:
+                text += f"✅ {title}\n"
+            elif achievement.requirement_type in METRIC_COLUMNS:
+                progress = getattr(user, METRIC_COLUMNS[achievement.requirement_type].key) or 0
+                text += f"🔒 {title} \\({int(progress)}/{achievement.requirement_value}\\)\n"
         
         text += "\n_Продолжай участвовать в жизни клуба для новых достижений\\!_"
         
@@ -205,11 +210,11 @@ async def stats_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     
     async with db_manager.session() as session:
         user_repo = UserRepository(session)
-        transaction_repo = TransactionRepository(session)
         
+        # Lifetime totals are kept on the user with every transaction
         user = await user_repo.get_by_id(query.from_user.id)
-        total_earned = await transaction_repo.get_user_total_earned(query.from_user.id)
-        total_spent = await transaction_repo.get_user_total_spent(query.from_user.id)
+        total_earned = user.total_earned
+        total_spent = user.total_spent
         
         member_days = (datetime.utcnow() - user.created_at).days if user.created_at else 0
         
@@ -256,7 +261,7 @@ async def profile_qr_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
             
             # Generate QR code for the authentication URL
             qr_generator = QRCodeGenerator()
-            qr_image = qr_generator.generate_access_code_qr(auth_url)
+            qr_image = await qr_generator.generate_access_code_qr(auth_url)
             
             caption = (
                 "📱 *Ваш QR\\-код для входа*\n\n"
@@ -322,16 +327,9 @@ async def daily_bonus_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         # Delete command for cleaner chat
         await NavigationManager.delete_user_command(update)
         
-        print(f"[DEBUG] daily_bonus_command called for user {update.effective_user.id}")
-        
         async with db_manager.session() as session:
-            print(f"[DEBUG] Database session created for daily bonus")
-            
             user_repo = UserRepository(session)
-            print(f"[DEBUG] UserRepository initialized")
-            
             success, bonus = await user_repo.claim_daily_bonus(update.effective_user.id)
-            print(f"[DEBUG] Bonus claim result: success={success}, bonus={bonus}")
             
             if success:
                 user = await user_repo.get_by_id(update.effective_user.id)
@@ -349,17 +347,12 @@ async def daily_bonus_command(update: Update, context: ContextTypes.DEFAULT_TYPE
             
             logger.info("daily_bonus_command", user_id=update.effective_user.id, success=success)
     except Exception as e:
-        print("=" * 60)
-        print(f"❌ daily_bonus_error for user {update.effective_user.id}")
-        print("=" * 60)
-        print(f"Error Type: {type(e).__name__}")
-        print(f"Error Message: {str(e)}")
-        print()
-        import traceback
-        traceback.print_exc()
-        print("=" * 60)
-        
-        logger.error("daily_bonus_error", error=str(e), user_id=update.effective_user.id)
+        logger.error(
+            "daily_bonus_error",
+            error=str(e),
+            user_id=update.effective_user.id,
+            exc_info=True
+        )
         await NavigationManager.send_or_edit(
             update,
             context,
@@ -379,16 +372,9 @@ async def profile_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         # Delete user's command message for cleaner chat
         await NavigationManager.delete_user_command(update)
         
-        print(f"[DEBUG] profile_command called for user {update.effective_user.id}")
-        
         async with db_manager.session() as session:
-            print(f"[DEBUG] Database session created")
-            
             user_service = UserService(session)
-            print(f"[DEBUG] UserService initialized")
-            
             profile = await user_service.get_user_profile(update.effective_user.id)
-            print(f"[DEBUG] Profile fetched: {profile is not None}")
             
             if not profile:
                 text = "❌ Профиль не найден\\. Используйте /start"
@@ -433,17 +419,12 @@ async def profile_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             
             logger.info("profile_command", user_id=update.effective_user.id)
     except Exception as e:
-        print("=" * 60)
-        print(f"❌ profile_command ERROR for user {update.effective_user.id}")
-        print("=" * 60)
-        print(f"Error Type: {type(e).__name__}")
-        print(f"Error Message: {str(e)}")
-        print()
-        import traceback
-        traceback.print_exc()
-        print("=" * 60)
-        
-        logger.error("profile_command_error", error=str(e), user_id=update.effective_user.id)
+        logger.error(
+            "profile_command_error",
+            error=str(e),
+            user_id=update.effective_user.id,
+            exc_info=True
+        )
         await NavigationManager.send_or_edit(
             update,
             context,
@@ -464,7 +445,7 @@ def register_profile_handlers(application):
     
     # Callback handlers
     application.add_handler(CallbackQueryHandler(profile_callback, pattern="^profile$"))
-    application.add_handler(CallbackQueryHandler(transactions_callback, pattern="^transactions$"))
+    application.add_handler(CallbackQueryHandler(transactions_callback, pattern=r"^transactions(:[np]:[\w-]+)?$"))
     application.add_handler(CallbackQueryHandler(achievements_callback, pattern="^achievements$"))
     application.add_handler(CallbackQueryHandler(stats_callback, pattern="^stats$"))
     application.add_handler(CallbackQueryHandler(profile_qr_callback, pattern="^profile_qr$"))
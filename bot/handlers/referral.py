@@ -1,10 +1,12 @@
 """Referral system handlers."""
 from telegram import Update
+from telegram.error import BadRequest
 from telegram.ext import ContextTypes, CallbackQueryHandler, CommandHandler, MessageHandler, filters
 
 from bot.keyboards.inline import kb
 from bot.database.session import db_manager
 from bot.services.referral_service import ReferralService
+from bot.services.qr_cache import file_id_for, make_file_ref
 from bot.services.qr_generator import QRCodeGenerator
 from bot.database.repositories.user_repository import UserRepository
 from bot.utils.decorators import handle_errors
@@ -94,31 +96,48 @@ async def referral_stats_callback(update: Update, context: ContextTypes.DEFAULT_
 
 @handle_errors
 async def referral_qr_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Generate referral QR code."""
+    """Send referral QR code, reusing the uploaded photo when possible."""
     query = update.callback_query
     await query.answer("Генерируем QR-код...")
+    user_id = query.from_user.id
     
     async with db_manager.session() as session:
-        user_repo = UserRepository(session)
-        user = await user_repo.get_by_id(query.from_user.id)
-        
-        qr_generator = QRCodeGenerator()
-        qr_image = qr_generator.generate_referral_qr(user.referral_code)
-        
-        caption = (
-            "📱 *QR\\-код для приглашений*\n\n"
-            f"Код: `{fmt.escape_markdown(user.referral_code)}`\n\n"
-            "_Покажите этот QR\\-код друзьям для быстрой регистрации\\!_"
-        )
-        
-        # QR sends as photo, navigation stays intact
-        await query.message.reply_photo(
-            photo=qr_image,
-            caption=caption,
-            parse_mode="MarkdownV2"
+        user = await UserRepository(session).get_by_id(user_id)
+        referral_code, stored_ref = user.referral_code, user.qr_code_url
+    
+    qr_generator = QRCodeGenerator()
+    caption = (
+        "📱 *QR\\-код для приглашений*\n\n"
+        f"Код: `{fmt.escape_markdown(referral_code)}`\n\n"
+        "_Покажите этот QR\\-код друзьям для быстрой регистрации\\!_"
+    )
+    
+    # Already uploaded: no rendering, no upload
+    file_id = file_id_for(stored_ref, qr_generator.referral_qr_key(referral_code))
+    if file_id:
+        try:
+            await query.message.reply_photo(photo=file_id, caption=caption, parse_mode="MarkdownV2")
+            logger.info("referral_qr_sent", user_id=user_id, source="file_id")
+            return
+        except BadRequest as e:
+            # file_ids are per bot; re-upload if this one is no longer valid
+            logger.warning("referral_qr_file_id_rejected", user_id=user_id, error=str(e))
+    
+    qr_image, key = await qr_generator.referral_qr(referral_code)
+    
+    # QR sends as photo, navigation stays intact
+    message = await query.message.reply_photo(
+        photo=qr_image,
+        caption=caption,
+        parse_mode="MarkdownV2"
+    )
+    
+    async with db_manager.session() as session:
+        await UserRepository(session).set_qr_code_url(
+            user_id, make_file_ref(key, message.photo[-1].file_id)
         )
-        
-        logger.info("referral_qr_sent", user_id=query.from_user.id)
+    
+    logger.info("referral_qr_sent", user_id=user_id, source="upload")
 
 
 @handle_errors
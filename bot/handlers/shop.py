@@ -5,8 +5,8 @@ from telegram.ext import ContextTypes, CallbackQueryHandler, MessageHandler, fil
 
 from bot.keyboards.inline import kb
 from bot.database.session import db_manager
-from bot.services.website_sync import WebsiteSyncService
 from bot.services.referral_service import ReferralService
+from bot.database.repositories.event_repository import EventRepository
 from bot.database.repositories.user_repository import UserRepository
 from bot.utils.decorators import handle_errors
 from bot.utils.formatters import fmt
@@ -51,8 +51,8 @@ async def shop_tickets_callback(update: Update, context: ContextTypes.DEFAULT_TY
     await query.answer()
     
     async with db_manager.session() as session:
-        sync_service = WebsiteSyncService(session)
-        events = await sync_service.get_upcoming_events(limit=1)
+        # Mirrored from the website by the inbound sync job
+        events = await EventRepository(session).get_upcoming_events(limit=1)
         
         if not events:
             text = (
@@ -69,12 +69,12 @@ async def shop_tickets_callback(update: Update, context: ContextTypes.DEFAULT_TY
             return
         
         event = events[0]
-        event_date = fmt.escape_markdown(event.get("event_date", "TBA"))
+        event_date = fmt.escape_markdown(fmt.format_date(event.event_date))
         
         text = (
-            f"🎟️ *Билеты на: {fmt.escape_markdown(event['title'])}*\n\n"
+            f"🎟️ *Билеты на: {fmt.escape_markdown(event.title)}*\n\n"
             f"📅 Дата: {event_date}\n"
-            f"📍 Место: {fmt.escape_markdown(event.get('location', 'TBA'))}\n\n"
+            f"📍 Место: {fmt.escape_markdown(event.location)}\n\n"
             "*Типы билетов:*\n\n"
             "🎫 *Standard* \\- 500₽\n"
             "• Вход на мероприятие\n"
@@ -147,9 +147,10 @@ async def ticket_type_callback(update: Update, context: ContextTypes.DEFAULT_TYP
         )
         
         # Store selection in context
+        # Primitive values only: ticket_selection is persisted (see bot/utils/persistence.py)
         context.user_data["ticket_selection"] = {
             "type": ticket_type,
-            "price": final_price
+            "price": str(final_price)
         }
         
         await NavigationManager.send_or_edit(
@@ -208,8 +209,7 @@ async def my_purchases_callback(update: Update, context: ContextTypes.DEFAULT_TY
     query = update.callback_query
     
     async with db_manager.session() as session:
-        sync_service = WebsiteSyncService(session)
-        tickets = await sync_service.get_user_tickets(query.from_user.id)
+        tickets = await EventRepository(session).get_user_tickets(query.from_user.id, limit=5)
         
         if not tickets:
             text = (
@@ -220,12 +220,12 @@ async def my_purchases_callback(update: Update, context: ContextTypes.DEFAULT_TY
         else:
             text = "🎟️ *МОИ БИЛЕТЫ*\n\n"
             
-            for ticket in tickets[:5]:
-                status_emoji = "✅" if ticket["status"] == "active" else "❌"
+            for ticket in tickets:
+                status_emoji = "✅" if ticket.status == "active" else "❌"
                 text += (
-                    f"{status_emoji} *{fmt.escape_markdown(ticket['event_name'])}*\n"
-                    f"Тип: {fmt.escape_markdown(ticket['type'])}\n"
-                    f"Дата: {fmt.escape_markdown(ticket['event_date'])}\n\n"
+                    f"{status_emoji} *{fmt.escape_markdown(ticket.event.title)}*\n"
+                    f"Тип: {fmt.escape_markdown(ticket.ticket_type)}\n"
+                    f"Дата: {fmt.escape_markdown(fmt.format_date(ticket.event.event_date))}\n\n"
                 )
         
         await NavigationManager.send_or_edit(
@@ -348,8 +348,7 @@ async def tickets_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         await NavigationManager.delete_user_command(update)
         
         async with db_manager.session() as session:
-            sync_service = WebsiteSyncService(session)
-            events = await sync_service.get_upcoming_events(limit=1)
+            events = await EventRepository(session).get_upcoming_events(limit=1)
             
             if not events:
                 text = (
@@ -368,12 +367,12 @@ async def tickets_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                 return
             
             event = events[0]
-            event_date = fmt.escape_markdown(event.get("event_date", "TBA"))
+            event_date = fmt.escape_markdown(fmt.format_date(event.event_date))
             
             text = (
                 f"🎟️ *АРСЕНАЛ \\- БИЛЕТЫ*\n\n"
                 f"*Ближайшее событие:*\n"
-                f"📅 {fmt.escape_markdown(event['title'])}\n"
+                f"📅 {fmt.escape_markdown(event.title)}\n"
                 f"📍 {event_date}\n\n"
                 "*Типы билетов:*\n\n"
                 "🎫 Standard \\- 500₽\n"
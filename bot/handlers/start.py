@@ -13,6 +13,7 @@ from bot.database.session import db_manager
 from bot.services.user_service import UserService
 from bot.utils.decorators import handle_errors
 from bot.utils.logger import logger
+from bot.database.snapshots import get_user_snapshot
 from bot.middlewares.auth import auth_middleware
 from bot.middlewares.logging import logging_middleware
 from bot.middlewares.throttling import throttling_middleware
@@ -91,13 +92,13 @@ async def main_menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
     query = update.callback_query
     await query.answer()
     
-    db_user = context.user_data.get("db_user")
+    user = get_user_snapshot(context)
     
     text = "🌑 *Главное меню*\n\nВыберите действие:"
     
     await query.edit_message_text(
         text,
-        reply_markup=kb.main_menu(db_user.is_member if db_user else False),
+        reply_markup=kb.main_menu(user.is_member if user else False),
         parse_mode="MarkdownV2"
     )
 
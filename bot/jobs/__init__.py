@@ -0,0 +1 @@
+"""Batch and background jobs."""
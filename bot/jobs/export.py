@@ -0,0 +1,313 @@
+"""Incremental columnar export of the ledger, users and tickets for offline analytics."""
+import asyncio
+import gzip
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import orjson
+from sqlalchemy import JSON, Boolean, DateTime, Integer, Numeric, Table, select, tuple_
+
+from bot.config import settings
+from bot.database.models import Ticket, Transaction, User
+from bot.database.session import SessionFactory, db_manager
+from bot.utils.logger import logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # Optional: pip install pyarrow
+    pa = None
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    """What to export from a table and which column orders it."""
+
+    table: Table
+    columns: tuple[str, ...]
+    # Monotonic per change; ties are broken by id. Indexed as (watermark, id)
+    # so a run reads only rows past the saved position (migration 013)
+    watermark: str
+
+
+EXPORT_SPECS = {
+    "transactions": ExportSpec(
+        Transaction.__table__,
+        (
+            "id", "user_id", "type", "amount", "balance_after", "description",
+            "extra_metadata", "payment_status", "is_synced", "created_at",
+        ),
+        watermark="created_at",
+    ),
+    # No names or usernames: analytics don't need them
+    "users": ExportSpec(
+        User.__table__,
+        (
+            "id", "membership_level", "is_member", "up_coins", "total_earned",
+            "total_spent", "referred_by_id", "referral_count", "referral_earnings",
+            "daily_streak", "total_events_attended", "is_banned", "is_active",
+            "created_at", "updated_at",
+        ),
+        # Every change re-exports the row; the newest copy per id wins
+        watermark="updated_at",
+    ),
+    "tickets": ExportSpec(
+        Ticket.__table__,
+        (
+            "id", "user_id", "event_id", "ticket_type", "price", "status",
+            "used_at", "payment_method", "transaction_id", "created_at",
+        ),
+        # Tickets have no change timestamp: rows are exported once, when
+        # created, and later status/used_at changes only by a full run
+        watermark="created_at",
+    ),
+}
+
+FILE_SUFFIXES = {"parquet": ".parquet", "arrow": ".arrow", "jsonl": ".jsonl.gz"}
+
+
+def _arrow_type(column_type):
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Numeric):
+        return pa.decimal128(column_type.precision or 38, column_type.scale or 0)
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    # Strings, and JSON serialized to text
+    return pa.string()
+
+
+class _ColumnarWriter:
+    """Parquet (one row group per chunk) or Arrow IPC file; blocking."""
+
+    def __init__(self, path: Path, spec: ExportSpec, file_format: str):
+        columns = [spec.table.c[name] for name in spec.columns]
+        self.schema = pa.schema([(c.name, _arrow_type(c.type)) for c in columns])
+        self.json_columns = {i for i, c in enumerate(columns) if isinstance(c.type, JSON)}
+        if file_format == "parquet":
+            self._writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+            self._sink = None
+        else:
+            self._sink = pa.OSFile(str(path), "wb")
+            self._writer = pa.ipc.new_file(
+                self._sink, self.schema, options=pa.ipc.IpcWriteOptions(compression="zstd")
+            )
+
+    def write(self, rows: list) -> None:
+        arrays = []
+        for i, field_ in enumerate(self.schema):
+            values = [row[i] for row in rows]
+            if i in self.json_columns:
+                values = [None if v is None else orjson.dumps(v).decode() for v in values]
+            arrays.append(pa.array(values, type=field_.type))
+        self._writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+
+    def close(self) -> None:
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+
+class _JsonLinesWriter:
+    """Gzip JSON lines; used when pyarrow is not installed."""
+
+    def __init__(self, path: Path, spec: ExportSpec):
+        self.columns = spec.columns
+        self._file = gzip.open(path, "wb")
+
+    def write(self, rows: list) -> None:
+        # str() keeps Decimal amounts exact
+        self._file.write(b"".join(
+            orjson.dumps(dict(zip(self.columns, row)), default=str) + b"\n" for row in rows
+        ))
+
+    def close(self) -> None:
+        self._file.close()
+
+
+@dataclass
+class ExportTableResult:
+    """Outcome of exporting one table."""
+
+    table: str
+    rows: int = 0
+    path: Optional[str] = None
+    duration_ms: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / (self.duration_ms / 1000) if self.duration_ms else 0.0
+
+
+@dataclass
+class ExportResult:
+    """Outcome of one run."""
+
+    file_format: str
+    tables: list[ExportTableResult] = field(default_factory=list)
+    duration_ms: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return sum(t.rows for t in self.tables)
+
+
+class AnalyticsExport:
+    """
+    Copy new and changed rows into columnar files under directory/<table>/.
+
+    Each table is read in (watermark, id) order over a server-side cursor
+    (session.stream) and written chunk by chunk, so memory stays at one
+    chunk whatever the table size. The last exported (watermark, id) is
+    saved to directory/watermarks.json once a table's file is complete;
+    the next run continues after it, and a failed run repeats from the
+    previous position. Rows newer than settle_seconds are left for the
+    next run: a transaction still in flight may commit an older timestamp.
+
+    Users are re-exported whenever they change. Tickets have no change
+    timestamp, so an incremental run only picks up new tickets; status and
+    used_at changes of exported ones reach the files with run(full=True).
+
+    Files are Parquet or Arrow IPC (zstd) with pyarrow installed, gzip
+    JSON lines otherwise.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory = db_manager.session,
+        directory: str = "data/exports",
+        file_format: str = "parquet",
+        chunk_size: int = 10000,
+        settle_seconds: float = 60.0,
+    ):
+        if file_format not in FILE_SUFFIXES:
+            raise ValueError(f"Unknown export format: {file_format}")
+        if pa is None and file_format != "jsonl":
+            logger.warning("export_pyarrow_unavailable", fallback="jsonl")
+            file_format = "jsonl"
+        self.session_factory = session_factory
+        self.directory = Path(directory)
+        self.file_format = file_format
+        self.chunk_size = chunk_size
+        self.settle_seconds = settle_seconds
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def _load_watermarks(self) -> dict:
+        try:
+            return orjson.loads((self.directory / "watermarks.json").read_bytes())
+        except FileNotFoundError:
+            return {}
+
+    def _save_watermarks(self, watermarks: dict) -> None:
+        path = self.directory / "watermarks.json"
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(orjson.dumps(watermarks, option=orjson.OPT_INDENT_2))
+        os.replace(tmp, path)
+
+    async def run(self, tables: Optional[list[str]] = None, full: bool = False) -> ExportResult:
+        """Export tables (all by default); full=True ignores saved watermarks."""
+        async with self._lock:
+            result = ExportResult(file_format=self.file_format)
+            start = time.perf_counter()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            watermarks = await asyncio.to_thread(self._load_watermarks)
+
+            for name in tables or list(EXPORT_SPECS):
+                table_result, position = await self._export_table(
+                    name, None if full else watermarks.get(name)
+                )
+                result.tables.append(table_result)
+                if position is not None:
+                    watermarks[name] = position
+                    await asyncio.to_thread(self._save_watermarks, watermarks)
+
+            result.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+            logger.info(
+                "export_completed",
+                file_format=self.file_format,
+                rows={t.table: t.rows for t in result.tables},
+                duration_ms=result.duration_ms
+            )
+            return result
+
+    def _open(self, path: Path, spec: ExportSpec):
+        if self.file_format == "jsonl":
+            return _JsonLinesWriter(path, spec)
+        return _ColumnarWriter(path, spec, self.file_format)
+
+    async def _export_table(self, name: str, watermark: Optional[dict]):
+        spec = EXPORT_SPECS[name]
+        result = ExportTableResult(table=name)
+        start = time.perf_counter()
+
+        order_column = spec.table.c[spec.watermark]
+        id_column = spec.table.c.id
+        query = (
+            select(*(spec.table.c[column] for column in spec.columns))
+            .where(order_column < datetime.utcnow() - timedelta(seconds=self.settle_seconds))
+            .order_by(order_column, id_column)
+        )
+        if watermark is not None:
+            query = query.where(
+                tuple_(order_column, id_column)
+                > tuple_(datetime.fromisoformat(watermark["value"]), watermark["id"])
+            )
+
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        path = self.directory / name / f"{name}-{stamp}{FILE_SUFFIXES[self.file_format]}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        order_index = spec.columns.index(spec.watermark)
+        id_index = spec.columns.index("id")
+        last = None
+
+        writer = await asyncio.to_thread(self._open, tmp, spec)
+        try:
+            async with self.session_factory() as session:
+                stream = await session.stream(
+                    query, execution_options={"yield_per": self.chunk_size}
+                )
+                async for chunk in stream.partitions(self.chunk_size):
+                    await asyncio.to_thread(writer.write, chunk)
+                    result.rows += len(chunk)
+                    last = chunk[-1]
+            await asyncio.to_thread(writer.close)
+        except BaseException:
+            await asyncio.to_thread(writer.close)
+            tmp.unlink(missing_ok=True)
+            raise
+
+        result.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        if last is None:
+            tmp.unlink(missing_ok=True)
+            return result, None
+
+        os.replace(tmp, path)
+        result.path = str(path)
+        logger.info(
+            "export_table_written",
+            table=name,
+            rows=result.rows,
+            path=result.path,
+            rows_per_second=round(result.rows_per_second)
+        )
+        return result, {"value": last[order_index].isoformat(), "id": last[id_index]}
+
+
+# Global instance used by the /export admin command
+exporter = AnalyticsExport(
+    directory=settings.export_dir,
+    file_format=settings.export_format,
+    chunk_size=settings.export_chunk_size,
+)
@@ -0,0 +1,140 @@
+"""Reconcile per-user ledger summaries against the transactions table."""
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+
+from sqlalchemy import case, func, select, update
+
+from bot.database.models import Transaction, User
+from bot.database.session import SessionFactory, db_manager
+from bot.utils.logger import logger
+
+
+@dataclass
+class LedgerReconcileResult:
+    """Outcome of one run."""
+
+    users: int = 0
+    drifted: int = 0
+    fixed: int = 0
+    duration_ms: float = 0.0
+
+
+def _ledger_totals(user_ids: list[int]):
+    earned = func.coalesce(
+        func.sum(case((Transaction.amount > 0, Transaction.amount), else_=0)), 0
+    )
+    spent = func.coalesce(
+        func.sum(case((Transaction.amount < 0, -Transaction.amount), else_=0)), 0
+    )
+    return (
+        select(Transaction.user_id, earned.label("earned"), spent.label("spent"))
+        .where(Transaction.user_id.in_(user_ids))
+        .group_by(Transaction.user_id)
+    )
+
+
+class LedgerReconciler:
+    """
+    Compare User.total_earned/total_spent with SUMs over the ledger.
+
+    Users are scanned by id in chunks; each chunk costs one users query and
+    one grouped ledger query (served by the (user_id, created_at) index).
+    Mismatches are logged and, with fix=True, corrected from the ledger:
+    the drifted users' rows are locked first (FOR UPDATE) and the sums
+    recomputed, so a transaction recorded concurrently is not lost.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory = db_manager.session,
+        chunk_size: int = 500,
+        fix: bool = True,
+    ):
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+        self.fix = fix
+
+    async def run(self) -> LedgerReconcileResult:
+        result = LedgerReconcileResult()
+        start = time.perf_counter()
+        last_id = 0
+
+        while True:
+            async with self.session_factory() as session:
+                users = (await session.execute(
+                    select(User.id, User.total_earned, User.total_spent)
+                    .where(User.id > last_id)
+                    .order_by(User.id)
+                    .limit(self.chunk_size)
+                )).all()
+                if not users:
+                    break
+                ledger = {
+                    row.user_id: row
+                    for row in await session.execute(_ledger_totals([u.id for u in users]))
+                }
+
+            drifted = [
+                user.id for user in users
+                if self._differs(user, ledger.get(user.id))
+            ]
+            result.users += len(users)
+            result.drifted += len(drifted)
+            if drifted and self.fix:
+                result.fixed += await self._fix(drifted)
+
+            last_id = users[-1].id
+
+        result.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(
+            "ledger_reconciled",
+            users=result.users,
+            drifted=result.drifted,
+            fixed=result.fixed,
+            duration_ms=result.duration_ms
+        )
+        return result
+
+    @staticmethod
+    def _differs(user, totals) -> bool:
+        earned = totals.earned if totals else Decimal(0)
+        spent = totals.spent if totals else Decimal(0)
+        return (user.total_earned or 0) != earned or (user.total_spent or 0) != spent
+
+    async def _fix(self, user_ids: list[int]) -> int:
+        fixed = 0
+        async with self.session_factory() as session:
+            # Lock first: in-flight ledger writes for these users commit
+            # before the sums below are read, later ones wait
+            users = (await session.execute(
+                select(User.id, User.total_earned, User.total_spent)
+                .where(User.id.in_(user_ids))
+                .with_for_update()
+            )).all()
+            ledger = {
+                row.user_id: row
+                for row in await session.execute(_ledger_totals(user_ids))
+            }
+
+            for user in users:
+                totals = ledger.get(user.id)
+                if not self._differs(user, totals):
+                    continue
+                earned = totals.earned if totals else Decimal(0)
+                spent = totals.spent if totals else Decimal(0)
+                await session.execute(
+                    update(User)
+                    .where(User.id == user.id)
+                    .values(total_earned=earned, total_spent=spent)
+                )
+                logger.warning(
+                    "ledger_summary_drift",
+                    user_id=user.id,
+                    total_earned=float(user.total_earned or 0),
+                    ledger_earned=float(earned),
+                    total_spent=float(user.total_spent or 0),
+                    ledger_spent=float(spent)
+                )
+                fixed += 1
+        return fixed
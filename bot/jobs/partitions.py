@@ -0,0 +1,136 @@
+"""Create upcoming monthly partitions and archive expired ones."""
+import asyncio
+import gzip
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Optional
+
+import orjson
+from sqlalchemy import text
+
+from bot.database.partitions import (
+    PARTITIONED_TABLES, create_partition, drop_partition, list_partitions, plan_partitions
+)
+from bot.database.session import SessionFactory, db_manager
+from bot.utils.logger import logger
+
+
+@dataclass
+class PartitionMaintenanceResult:
+    """Outcome of one run."""
+
+    created: list[str] = field(default_factory=list)
+    archived: list[str] = field(default_factory=list)
+    rows_archived: int = 0
+    duration_ms: float = 0.0
+
+
+def _archive_line(row) -> bytes:
+    # str() keeps Decimal amounts exact (the shared serializer uses float)
+    return orjson.dumps(dict(row), default=str) + b"\n"
+
+
+class PartitionMaintenanceJob:
+    """
+    Keep monthly partitions of PARTITIONED_TABLES in shape.
+
+    Each run creates partitions for the current and months_ahead next
+    months, so inserts never fall into the default partition. Partitions
+    older than the table's retention (months, 0 = keep) are streamed to
+    <archive_dir>/<table>/<partition>.jsonl.gz and then detached and
+    dropped; the drop only happens once the archive file is complete, so a
+    failed export leaves the partition in place for the next run.
+
+    Runs only against PostgreSQL; elsewhere it does nothing.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory = db_manager.session,
+        retention_months: Optional[dict[str, int]] = None,
+        months_ahead: int = 3,
+        archive_dir: str = "data/archive",
+        chunk_size: int = 5000,
+    ):
+        self.session_factory = session_factory
+        self.retention_months = retention_months or {}
+        self.months_ahead = months_ahead
+        self.archive_dir = Path(archive_dir)
+        self.chunk_size = chunk_size
+
+    async def run(self, today: Optional[date] = None) -> PartitionMaintenanceResult:
+        result = PartitionMaintenanceResult()
+        start = time.perf_counter()
+        today = today or datetime.utcnow().date()
+
+        for table in PARTITIONED_TABLES:
+            async with self.session_factory() as session:
+                if session.bind.dialect.name != "postgresql":
+                    return result
+                existing = await list_partitions(session, table)
+            if not existing:
+                # Not partitioned (migration not applied)
+                continue
+
+            plan = plan_partitions(
+                table, existing, today, self.months_ahead, self.retention_months.get(table, 0)
+            )
+            for month in plan.create:
+                try:
+                    async with self.session_factory() as session:
+                        result.created.append(await create_partition(session, table, month))
+                except Exception as e:
+                    # E.g. rows for that month already sit in the default partition
+                    logger.error("partition_create_failed", table=table, month=str(month), error=str(e))
+
+            for name in plan.archive:
+                try:
+                    result.rows_archived += await self._archive(table, name)
+                    result.archived.append(name)
+                except Exception as e:
+                    logger.error("partition_archive_failed", partition=name, error=str(e))
+
+        result.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(
+            "partitions_maintained",
+            created=result.created,
+            archived=result.archived,
+            rows_archived=result.rows_archived,
+            duration_ms=result.duration_ms
+        )
+        return result
+
+    async def _archive(self, table: str, name: str) -> int:
+        """Export a partition to a compressed file, then drop it."""
+        path = self.archive_dir / table / f"{name}.jsonl.gz"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        rows = 0
+
+        archive = await asyncio.to_thread(gzip.open, tmp, "wb")
+        try:
+            async with self.session_factory() as session:
+                stream = await session.stream(
+                    text(f'SELECT * FROM "{name}" ORDER BY created_at'),
+                    execution_options={"yield_per": self.chunk_size}
+                )
+                async for chunk in stream.mappings().partitions(self.chunk_size):
+                    await asyncio.to_thread(
+                        archive.write, b"".join(_archive_line(row) for row in chunk)
+                    )
+                    rows += len(chunk)
+            await asyncio.to_thread(archive.close)
+        except BaseException:
+            await asyncio.to_thread(archive.close)
+            tmp.unlink(missing_ok=True)
+            raise
+
+        os.replace(tmp, path)
+        async with self.session_factory() as session:
+            await drop_partition(session, table, name)
+
+        logger.info("partition_archived", partition=name, rows=rows, path=str(path))
+        return rows
@@ -0,0 +1,107 @@
+"""Periodic jobs run by the bot process."""
+from datetime import timedelta
+from functools import partial
+from typing import Optional
+
+from telegram import Bot
+
+from bot.config import settings
+from bot.jobs.ledger import LedgerReconciler
+from bot.jobs.partitions import PartitionMaintenanceJob
+from bot.jobs.scheduler import JobScheduler
+from bot.jobs.streaks import StreakMaintenanceJob
+from bot.jobs.website_inbound import WebsiteInboundSync
+from bot.services.checkin_service import checkin_services
+from bot.services.website_webhooks import website_webhooks
+from bot.utils.logger import logger
+from bot.utils.sender import RateLimitedSender
+
+
+def register_jobs(scheduler: JobScheduler, bot: Optional[Bot] = None) -> None:
+    """Register all periodic jobs enabled in settings; bot sends notifications."""
+    if settings.ledger_reconcile_interval_hours > 0:
+        fix = settings.ledger_reconcile_fix
+        if fix and settings.transactions_retention_months > 0:
+            # Archived months are missing from the ledger sums: "fixing"
+            # would wipe them from users' lifetime totals
+            logger.warning("ledger_reconcile_fix_disabled", reason="transactions_archived")
+            fix = False
+        reconciler = LedgerReconciler(
+            chunk_size=settings.ledger_reconcile_chunk_size,
+            fix=fix,
+        )
+        scheduler.add(
+            "ledger_reconcile",
+            interval=settings.ledger_reconcile_interval_hours * 3600,
+            func=reconciler.run,
+            # Not right at startup: deploys shouldn't add database load
+            initial_delay=600,
+        )
+
+    if settings.partition_maintenance_interval_hours > 0:
+        maintenance = PartitionMaintenanceJob(
+            retention_months={
+                "transactions": settings.transactions_retention_months,
+                "analytics_events": settings.analytics_retention_months,
+            },
+            months_ahead=settings.partition_months_ahead,
+            archive_dir=settings.partition_archive_dir,
+        )
+        scheduler.add(
+            "partition_maintenance",
+            interval=settings.partition_maintenance_interval_hours * 3600,
+            func=maintenance.run,
+            initial_delay=300,
+        )
+
+    if settings.streak_maintenance_interval_minutes > 0:
+        interval = settings.streak_maintenance_interval_minutes * 60
+        sender = None
+        if bot is not None and settings.streak_reminder_hours > 0:
+            sender = RateLimitedSender(bot, rate=settings.streak_reminder_rate)
+        streaks = StreakMaintenanceJob(
+            sender=sender,
+            remind_before=timedelta(hours=settings.streak_reminder_hours),
+            interval=interval,
+            chunk_size=settings.streak_chunk_size,
+        )
+        scheduler.add(
+            "streak_maintenance",
+            interval=interval,
+            func=streaks.run,
+            initial_delay=120,
+        )
+
+    if settings.website_sync_interval_seconds > 0:
+        inbound = WebsiteInboundSync(page_size=settings.website_sync_page_size)
+        scheduler.add(
+            "website_sync_in",
+            interval=settings.website_sync_interval_seconds,
+            func=inbound.run,
+            # Menus read the mirrored tables: fill them soon after startup
+            initial_delay=5,
+        )
+        if settings.website_sync_full_interval_hours > 0:
+            scheduler.add(
+                "website_sync_in_full",
+                interval=settings.website_sync_full_interval_hours * 3600,
+                func=partial(inbound.run, full=True),
+                initial_delay=1800,
+            )
+
+    if settings.checkin_token and settings.checkin_preload_hours > 0:
+        scheduler.add(
+            "checkin_preload",
+            interval=3600,
+            func=checkin_services.preload,
+            # Right at startup: the first scan shouldn't wait for the index
+            initial_delay=0,
+        )
+
+    if settings.website_webhook_dedupe_days > 0:
+        scheduler.add(
+            "website_webhook_prune",
+            interval=24 * 3600,
+            func=website_webhooks.prune,
+            initial_delay=900,
+        )
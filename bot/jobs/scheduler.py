@@ -0,0 +1,80 @@
+"""Minimal in-process scheduler for periodic maintenance jobs."""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from bot.utils.logger import logger
+
+
+@dataclass
+class PeriodicJob:
+    """A coroutine function run every interval seconds."""
+
+    name: str
+    interval: float
+    func: Callable[[], Awaitable[object]]
+    initial_delay: float = 0.0
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+
+class JobScheduler:
+    """
+    Run registered jobs on fixed intervals inside the bot's event loop.
+
+    A job's next run starts interval seconds after the previous one
+    finished, so a slow run never overlaps itself. Exceptions are logged
+    and the job keeps its schedule.
+    """
+
+    def __init__(self):
+        self._jobs: dict[str, PeriodicJob] = {}
+
+    def add(
+        self,
+        name: str,
+        interval: float,
+        func: Callable[[], Awaitable[object]],
+        initial_delay: float = 0.0
+    ) -> None:
+        """Register a job; replaces an existing job with the same name."""
+        self._jobs[name] = PeriodicJob(name, interval, func, initial_delay)
+
+    @property
+    def jobs(self) -> list[str]:
+        return list(self._jobs)
+
+    async def _loop(self, job: PeriodicJob) -> None:
+        await asyncio.sleep(job.initial_delay)
+        while True:
+            start = time.perf_counter()
+            try:
+                await job.func()
+                logger.info(
+                    "job_completed",
+                    job=job.name,
+                    duration_ms=round((time.perf_counter() - start) * 1000, 1)
+                )
+            except Exception as e:
+                logger.error("job_failed", job=job.name, error=str(e), exc_info=True)
+            await asyncio.sleep(job.interval)
+
+    async def start(self) -> None:
+        """Start all registered jobs."""
+        for job in self._jobs.values():
+            if job.task is None:
+                job.task = asyncio.create_task(self._loop(job), name=f"job_{job.name}")
+        logger.info("scheduler_started", jobs=self.jobs)
+
+    async def stop(self) -> None:
+        """Cancel running jobs and wait for them to exit."""
+        tasks = [job.task for job in self._jobs.values() if job.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for job in self._jobs.values():
+            job.task = None
+
+
+# Global instance; jobs are registered in bot/jobs/registry.py
+scheduler = JobScheduler()
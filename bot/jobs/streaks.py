@@ -0,0 +1,139 @@
+"""Expire lapsed daily streaks and remind users whose streak is about to lapse."""
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import select, tuple_, update
+
+from bot.database.models import User
+from bot.database.repositories.user_repository import DAILY_CLAIM_COOLDOWN, DAILY_STREAK_WINDOW
+from bot.database.session import SessionFactory, db_manager
+from bot.utils.logger import logger
+from bot.utils.metrics import daily_streaks
+from bot.utils.sender import RateLimitedSender
+
+
+REMINDER_TEXT = (
+    "🔥 Ваша серия ежедневных бонусов: {streak} дн.\n"
+    "Заберите бонус командой /daily, иначе в ближайшие {hours} ч. серия сгорит."
+)
+
+
+@dataclass
+class StreakMaintenanceResult:
+    """Outcome of one run."""
+
+    reset: int = 0
+    reminded: int = 0
+    reminder_failed: int = 0
+    duration_ms: float = 0.0
+
+
+class StreakMaintenanceJob:
+    """
+    Reset streaks whose last claim is older than DAILY_STREAK_WINDOW.
+
+    The claim itself only restarts a lapsed streak when the user comes
+    back, so without this job profiles and leaderboards keep showing it.
+    Users are scanned in (last_daily_claim, id) keyset chunks over the
+    partial idx_user_streak_claim index (daily_streak > 0 only), one
+    session per chunk; the reset re-checks the claim time, so a claim
+    landing between the scan and the UPDATE keeps its streak.
+
+    With a sender, users whose streak lapses within remind_before get one
+    reminder: each run covers claims that crossed the reminder threshold
+    since the previous run (interval seconds before it on the first run).
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory = db_manager.session,
+        sender: Optional[RateLimitedSender] = None,
+        remind_before: timedelta = timedelta(hours=4),
+        interval: float = 3600,
+        chunk_size: int = 1000,
+    ):
+        if remind_before >= DAILY_STREAK_WINDOW - DAILY_CLAIM_COOLDOWN:
+            raise ValueError("Reminder would come before the bonus can be claimed")
+        self.session_factory = session_factory
+        self.sender = sender
+        self.remind_before = remind_before
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self._reminded_through: Optional[datetime] = None
+
+    async def _chunks(self, *conditions, columns=()) -> AsyncIterator[list]:
+        position = None
+        while True:
+            query = (
+                select(User.id, User.last_daily_claim, *columns)
+                .where(User.daily_streak > 0, *conditions)
+                .order_by(User.last_daily_claim, User.id)
+                .limit(self.chunk_size)
+            )
+            if position is not None:
+                query = query.where(tuple_(User.last_daily_claim, User.id) > position)
+            async with self.session_factory() as session:
+                rows = (await session.execute(query)).all()
+            if not rows:
+                return
+            yield rows
+            position = (rows[-1].last_daily_claim, rows[-1].id)
+
+    async def run(self) -> StreakMaintenanceResult:
+        result = StreakMaintenanceResult()
+        start = time.perf_counter()
+        now = datetime.utcnow()
+        expired_before = now - DAILY_STREAK_WINDOW
+
+        async for rows in self._chunks(User.last_daily_claim < expired_before):
+            async with self.session_factory() as session:
+                reset = await session.execute(
+                    update(User)
+                    .where(
+                        User.id.in_([row.id for row in rows]),
+                        User.daily_streak > 0,
+                        User.last_daily_claim < expired_before,
+                    )
+                    .values(daily_streak=0)
+                )
+            result.reset += reset.rowcount
+
+        if self.sender is not None:
+            await self._remind(expired_before, result)
+
+        result.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        daily_streaks.labels("reset").inc(result.reset)
+        daily_streaks.labels("reminded").inc(result.reminded)
+        daily_streaks.labels("reminder_failed").inc(result.reminder_failed)
+        logger.info(
+            "streaks_maintained",
+            reset=result.reset,
+            reminded=result.reminded,
+            reminder_failed=result.reminder_failed,
+            duration_ms=result.duration_ms
+        )
+        return result
+
+    async def _remind(self, expired_before: datetime, result: StreakMaintenanceResult) -> None:
+        # Claims in (previous threshold, threshold] lapse within remind_before
+        threshold = expired_before + self.remind_before
+        previous = self._reminded_through or threshold - timedelta(seconds=self.interval)
+        hours = round(self.remind_before.total_seconds() / 3600)
+
+        async for rows in self._chunks(
+            User.last_daily_claim > max(previous, expired_before),
+            User.last_daily_claim <= threshold,
+            User.is_active.is_(True),
+            User.is_banned.is_(False),
+            columns=(User.daily_streak,),
+        ):
+            for row in rows:
+                text = REMINDER_TEXT.format(streak=row.daily_streak, hours=hours)
+                if await self.sender.send(row.id, text):
+                    result.reminded += 1
+                else:
+                    result.reminder_failed += 1
+
+        self._reminded_through = threshold
@@ -0,0 +1,138 @@
+"""Batch pre-generation of ticket QR images for event check-in."""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import select, update
+
+from bot.config import settings
+from bot.database.models import Ticket
+from bot.database.session import SessionFactory, db_manager
+from bot.services.qr_cache import ContentAddressedStore, cache_key
+from bot.services.qr_generator import (
+    TICKET_COMPACT_STYLE, qr_renderer, ticket_payload, ticket_qr_store
+)
+from bot.services.qr_render import QRRenderService
+from bot.utils.logger import logger
+
+
+def ticket_qr_url(key: str, public_url: str) -> str:
+    """URL of a stored ticket QR under the API's public base URL."""
+    return f"{public_url.rstrip('/')}/api/qr/tickets/{key}.png"
+
+
+@dataclass
+class TicketQRBatchResult:
+    """Outcome of one run."""
+
+    event_id: int
+    tickets: int = 0
+    rendered: int = 0
+    reused: int = 0
+    chunks: int = 0
+    duration_ms: float = 0.0
+    # API_PUBLIC_URL unset: nothing rendered or stored
+    skipped: bool = False
+
+
+class TicketQRBatchJob:
+    """
+    Render QR images for an event's active tickets and store their URLs.
+
+    Tickets are read with keyset pagination (id > last id) in chunks of
+    chunk_size; each chunk is rendered across the process pool, written to
+    the content-addressed store and committed with one bulk UPDATE.
+
+    Only tickets without qr_image_url are selected, so a run interrupted
+    midway resumes where it stopped, and re-running a finished event does
+    nothing. Images already in the store (same payload and style) are
+    reused instead of rendered again.
+
+    The stored URLs are absolute, under public_url (API_PUBLIC_URL); without
+    it the job doesn't run, rather than storing links clients can't open.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory = db_manager.session,
+        renderer: QRRenderService = qr_renderer,
+        store: ContentAddressedStore = ticket_qr_store,
+        chunk_size: int = 100,
+        public_url: Optional[str] = None,
+    ):
+        self.session_factory = session_factory
+        self.renderer = renderer
+        self.store = store
+        self.chunk_size = chunk_size
+        self.public_url = public_url or settings.api_public_url
+
+    async def run(self, event_id: int) -> TicketQRBatchResult:
+        result = TicketQRBatchResult(event_id=event_id)
+        if not self.public_url:
+            logger.warning(
+                "ticket_qr_batch_skipped", event_id=event_id, reason="API_PUBLIC_URL unset"
+            )
+            result.skipped = True
+            return result
+
+        start = time.perf_counter()
+        last_id = 0
+
+        while True:
+            async with self.session_factory() as session:
+                rows = (await session.execute(
+                    select(Ticket.id, Ticket.event_id)
+                    .where(Ticket.event_id == event_id)
+                    .where(Ticket.status == "active")
+                    .where(Ticket.qr_image_url.is_(None))
+                    .where(Ticket.id > last_id)
+                    .order_by(Ticket.id)
+                    .limit(self.chunk_size)
+                )).all()
+            if not rows:
+                break
+
+            urls = await self._store_chunk(rows, result)
+            async with self.session_factory() as session:
+                await session.execute(
+                    update(Ticket),
+                    [{"id": ticket_id, "qr_image_url": url} for ticket_id, url in urls],
+                )
+
+            last_id = rows[-1].id
+            result.tickets += len(rows)
+            result.chunks += 1
+
+        result.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(
+            "ticket_qr_batch_complete",
+            event_id=event_id,
+            tickets=result.tickets,
+            rendered=result.rendered,
+            reused=result.reused,
+            duration_ms=result.duration_ms,
+        )
+        return result
+
+    async def _store_chunk(self, rows, result: TicketQRBatchResult) -> list[tuple[int, str]]:
+        payloads = [ticket_payload(row.id, row.event_id) for row in rows]
+        keys = [cache_key(payload, TICKET_COMPACT_STYLE.cache_id) for payload in payloads]
+
+        exists = await asyncio.to_thread(lambda: [self.store.exists(key) for key in keys])
+        missing = [i for i, found in enumerate(exists) if not found]
+
+        if missing:
+            pngs = await self.renderer.render_many(
+                [(payloads[i], TICKET_COMPACT_STYLE) for i in missing]
+            )
+
+            def write_all() -> None:
+                for i, png in zip(missing, pngs):
+                    self.store.write(keys[i], png)
+
+            await asyncio.to_thread(write_all)
+
+        result.rendered += len(missing)
+        result.reused += len(rows) - len(missing)
+        return [(row.id, ticket_qr_url(key, self.public_url)) for row, key in zip(rows, keys)]
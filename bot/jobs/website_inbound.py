@@ -0,0 +1,206 @@
+"""Mirror website events and tickets into the local tables."""
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Optional
+
+from bot.database.repositories.event_repository import EventRepository
+from bot.database.session import SessionFactory, db_manager
+from bot.services.website_sync import WebsiteSyncService
+from bot.utils.logger import logger
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Website ISO 8601 time (possibly with an offset) as naive UTC; None if unusable."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _decimal(value: Any) -> Decimal:
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        return Decimal(0)
+
+
+def parse_website_event(item: dict) -> Optional[dict]:
+    """Website event -> EventRepository.upsert_website_events row; None if unusable."""
+    event_date = parse_timestamp(item.get("event_date"))
+    updated_at = parse_timestamp(item.get("updated_at"))
+    if item.get("id") is None or event_date is None or updated_at is None:
+        return None
+    return {
+        "website_event_id": int(item["id"]),
+        "website_updated_at": updated_at,
+        "title": item.get("title") or "",
+        "description": item.get("description") or "",
+        "theme": item.get("theme"),
+        "location": item.get("location") or "TBA",
+        "event_date": event_date,
+        "doors_open": parse_timestamp(item.get("doors_open")),
+        "doors_close": parse_timestamp(item.get("doors_close")),
+        "max_capacity": int(item.get("max_capacity") or 300),
+        "current_attendees": int(item.get("current_attendees") or 0),
+        "status": item.get("status") or "upcoming",
+        "cover_image_url": item.get("cover_image_url"),
+    }
+
+
+def parse_website_ticket(item: dict) -> Optional[dict]:
+    """Website ticket -> EventRepository.upsert_website_tickets row; None if unusable."""
+    user_id = item.get("telegram_id") or item.get("telegram_user_id")
+    updated_at = parse_timestamp(item.get("updated_at"))
+    if item.get("id") is None or user_id is None or item.get("event_id") is None or updated_at is None:
+        return None
+    return {
+        "website_ticket_id": int(item["id"]),
+        "website_updated_at": updated_at,
+        "user_id": int(user_id),
+        "website_event_id": int(item["event_id"]),
+        "ticket_type": item.get("ticket_type") or item.get("type") or "standard",
+        "price": _decimal(item.get("price", 0)),
+        "status": item.get("status") or "active",
+        "used_at": parse_timestamp(item.get("used_at")),
+        "payment_method": item.get("payment_method") or "website",
+        # Only used for new rows: tickets bought in the bot keep their own QR
+        "qr_code": item.get("qr_code") or f"web-{item['id']}",
+        "created_at": parse_timestamp(item.get("created_at")) or updated_at,
+    }
+
+
+@dataclass
+class InboundKindResult:
+    """Outcome of syncing one kind."""
+
+    kind: str
+    fetched: int = 0
+    # Fewer than fetched: unusable items, unknown users/events, stale updates
+    applied: int = 0
+    pages: int = 0
+    complete: bool = True
+
+
+@dataclass
+class InboundSyncResult:
+    """Outcome of one run."""
+
+    kinds: list[InboundKindResult] = field(default_factory=list)
+    duration_ms: float = 0.0
+
+
+class WebsiteInboundSync:
+    """
+    Pull events and tickets changed on the website into events/tickets.
+
+    Handlers read the local tables through EventRepository, so menus cost
+    an indexed query instead of a website round trip. Each run continues
+    from the kind's WebsiteSyncCursor and pages through
+    GET /api/v1/<kind>/changes in (updated_at, id) order; events go first
+    so tickets can resolve their event. Each page is applied with one
+    INSERT ... ON CONFLICT, in the transaction that advances the cursor;
+    malformed items are logged and skipped. Webhooks never move the
+    cursor, so the poll still backstops deliveries that were lost.
+
+    Tickets of users who never started the bot are skipped, and the next
+    runs continue past them: if such a user starts the bot later, their
+    tickets are recovered by run(full=True), which re-reads everything and
+    is scheduled every WEBSITE_SYNC_FULL_INTERVAL_HOURS. A full run never
+    moves the cursor back.
+    """
+
+    KINDS = {
+        "events": (parse_website_event, EventRepository.upsert_website_events),
+        "tickets": (parse_website_ticket, EventRepository.upsert_website_tickets),
+    }
+
+    def __init__(
+        self,
+        session_factory: SessionFactory = db_manager.session,
+        page_size: int = 200,
+    ):
+        self.session_factory = session_factory
+        self.page_size = page_size
+
+    async def run(self, full: bool = False) -> InboundSyncResult:
+        result = InboundSyncResult()
+        start = time.perf_counter()
+
+        for kind in self.KINDS:
+            kind_result = await self._sync(kind, full)
+            result.kinds.append(kind_result)
+            if not kind_result.complete:
+                break
+
+        result.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(
+            "website_sync_in_completed",
+            fetched={k.kind: k.fetched for k in result.kinds},
+            applied={k.kind: k.applied for k in result.kinds},
+            duration_ms=result.duration_ms
+        )
+        return result
+
+    @staticmethod
+    def _parse(kind: str, parse: Callable[[dict], Optional[dict]], items: list[dict]) -> list[dict]:
+        rows = []
+        for item in items:
+            try:
+                row = parse(item)
+            except (TypeError, ValueError) as e:
+                # One bad item must not stop the page or the run
+                logger.warning(
+                    "website_change_malformed", kind=kind, id=item.get("id"), error=str(e)
+                )
+                continue
+            if row is not None:
+                rows.append(row)
+        return rows
+
+    async def _sync(self, kind: str, full: bool) -> InboundKindResult:
+        parse, apply = self.KINDS[kind]
+        result = InboundKindResult(kind=kind)
+
+        since, after_id = None, None
+        if not full:
+            async with self.session_factory() as session:
+                cursor = await EventRepository(session).get_sync_cursor(kind)
+            if cursor is not None:
+                since, after_id = cursor
+
+        while True:
+            async with self.session_factory() as session:
+                items = await WebsiteSyncService(session).get_changes(
+                    kind, since, after_id, self.page_size
+                )
+            if items is None:
+                result.complete = False
+                break
+            if not items:
+                break
+
+            rows = self._parse(kind, parse, items)
+            since, after_id = parse_timestamp(items[-1].get("updated_at")), items[-1].get("id")
+            if since is None or after_id is None:
+                logger.warning("website_changes_unordered", kind=kind)
+                result.complete = False
+                break
+
+            # The cursor moves with the page, in one transaction
+            async with self.session_factory() as session:
+                repo = EventRepository(session)
+                result.applied += await apply(repo, rows)
+                await repo.set_sync_cursor(kind, since, int(after_id))
+            result.fetched += len(items)
+            result.pages += 1
+            if len(items) < self.page_size:
+                break
+
+        return result
@@ -253,6 +253,7 @@ class InlineKeyboards:
                 InlineKeyboardButton("📅 События", callback_data="admin_events"),
             ],
             [
+                InlineKeyboardButton("📈 Аналитика", callback_data="admin_analytics"),
                 InlineKeyboardButton("📢 Рассылка", callback_data="admin_broadcast"),
             ],
             [
@@ -271,6 +272,22 @@ class InlineKeyboards:
             InlineKeyboardButton("« Назад", callback_data=callback_data)
         ]])
     
+    @staticmethod
+    def transactions_nav(
+        next_cursor: Optional[str] = None,
+        prev_cursor: Optional[str] = None
+    ) -> InlineKeyboardMarkup:
+        """Transaction history paging; cursors are at most 22 chars."""
+        nav = []
+        if prev_cursor:
+            nav.append(InlineKeyboardButton("« Новее", callback_data=f"transactions:p:{prev_cursor}"))
+        if next_cursor:
+            nav.append(InlineKeyboardButton("Старее »", callback_data=f"transactions:n:{next_cursor}"))
+        
+        keyboard = [nav] if nav else []
+        keyboard.append([InlineKeyboardButton("« Назад", callback_data="profile")])
+        return InlineKeyboardMarkup(keyboard)
+    
     @staticmethod
     def close_button() -> InlineKeyboardMarkup:
         """Close button."""
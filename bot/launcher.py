@@ -55,6 +55,7 @@ async def start_bot():
         print("[BOT] Loading bot modules...")
         
         # Import AFTER sys.path is set
+        from bot.config import settings
         from bot.main import create_application, run_bot_async
         from bot.utils.logger import logger
         
@@ -64,9 +65,9 @@ async def start_bot():
         app = await create_application()
         
         print("[BOT] ✅ Application created successfully")
-        print("[BOT] 🤖 Starting Telegram Bot polling...")
+        print(f"[BOT] 🤖 Starting Telegram Bot ({settings.bot_mode})...")
         
-        # Run polling ASYNC
+        # Run polling or webhook ASYNC
         await run_bot_async(app)
         
     except asyncio.CancelledError:
@@ -172,6 +173,20 @@ async def main():
     finally:
         print("[MAIN] Shutting down...")
         
+        # Write pending door check-ins while the database is still up
+        try:
+            from bot.api_server import shutdown_checkin
+            await shutdown_checkin()
+        except Exception as e:
+            print(f"[API] ⚠️  Check-in flush error: {e}")
+        
+        # Apply queued website webhook events
+        try:
+            from bot.services.website_webhooks import website_webhooks
+            await website_webhooks.stop()
+        except Exception as e:
+            print(f"[API] ⚠️  Website webhook flush error: {e}")
+        
         # Cleanup database
         try:
             from bot.database.session import db_manager
@@ -15,9 +15,18 @@ from telegram.ext import (
     filters,
 )
 from bot.config import settings
-from bot.database.session import db_manager
 from bot.database.base import Base
+from bot.database.repositories.user_repository import UserRepository
+from bot.jobs.registry import register_jobs
+from bot.jobs.scheduler import scheduler
+from bot.services.achievements import achievement_engine
+from bot.services.analytics import analytics
+from bot.services.qr_generator import qr_renderer
 from bot.utils.logger import logger
+from bot.utils.metrics import update_queue_depth
+from bot.utils.persistence import RedisUserDataPersistence
+from bot.utils.telegram_request import InstrumentedHTTPXRequest
+from bot.utils.update_processor import KeyedUpdateProcessor
 
 # Import handlers
 from bot.handlers.start import register_start_handlers
@@ -64,6 +73,13 @@ async def post_init(application: Application) -> None:
         
         await application.bot.set_my_commands(commands)
         logger.info("bot_commands_set")
+        
+        await analytics.start()
+        await achievement_engine.load()
+        UserRepository.on_counters_changed = achievement_engine.evaluate
+        
+        register_jobs(scheduler, application.bot)
+        await scheduler.start()
         logger.info("post_init_complete")
         
     except Exception as e:
@@ -75,7 +91,11 @@ async def post_shutdown(application: Application) -> None:
     """Cleanup resources after Application stops."""
     try:
         logger.info("post_shutdown_starting")
-        await db_manager.close()
+        await scheduler.stop()
+        # Write buffered analytics while the database is still up;
+        # the engine itself is disposed by launcher.py
+        await analytics.stop()
+        qr_renderer.shutdown()
         logger.info("post_shutdown_complete")
     except Exception as e:
         logger.error("post_shutdown_error", error=str(e))
@@ -113,19 +133,38 @@ async def create_application() -> Application:
         logger.info("creating_application")
         
         # Build Application using builder pattern (REQUIRED for v20+)
-        app = (
+        # Timeouts live on the request objects (builder timeouts can't be
+        # combined with custom requests); both record Bot API latency
+        timeouts = dict(read_timeout=30, write_timeout=30, connect_timeout=30, pool_timeout=30)
+        builder = (
             Application.builder()
             .token(settings.bot_token)
-            .concurrent_updates(True)
-            .read_timeout(30)
-            .write_timeout(30)
-            .connect_timeout(30)
-            .pool_timeout(30)
+            .concurrent_updates(
+                KeyedUpdateProcessor(
+                    settings.update_max_concurrency,
+                    max_pending_updates=settings.update_max_pending,
+                    max_pending_per_user=settings.update_max_pending_per_user,
+                )
+            )
+            .request(InstrumentedHTTPXRequest(connection_pool_size=256, **timeouts))
+            .get_updates_request(InstrumentedHTTPXRequest(**timeouts))
             .post_init(post_init)
             .post_shutdown(post_shutdown)
-            .build()
         )
         
+        # Navigation state survives restarts; only whitelisted primitive keys
+        if settings.user_data_persistence:
+            builder = builder.persistence(
+                RedisUserDataPersistence(
+                    settings.redis_url,
+                    update_interval=settings.user_data_update_interval,
+                    ttl_seconds=settings.user_data_ttl_days * 86400,
+                )
+            )
+        
+        app = builder.build()
+        update_queue_depth.set_function(app.update_queue.qsize)
+        
         # Register handlers BEFORE starting
         register_handlers(app)
         
@@ -137,12 +176,58 @@ async def create_application() -> Application:
         raise
 
 
+async def wait_for_stop_signal() -> None:
+    """Block until SIGINT or SIGTERM is received."""
+    stop_signals = (signal.SIGINT, signal.SIGTERM)
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    for sig in stop_signals:
+        loop.add_signal_handler(sig, future.set_result, None)
+    
+    try:
+        await future
+    finally:
+        for sig in stop_signals:
+            loop.remove_signal_handler(sig)
+
+
+async def run_webhook(application: Application) -> None:
+    """
+    Receive updates through the FastAPI /telegram/webhook route.
+    The API server (started by launcher.py in the same loop) pushes updates
+    into application.update_queue; the webhook is left registered on
+    shutdown so other instances behind the load balancer keep receiving.
+    """
+    if not settings.webhook_url or not settings.webhook_secret_token:
+        raise RuntimeError("BOT_MODE=webhook requires WEBHOOK_URL and WEBHOOK_SECRET_TOKEN")
+    
+    from bot.api_server import attach_telegram_application
+    attach_telegram_application(application)
+    
+    webhook_url = settings.webhook_url.rstrip("/") + "/telegram/webhook"
+    await application.bot.set_webhook(
+        url=webhook_url,
+        secret_token=settings.webhook_secret_token,
+        allowed_updates=Update.ALL_TYPES,
+        drop_pending_updates=False,
+    )
+    logger.info("webhook_set", url=webhook_url)
+    print("[BOT] ✅ Telegram Bot is now receiving updates via webhook")
+    
+    await wait_for_stop_signal()
+    logger.info("webhook_shutdown_signal_received")
+
+
 async def run_bot_async(application: Application) -> None:
     """
-    Run bot in polling mode ASYNCHRONOUSLY with production-grade retry mechanism.
+    Run bot ASYNCHRONOUSLY with production-grade retry mechanism.
     This is the ASYNC version for use inside an existing event loop.
     CRITICAL: Does NOT create a new event loop.
     
+    With BOT_MODE=webhook updates arrive through the API server instead
+    (see run_webhook) and the polling loop below is skipped.
+    
     Implements infinite loop with exponential backoff for maximum reliability.
     Never stops unless explicitly signaled (SIGINT/SIGTERM).
     """
@@ -152,7 +237,7 @@ async def run_bot_async(application: Application) -> None:
     max_consecutive = 5  # Reset after success
     
     try:
-        logger.info("bot_starting", mode="async_polling_with_retry")
+        logger.info("bot_starting", mode=settings.bot_mode)
         
         # Initialize the application
         await application.initialize()
@@ -162,6 +247,10 @@ async def run_bot_async(application: Application) -> None:
         await application.start()
         logger.info("application_started")
         
+        if settings.bot_mode == "webhook":
+            await run_webhook(application)
+            return
+        
         # INFINITE LOOP: Production systems never exit polling
         while True:
             try:
@@ -186,21 +275,9 @@ async def run_bot_async(application: Application) -> None:
                 # Keep running (this blocks forever or until signal)
                 print("[BOT] ✅ Telegram Bot is now polling for updates")
                 
-                # This is a blocking wait for graceful shutdown
-                stop_signals = (signal.SIGINT, signal.SIGTERM)
-                loop = asyncio.get_event_loop()
-                future = loop.create_future()
-                
-                for sig in stop_signals:
-                    loop.add_signal_handler(sig, future.set_result, None)
-                
-                try:
-                    await future
-                    logger.info("polling_shutdown_signal_received")
-                    break  # Graceful shutdown
-                finally:
-                    for sig in stop_signals:
-                        loop.remove_signal_handler(sig)
+                await wait_for_stop_signal()
+                logger.info("polling_shutdown_signal_received")
+                break  # Graceful shutdown
                     
             except (NetworkError, TimedOut) as e:
                 consecutive_errors += 1
@@ -273,6 +350,10 @@ async def run_bot_async(application: Application) -> None:
     finally:
         logger.info("bot_stopping")
         try:
+            if settings.bot_mode == "webhook":
+                from bot.api_server import attach_telegram_application
+                attach_telegram_application(None)
+            
             # Stop polling
             if application.updater and application.updater.running:
                 await application.updater.stop()
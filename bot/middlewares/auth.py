@@ -5,13 +5,15 @@ from telegram.ext import ContextTypes
 
 from bot.database.session import db_manager
 from bot.database.repositories.user_repository import UserRepository
+from bot.database.snapshots import USER_SNAPSHOT_KEY
 from bot.utils.logger import logger
 
 
 def auth_middleware(func):
     """
     Middleware decorator for authenticating users.
-    Fetches user from database and adds to context.
+    Loads a UserSnapshot for the duration of the update; no ORM object is
+    kept in context.user_data.
     """
     @wraps(func)
     async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
@@ -21,14 +23,9 @@ def auth_middleware(func):
         user_id = update.effective_user.id
         
         try:
-            # Get or create user in database
             async with db_manager.session() as session:
                 user_repo = UserRepository(session)
-                db_user = await user_repo.get_by_id(user_id)
-                
-                # Store in context for handlers
-                context.user_data["db_user"] = db_user
-                context.user_data["user_id"] = user_id
+                context.user_data[USER_SNAPSHOT_KEY] = await user_repo.get_snapshot(user_id)
         except Exception as e:
             logger.error(
                 "auth_middleware_error",
@@ -36,6 +33,9 @@ def auth_middleware(func):
                 error=str(e)
             )
         
-        return await func(update, context, *args, **kwargs)
+        try:
+            return await func(update, context, *args, **kwargs)
+        finally:
+            context.user_data.pop(USER_SNAPSHOT_KEY, None)
     
     return wrapper
@@ -4,6 +4,11 @@ from typing import Optional, Dict, Any
 import asyncio
 
 from bot.utils.logger import logger
+from bot.utils.metrics import cache_requests
+
+
+_cache_hits = cache_requests.labels("hit")
+_cache_misses = cache_requests.labels("miss")
 
 
 class UserCacheManager:
@@ -50,6 +55,7 @@ class UserCacheManager:
         """
         async with self.lock:
             if user_id not in self.cache:
+                _cache_misses.inc()
                 return None
             
             # Check if expired based on its assigned TTL
@@ -58,8 +64,10 @@ class UserCacheManager:
                 del self.cache_timestamps[user_id]
                 if user_id in self.cache_ttl:
                     del self.cache_ttl[user_id]
+                _cache_misses.inc()
                 return None
             
+            _cache_hits.inc()
             logger.debug(
                 "cache_hit",
                 user_id=user_id,
@@ -1,47 +1,60 @@
 """Logging middleware for handlers."""
+import time
 from functools import wraps
 from telegram import Update
 from telegram.ext import ContextTypes
 
+from bot.database.diagnostics import query_scope
+from bot.services.analytics import analytics
 from bot.utils.logger import logger
+from bot.utils.metrics import handler_errors, handler_latency
 
 
 def logging_middleware(func):
     """
     Middleware decorator for logging requests.
+    Emits a single line per update with handler timing; the
+    update_processed event is sampled (see LOG_SAMPLE_RULES) while every
+    call is recorded in the handler latency histogram and as a
+    "handler_call" analytics event (DAU, events per handler).
     """
+    latency = handler_latency.labels(func.__name__)
+    errors = handler_errors.labels(func.__name__)
+    
     @wraps(func)
     async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
         user_id = update.effective_user.id if update.effective_user else None
-        chat_id = update.effective_chat.id if update.effective_chat else None
-        
-        # Log incoming update
-        logger.info(
-            "incoming_update",
-            handler=func.__name__,
-            user_id=user_id,
-            chat_id=chat_id,
-            update_type=update.update_id
-        )
+        start_time = time.perf_counter()
+        analytics.track("handler_call", user_id=user_id, handler=func.__name__)
         
         try:
-            result = await func(update, context, *args, **kwargs)
-            
-            logger.info(
-                "update_processed",
-                handler=func.__name__,
-                user_id=user_id
-            )
-            
-            return result
-            
+            with query_scope(func.__name__) as queries:
+                result = await func(update, context, *args, **kwargs)
         except Exception as e:
+            duration = time.perf_counter() - start_time
+            latency.observe(duration)
+            errors.inc()
             logger.error(
                 "update_error",
                 handler=func.__name__,
                 user_id=user_id,
-                error=str(e)
+                update_id=update.update_id,
+                error=str(e),
+                duration_ms=round(duration * 1000, 1),
+                queries=queries.count
             )
             raise
+        
+        duration = time.perf_counter() - start_time
+        latency.observe(duration)
+        logger.info(
+            "update_processed",
+            handler=func.__name__,
+            user_id=user_id,
+            update_id=update.update_id,
+            duration_ms=round(duration * 1000, 1),
+            queries=queries.count
+        )
+        return result
     
     return wrapper
@@ -0,0 +1,266 @@
+"""Achievement rules compiled from the achievements table and awarded on counter changes."""
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.database.models import Achievement, User
+from bot.database.repositories.achievement_repository import AchievementRepository
+from bot.database.repositories.transaction_repository import TransactionRepository
+from bot.database.session import SessionFactory, db_manager
+from bot.utils.logger import logger
+
+try:
+    import numpy as np
+except ImportError:  # Optional: pip install numpy
+    np = None
+
+
+# Achievement.requirement_type -> the User counter it is measured on.
+# Nothing updates total_events_attended incrementally, so events_attended
+# achievements are only awarded by backfill()
+METRIC_COLUMNS = {
+    "events_attended": User.total_events_attended,
+    "referrals": User.referral_count,
+    "daily_streak": User.daily_streak,
+    "up_coins": User.up_coins,
+}
+
+
+# Rounds of rewards awarding further up_coins achievements
+MAX_REWARD_ROUNDS = 10
+
+
+@dataclass(frozen=True)
+class AchievementRule:
+    """An active achievement reached at threshold of its metric."""
+
+    id: int
+    code: str
+    title: str
+    metric: str
+    threshold: int
+    reward: int
+
+
+class CompiledRules:
+    """Rules grouped per metric with thresholds sorted for bisect."""
+
+    def __init__(self, achievements: list[Achievement]):
+        by_metric = defaultdict(list)
+        for achievement in achievements:
+            if achievement.requirement_type not in METRIC_COLUMNS:
+                logger.warning(
+                    "achievement_unknown_metric",
+                    code=achievement.code,
+                    requirement_type=achievement.requirement_type
+                )
+                continue
+            by_metric[achievement.requirement_type].append(AchievementRule(
+                id=achievement.id,
+                code=achievement.code,
+                title=achievement.title,
+                metric=achievement.requirement_type,
+                threshold=achievement.requirement_value,
+                reward=achievement.up_coins_reward or 0,
+            ))
+
+        self.rules: dict[str, list[AchievementRule]] = {}
+        self.thresholds: dict[str, list[int]] = {}
+        for metric, rules in by_metric.items():
+            rules.sort(key=lambda rule: (rule.threshold, rule.id))
+            self.rules[metric] = rules
+            self.thresholds[metric] = [rule.threshold for rule in rules]
+
+    def crossed(self, metric: str, old, new) -> list[AchievementRule]:
+        """Rules with old < threshold <= new."""
+        thresholds = self.thresholds.get(metric)
+        if not thresholds or new <= old:
+            return []
+        return self.rules[metric][bisect_right(thresholds, old):bisect_right(thresholds, new)]
+
+    def reached(self, metric: str, value) -> list[AchievementRule]:
+        """Rules with threshold <= value."""
+        thresholds = self.thresholds.get(metric)
+        if not thresholds:
+            return []
+        return self.rules[metric][:bisect_right(thresholds, value)]
+
+
+@dataclass
+class BackfillResult:
+    """Outcome of a backfill run."""
+
+    users: int = 0
+    awarded: int = 0
+    coins: Decimal = Decimal(0)
+    duration_ms: float = 0.0
+
+
+class AchievementEngine:
+    """
+    Award achievements when the counters they are defined on change.
+
+    Active Achievement rows are loaded once at startup (load(); nothing is
+    evaluated before it) and compiled into sorted per-metric thresholds.
+    evaluate(), installed as UserRepository.on_counters_changed, takes a
+    counter's old and new value and bisects them, so a change that crosses
+    nothing costs no query. Crossed achievements are inserted in one
+    statement (existing awards are skipped by the unique constraint) and
+    each new award's up_coins_reward is recorded in the ledger in the
+    caller's transaction, so the award and its coins commit or roll back
+    together. A reward that lifts the balance past an up_coins threshold
+    awards that achievement in the same go.
+
+    backfill() reloads the rules and evaluates every user against all
+    thresholds, e.g. after adding achievements or for counters changed
+    outside evaluate().
+    """
+
+    def __init__(self):
+        self._rules: Optional[CompiledRules] = None
+
+    async def load(self, session_factory: SessionFactory = db_manager.session) -> CompiledRules:
+        """Compile active achievements; call again after editing them."""
+        async with session_factory() as session:
+            self._rules = CompiledRules(await AchievementRepository(session).get_active())
+        logger.info(
+            "achievements_loaded",
+            rules=sum(len(rules) for rules in self._rules.rules.values())
+        )
+        return self._rules
+
+    async def evaluate(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        changes: dict[str, tuple]
+    ) -> list[AchievementRule]:
+        """Award rules crossed by {metric: (old, new)}; returns the new awards."""
+        if self._rules is None:
+            return []
+        crossed = [
+            rule
+            for metric, (old, new) in changes.items()
+            for rule in self._rules.crossed(metric, old, new)
+        ]
+        if not crossed:
+            return []
+        awarded = await self._award(session, [(user_id, rule) for rule in crossed])
+        for _, rule in awarded:
+            logger.info("achievement_awarded", user_id=user_id, achievement=rule.code)
+        return [rule for _, rule in awarded]
+
+    async def _award(
+        self,
+        session: AsyncSession,
+        pairs: list[tuple[int, AchievementRule]],
+        depth: int = 0
+    ) -> list[tuple[int, AchievementRule]]:
+        inserted = await AchievementRepository(session).award(
+            [(user_id, rule.id) for user_id, rule in pairs]
+        )
+        awarded = [(user_id, rule) for user_id, rule in pairs if (user_id, rule.id) in inserted]
+
+        # user_id -> balance before and after this round's rewards
+        balances: dict[int, tuple[Decimal, Decimal]] = {}
+        transactions = TransactionRepository(session)
+        for user_id, rule in awarded:
+            if rule.reward > 0:
+                entry = await transactions.record(
+                    user_id,
+                    Decimal(rule.reward),
+                    "achievement",
+                    f"Achievement: {rule.title}",
+                    {"achievement": rule.code}
+                )
+                if entry is not None:
+                    old, _ = balances.get(user_id, (entry.balance_after - entry.amount, None))
+                    balances[user_id] = (old, entry.balance_after)
+
+        # Rewards are credits too: award up_coins thresholds they cross.
+        # Each round needs a new award to continue, so this ends; the depth
+        # cap only guards against a bug turning it into a loop
+        if self._rules is not None and balances:
+            crossed = [
+                (user_id, rule)
+                for user_id, (old, new) in balances.items()
+                for rule in self._rules.crossed("up_coins", old, new)
+            ]
+            if crossed and depth < MAX_REWARD_ROUNDS:
+                awarded += await self._award(session, crossed, depth + 1)
+            elif crossed:
+                logger.warning("achievement_reward_rounds_exceeded", users=len(balances))
+        return awarded
+
+    def _reached_pairs(self, rules: CompiledRules, rows: list) -> list[tuple[int, AchievementRule]]:
+        if np is None:
+            return [
+                (row.id, rule)
+                for row in rows
+                for metric in rules.rules
+                for rule in rules.reached(metric, getattr(row, metric) or 0)
+            ]
+
+        ids = np.fromiter((row.id for row in rows), dtype=np.int64, count=len(rows))
+        pairs = []
+        for metric, metric_rules in rules.rules.items():
+            values = np.array([getattr(row, metric) or 0 for row in rows], dtype=np.float64)
+            # Rules reached per user, then (user, rule index) pairs without a Python loop
+            counts = np.searchsorted(rules.thresholds[metric], values, side="right")
+            users = np.repeat(ids, counts)
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            pairs.extend(
+                (user_id, metric_rules[index])
+                for user_id, index in zip(users.tolist(), offsets.tolist())
+            )
+        return pairs
+
+    async def backfill(
+        self,
+        session_factory: SessionFactory = db_manager.session,
+        chunk_size: int = 1000
+    ) -> BackfillResult:
+        """Evaluate all users in id-ordered chunks, one transaction per chunk."""
+        result = BackfillResult()
+        start = time.perf_counter()
+        last_id = 0
+
+        rules = await self.load(session_factory)
+        columns = [METRIC_COLUMNS[metric].label(metric) for metric in rules.rules]
+
+        while columns:
+            async with session_factory() as session:
+                rows = (await session.execute(
+                    select(User.id, *columns)
+                    .where(User.id > last_id)
+                    .order_by(User.id)
+                    .limit(chunk_size)
+                )).all()
+                if not rows:
+                    break
+                awarded = await self._award(session, self._reached_pairs(rules, rows))
+
+            result.users += len(rows)
+            result.awarded += len(awarded)
+            result.coins += sum(rule.reward for _, rule in awarded)
+            last_id = rows[-1].id
+
+        result.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(
+            "achievements_backfilled",
+            users=result.users,
+            awarded=result.awarded,
+            coins=float(result.coins),
+            duration_ms=result.duration_ms
+        )
+        return result
+
+
+# Global instance
+achievement_engine = AchievementEngine()
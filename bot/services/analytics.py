@@ -0,0 +1,126 @@
+"""Analytics event pipeline: bounded buffer with a background batch writer."""
+import asyncio
+from collections import deque
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+from bot.config import settings
+from bot.database.repositories.analytics_repository import AnalyticsRepository
+from bot.database.session import db_manager
+from bot.utils.logger import logger
+from bot.utils.metrics import analytics_events, analytics_queue_depth
+
+
+BatchWriter = Callable[[list[dict]], Awaitable[None]]
+
+
+async def write_to_database(batch: list[dict]) -> None:
+    """Insert a batch into analytics_events in one statement."""
+    async with db_manager.session() as session:
+        await AnalyticsRepository(session).insert_many(batch)
+
+
+class AnalyticsPipeline:
+    """
+    Collect analytics events in memory and write them in batches.
+
+    track() never blocks or touches the database: events go to a bounded
+    buffer and are dropped (and counted) once it is full. A background task
+    writes the buffer every flush_interval seconds, or as soon as a full
+    batch is waiting. stop() writes whatever is left.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 5.0,
+        writer: BatchWriter = write_to_database,
+        enabled: bool = True,
+    ):
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self._writer = writer
+        self._buffer: deque[dict] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @property
+    def pending(self) -> int:
+        """Events waiting to be written."""
+        return len(self._buffer)
+
+    def track(self, event: str, user_id: Optional[int] = None, handler: Optional[str] = None) -> bool:
+        """Queue an event; returns False if it was dropped."""
+        if not self.enabled:
+            return False
+
+        if len(self._buffer) >= self.max_queue_size:
+            analytics_events.labels("dropped").inc()
+            return False
+
+        self._buffer.append({
+            "event": event,
+            "user_id": user_id,
+            "handler": handler,
+            "created_at": datetime.utcnow(),
+        })
+        if self._wakeup is not None and len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def start(self) -> None:
+        """Start the background writer."""
+        if self._task is not None or not self.enabled:
+            return
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        analytics_queue_depth.set_function(lambda: len(self._buffer))
+        self._task = asyncio.create_task(self._run(), name="analytics_writer")
+        logger.info("analytics_pipeline_started", batch_size=self.batch_size)
+
+    async def stop(self) -> None:
+        """Stop the writer and flush remaining events."""
+        if self._task is not None:
+            self._closing = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        logger.info("analytics_pipeline_stopped")
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write all buffered events in batches of batch_size."""
+        while self._buffer:
+            count = min(self.batch_size, len(self._buffer))
+            batch = [self._buffer.popleft() for _ in range(count)]
+            try:
+                await self._writer(batch)
+            except Exception as e:
+                # Not re-queued: a failing database must not grow the buffer
+                analytics_events.labels("failed").inc(count)
+                logger.warning("analytics_flush_failed", events=count, error=str(e))
+                return
+            analytics_events.labels("written").inc(count)
+            logger.debug("analytics_flushed", events=count)
+
+
+# Global instance
+analytics = AnalyticsPipeline(
+    max_queue_size=settings.analytics_queue_size,
+    batch_size=settings.analytics_batch_size,
+    flush_interval=settings.analytics_flush_interval,
+    enabled=settings.analytics_enabled,
+)
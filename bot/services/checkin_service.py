@@ -0,0 +1,277 @@
+"""Door check-in against a preloaded in-memory ticket index."""
+import asyncio
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import bindparam, select, update
+
+from bot.config import settings
+from bot.database.models import Event, Ticket
+from bot.database.session import SessionFactory, db_manager
+from bot.services.ticket_signing import verify_ticket
+from bot.utils.logger import logger
+
+
+# Payloads printed before signing: UPC-TICKET-{ticket_id}-{qr_code}
+_LEGACY_PAYLOAD = re.compile(r"^UPC-TICKET-(\d+)-(.+)$")
+
+
+@dataclass(slots=True)
+class _IndexedTicket:
+    qr_code: str
+    status: str
+    used_at: Optional[datetime]
+
+
+@dataclass(frozen=True)
+class CheckInResult:
+    """Outcome of one scan."""
+
+    ok: bool
+    reason: str  # ok, invalid, unknown_ticket, wrong_event, already_used, not_active
+    ticket_id: Optional[int] = None
+    used_at: Optional[datetime] = None
+
+
+class CheckInService:
+    """
+    Validate door scans for one event without network calls.
+
+    load() reads the event's tickets once into a dict keyed by ticket id.
+    check_in() verifies the HMAC signature and looks the ticket up in that
+    dict - no I/O, so a scan takes microseconds - and marks it used in
+    memory. A correctly signed ticket missing from the index (bought after
+    load()) is read by primary key once and added to it. Used marks are
+    written back by flush() in one batched UPDATE, periodically once
+    start() is called; if the database is unreachable they stay pending
+    and are retried on the next flush.
+    """
+
+    def __init__(
+        self,
+        event_id: int,
+        session_factory: SessionFactory = db_manager.session,
+        sync_interval: float = 5.0,
+    ):
+        self.event_id = event_id
+        self.session_factory = session_factory
+        self.sync_interval = sync_interval
+        self._tickets: Dict[int, _IndexedTicket] = {}
+        self._pending: Dict[int, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        """Check-ins not yet written to the database."""
+        return len(self._pending)
+
+    async def load(self) -> int:
+        """Load the event's tickets into the index; returns the ticket count."""
+        start = time.perf_counter()
+        async with self.session_factory() as session:
+            rows = (await session.execute(
+                select(Ticket.id, Ticket.qr_code, Ticket.status, Ticket.used_at)
+                .where(Ticket.event_id == self.event_id)
+            )).all()
+
+        self._tickets = {
+            row.id: _IndexedTicket(row.qr_code, row.status, row.used_at) for row in rows
+        }
+        # Keep local check-ins the database hasn't seen yet
+        for ticket_id, used_at in self._pending.items():
+            ticket = self._tickets.get(ticket_id)
+            if ticket is not None:
+                ticket.status, ticket.used_at = "used", used_at
+
+        logger.info(
+            "checkin_index_loaded",
+            event_id=self.event_id,
+            tickets=len(self._tickets),
+            duration_ms=round((time.perf_counter() - start) * 1000, 1)
+        )
+        return len(self._tickets)
+
+    def _resolve(self, payload: str) -> tuple[Optional[int], str]:
+        signed = verify_ticket(payload)
+        if signed is not None:
+            ticket_id, event_id = signed
+            if event_id != self.event_id:
+                return ticket_id, "wrong_event"
+            return ticket_id, "ok"
+
+        legacy = _LEGACY_PAYLOAD.match(payload.strip())
+        if legacy is not None:
+            ticket_id = int(legacy.group(1))
+            ticket = self._tickets.get(ticket_id)
+            if ticket is not None and ticket.qr_code == legacy.group(2):
+                return ticket_id, "ok"
+            return None, "unknown_ticket"
+
+        return None, "invalid"
+
+    async def _fetch(self, ticket_id: int) -> Optional[_IndexedTicket]:
+        try:
+            async with self.session_factory() as session:
+                row = (await session.execute(
+                    select(Ticket.qr_code, Ticket.status, Ticket.used_at)
+                    .where(Ticket.id == ticket_id)
+                    .where(Ticket.event_id == self.event_id)
+                )).one_or_none()
+        except Exception as e:
+            logger.warning("checkin_lookup_failed", event_id=self.event_id, ticket_id=ticket_id, error=str(e))
+            return None
+        if row is None:
+            return None
+        # A concurrent scan may have indexed it meanwhile
+        return self._tickets.setdefault(ticket_id, _IndexedTicket(row.qr_code, row.status, row.used_at))
+
+    async def check_in(self, payload: str) -> CheckInResult:
+        """Validate a scanned payload and mark the ticket used."""
+        ticket_id, reason = self._resolve(payload)
+        if reason != "ok":
+            return CheckInResult(False, reason, ticket_id)
+
+        ticket = self._tickets.get(ticket_id)
+        if ticket is None:
+            # Only reached with a valid signature: legacy codes resolve from the index
+            ticket = await self._fetch(ticket_id)
+        if ticket is None:
+            return CheckInResult(False, "unknown_ticket", ticket_id)
+        if ticket.status == "used":
+            return CheckInResult(False, "already_used", ticket_id, ticket.used_at)
+        if ticket.status != "active":
+            return CheckInResult(False, "not_active", ticket_id)
+
+        ticket.status = "used"
+        ticket.used_at = self._pending[ticket_id] = datetime.utcnow()
+        return CheckInResult(True, "ok", ticket_id, ticket.used_at)
+
+    async def flush(self) -> int:
+        """Write pending check-ins; returns how many were sent."""
+        if not self._pending:
+            return 0
+
+        batch = dict(self._pending)
+        try:
+            async with self.session_factory() as session:
+                # Never overwrite a check-in recorded elsewhere first
+                await session.execute(
+                    update(Ticket.__table__)
+                    .where(Ticket.__table__.c.id == bindparam("ticket_id"))
+                    .where(Ticket.__table__.c.used_at.is_(None))
+                    .values(status="used", used_at=bindparam("checked_in_at")),
+                    [
+                        {"ticket_id": ticket_id, "checked_in_at": used_at}
+                        for ticket_id, used_at in batch.items()
+                    ],
+                )
+        except Exception as e:
+            logger.warning("checkin_sync_failed", event_id=self.event_id, pending=len(batch), error=str(e))
+            return 0
+
+        for ticket_id in batch:
+            self._pending.pop(ticket_id, None)
+        logger.info("checkin_synced", event_id=self.event_id, tickets=len(batch))
+        return len(batch)
+
+    async def start(self) -> None:
+        """Flush pending check-ins every sync_interval seconds."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"checkin_sync_{self.event_id}")
+
+    async def stop(self) -> None:
+        """Stop periodic sync and write what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            await self.flush()
+
+
+class CheckInRegistry:
+    """
+    One CheckInService per event, shared by the check-in endpoint.
+
+    preload() loads the indexes of events starting soon ahead of time (run
+    at startup and then periodically), so the first guest at the door
+    doesn't wait for a load; any other event is loaded on its first scan.
+    """
+
+    # Events that started this long ago may still be checking guests in
+    RUNNING_WINDOW = timedelta(hours=12)
+
+    def __init__(
+        self,
+        session_factory: SessionFactory = db_manager.session,
+        sync_interval: float = 5.0,
+    ):
+        self.session_factory = session_factory
+        self.sync_interval = sync_interval
+        self._services: Dict[int, CheckInService] = {}
+        self._lock = asyncio.Lock()
+
+    def loaded(self, event_id: int) -> Optional[CheckInService]:
+        """The event's service if its index is loaded."""
+        return self._services.get(event_id)
+
+    async def get(self, event_id: int) -> CheckInService:
+        """The event's service, loading its index first if needed."""
+        service = self._services.get(event_id)
+        if service is None:
+            async with self._lock:
+                service = self._services.get(event_id)
+                if service is None:
+                    service = CheckInService(
+                        event_id, self.session_factory, sync_interval=self.sync_interval
+                    )
+                    await service.load()
+                    await service.start()
+                    self._services[event_id] = service
+        return service
+
+    async def preload(self, hours: Optional[float] = None) -> int:
+        """Load events starting within `hours` (CHECKIN_PRELOAD_HOURS); returns how many were new."""
+        hours = hours if hours is not None else settings.checkin_preload_hours
+        now = datetime.utcnow()
+        async with self.session_factory() as session:
+            event_ids = (await session.execute(
+                select(Event.id)
+                .where(Event.status == "upcoming")
+                .where(Event.event_date >= now - self.RUNNING_WINDOW)
+                .where(Event.event_date <= now + timedelta(hours=hours))
+            )).scalars().all()
+
+        new = [event_id for event_id in event_ids if event_id not in self._services]
+        for event_id in new:
+            await self.get(event_id)
+        if new:
+            logger.info("checkin_preloaded", events=new)
+        return len(new)
+
+    async def reload(self, event_ids: set[int]) -> None:
+        """Re-read the tickets of loaded events, e.g. after website changes."""
+        for event_id in event_ids:
+            service = self._services.get(event_id)
+            if service is not None:
+                await service.load()
+
+    async def shutdown(self) -> None:
+        """Write pending check-ins of all loaded events."""
+        for service in self._services.values():
+            await service.stop()
+        self._services.clear()
+
+
+# Global instance
+checkin_services = CheckInRegistry(sync_interval=settings.checkin_sync_interval)
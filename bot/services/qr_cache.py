@@ -0,0 +1,120 @@
+"""Two-tier cache for rendered QR code PNGs."""
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from bot.utils.logger import logger
+from bot.utils.metrics import qr_cache_requests
+
+
+# Prefix of Telegram file references stored in User.qr_code_url
+FILE_REF_PREFIX = "tg:"
+
+
+def cache_key(payload: str, style: str) -> str:
+    """Content address of a QR image: hash of what is encoded and how."""
+    return hashlib.sha256(f"{style}\x00{payload}".encode()).hexdigest()
+
+
+def make_file_ref(key: str, file_id: str) -> str:
+    """Bind an uploaded Telegram file_id to the cache key it was rendered from."""
+    return f"{FILE_REF_PREFIX}{key[:16]}:{file_id}"
+
+
+def file_id_for(stored: Optional[str], key: str) -> Optional[str]:
+    """Telegram file_id from a stored reference, if it matches the current image."""
+    if not stored or not stored.startswith(FILE_REF_PREFIX):
+        return None
+    ref_key, _, file_id = stored[len(FILE_REF_PREFIX):].partition(":")
+    # Payload or style changed since the upload
+    if ref_key != key[:16] or not file_id:
+        return None
+    return file_id
+
+
+class ContentAddressedStore:
+    """
+    Files named by their cache key, sharded by the first two hex digits.
+
+    Writes are atomic (temp file + rename), so a concurrent reader never
+    sees a partial file; rewriting an existing key is a no-op by design.
+    Methods are blocking - call them through asyncio.to_thread.
+    """
+
+    def __init__(self, directory: str, suffix: str = ".png"):
+        self.directory = Path(directory)
+        self.suffix = suffix
+
+    def path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}{self.suffix}"
+
+    def exists(self, key: str) -> bool:
+        return self.path(key).exists()
+
+    def read(self, key: str) -> Optional[bytes]:
+        try:
+            return self.path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def write(self, key: str, data: bytes) -> None:
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+
+class QRCodeCache:
+    """
+    PNG bytes by cache key: an in-process LRU in front of a
+    ContentAddressedStore.
+
+    The disk tier survives restarts and is shared by processes on the same
+    volume. File I/O runs in a worker thread; render is an async callable
+    (the QR render pool).
+    """
+
+    def __init__(self, directory: Optional[str], max_items: int = 256):
+        self.store = ContentAddressedStore(directory) if directory else None
+        self.max_items = max_items
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+
+    def _remember(self, key: str, data: bytes) -> None:
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    async def get_or_render(self, key: str, render: Callable[[], Awaitable[bytes]]) -> bytes:
+        """Cached PNG for key; render() is called only on a miss in both tiers."""
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            qr_cache_requests.labels("memory").inc()
+            return data
+
+        if self.store is not None:
+            try:
+                data = await asyncio.to_thread(self.store.read, key)
+            except OSError as e:
+                logger.warning("qr_cache_read_failed", key=key, error=str(e))
+            if data is not None:
+                qr_cache_requests.labels("disk").inc()
+                self._remember(key, data)
+                return data
+
+        qr_cache_requests.labels("render").inc()
+        data = await render()
+        self._remember(key, data)
+
+        if self.store is not None:
+            try:
+                await asyncio.to_thread(self.store.write, key, data)
+            except OSError as e:
+                # Memory tier still serves it; disk is an optimization
+                logger.warning("qr_cache_write_failed", key=key, error=str(e))
+        return data
@@ -1,115 +1,125 @@
 """QR code generation service."""
+import asyncio
 import qrcode
 from io import BytesIO
 from typing import Optional
-from pathlib import Path
 
 from bot.config import settings
+from bot.services.qr_cache import ContentAddressedStore, QRCodeCache, cache_key
+from bot.services.qr_render import QRRenderService, QRStyle, render_qr_png
+from bot.services.ticket_signing import sign_ticket
 from bot.utils.logger import logger
 
 
+PROFILE_STYLE = QRStyle()
+TICKET_STYLE = QRStyle(fill_color="#8B0000")  # Dark red
+# Pre-generated check-in images: two colors keep the PNG 1-bit, and medium
+# error correction with smaller modules is still easy to scan from a screen
+TICKET_COMPACT_STYLE = QRStyle(
+    error_correction=qrcode.constants.ERROR_CORRECT_M, box_size=6, border=2
+)
+REFERRAL_STYLE = QRStyle(error_correction=qrcode.constants.ERROR_CORRECT_M)
+ACCESS_CODE_STYLE = QRStyle()
+
+
+def ticket_payload(ticket_id: int, event_id: int) -> str:
+    """Data encoded in a ticket QR code: HMAC-signed, verifiable offline."""
+    return sign_ticket(ticket_id, event_id)
+
+
+# Shared by all QRCodeGenerator instances
+qr_cache = QRCodeCache(settings.qr_cache_dir, max_items=settings.qr_cache_memory_items)
+qr_renderer = QRRenderService(
+    workers=settings.qr_render_workers,
+    max_pending=settings.qr_render_max_pending,
+)
+# Permanent ticket images, served by the API at /api/qr/tickets/{key}.png
+ticket_qr_store = ContentAddressedStore(settings.ticket_qr_dir)
+
+# Strong references to background pre-render tasks
+_prewarm_tasks: set[asyncio.Task] = set()
+
+
+def _prewarm_done(task: asyncio.Task) -> None:
+    _prewarm_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("qr_prewarm_failed", error=str(task.exception()))
+
+
 class QRCodeGenerator:
     """Generate QR codes for users and tickets."""
     
     def __init__(self):
         self.base_url = settings.website_url
     
-    def generate_user_profile_qr(
+    def profile_url(self, user_id: int) -> str:
+        # Format: /u/UP-{user_id} - matches website routing
+        return f"{self.base_url}/u/UP-{user_id}"
+    
+    def referral_url(self, referral_code: str) -> str:
+        # Format: /join?ref={code} - matches website routing for referrals
+        return f"{self.base_url}/join?ref={referral_code}"
+    
+    async def cached_qr(self, data: str, style: QRStyle) -> tuple[bytes, str]:
+        """
+        PNG for data from the QR cache, rendered in the pool on a miss.
+        
+        Returns the image and its cache key (see qr_cache.make_file_ref).
+        """
+        key = cache_key(data, style.cache_id)
+        png = await qr_cache.get_or_render(key, lambda: qr_renderer.render(data, style))
+        return png, key
+    
+    def referral_qr_key(self, referral_code: str) -> str:
+        """Cache key of a referral QR code, without rendering it."""
+        return cache_key(self.referral_url(referral_code), REFERRAL_STYLE.cache_id)
+    
+    async def referral_qr(self, referral_code: str) -> tuple[bytes, str]:
+        """Cached referral QR code."""
+        return await self.cached_qr(self.referral_url(referral_code), REFERRAL_STYLE)
+    
+    def prewarm_referral_qr(self, referral_code: str) -> None:
+        """Render a referral QR into the cache in the background."""
+        task = asyncio.create_task(self.referral_qr(referral_code))
+        _prewarm_tasks.add(task)
+        task.add_done_callback(_prewarm_done)
+    
+    async def profile_qr(self, user_id: int) -> tuple[bytes, str]:
+        """Cached public profile QR code."""
+        return await self.cached_qr(self.profile_url(user_id), PROFILE_STYLE)
+    
+    async def generate_user_profile_qr(
         self,
         user_id: int,
         username: Optional[str] = None
     ) -> BytesIO:
         """Generate QR code linking to user's public profile on website."""
-        # Format: /u/UP-{user_id} - matches website routing
-        profile_path = f"u/UP-{user_id}"
-        profile_url = f"{self.base_url}/{profile_path}"
+        png, _ = await self.profile_qr(user_id)
         
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_H,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(profile_url)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Save to BytesIO
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
-        
-        logger.info("qr_generated", user_id=user_id, type="profile", url=profile_url)
-        return buffer
+        logger.info("qr_generated", user_id=user_id, type="profile")
+        return BytesIO(png)
     
-    def generate_ticket_qr(
+    async def generate_ticket_qr(
         self,
         ticket_id: int,
-        ticket_code: str
+        event_id: int
     ) -> BytesIO:
         """Generate QR code for event ticket."""
-        # Format: UPC-TICKET-{ticket_id}-{code}
-        ticket_data = f"UPC-TICKET-{ticket_id}-{ticket_code}"
-        
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_H,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(ticket_data)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="#8B0000", back_color="white")  # Dark red
-        
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
+        png = await qr_renderer.render(ticket_payload(ticket_id, event_id), TICKET_STYLE)
         
         logger.info("qr_generated", ticket_id=ticket_id, type="ticket")
-        return buffer
+        return BytesIO(png)
     
-    def generate_referral_qr(self, referral_code: str) -> BytesIO:
+    async def generate_referral_qr(self, referral_code: str) -> BytesIO:
         """Generate QR code for referral link."""
-        # Format: /join?ref={code} - matches website routing for referrals
-        referral_path = f"join?ref={referral_code}"
-        referral_url = f"{self.base_url}/{referral_path}"
-        
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_M,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(referral_url)
-        qr.make(fit=True)
+        png, _ = await self.referral_qr(referral_code)
         
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
-        
-        logger.info("qr_generated", referral_code=referral_code, type="referral", url=referral_url)
-        return buffer
+        logger.info("qr_generated", referral_code=referral_code, type="referral")
+        return BytesIO(png)
     
-    def generate_access_code_qr(self, auth_url: str) -> BytesIO:
-        """Generate QR code for authentication/access code."""
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_H,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(auth_url)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
+    async def generate_access_code_qr(self, auth_url: str) -> BytesIO:
+        """Generate QR code for authentication/access code (one-time URL, not cached)."""
+        png = await qr_renderer.render(auth_url, ACCESS_CODE_STYLE)
         
-        logger.info("qr_generated", type="access_code", url=auth_url)
-        return buffer
+        logger.info("qr_generated", type="access_code")
+        return BytesIO(png)
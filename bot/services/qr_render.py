@@ -0,0 +1,134 @@
+"""QR code rendering off the event loop.
+
+Process pool workers import this module to unpickle render calls, so its
+imports stay light (no database or telegram modules).
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import astuple, dataclass
+from io import BytesIO
+from typing import Optional, Sequence
+
+import qrcode
+
+from bot.utils.logger import logger
+from bot.utils.metrics import qr_render_latency, qr_render_pending
+
+
+@dataclass(frozen=True)
+class QRStyle:
+    """Rendering options; part of the cache key."""
+
+    error_correction: int = qrcode.constants.ERROR_CORRECT_H
+    fill_color: str = "black"
+    back_color: str = "white"
+    box_size: int = 10
+    border: int = 4
+
+    @property
+    def cache_id(self) -> str:
+        return "|".join(str(value) for value in astuple(self))
+
+
+def render_qr_png(data: str, style: QRStyle) -> bytes:
+    """Render a QR code to PNG bytes (CPU-bound)."""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=style.error_correction,
+        box_size=style.box_size,
+        border=style.border,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+
+    img = qr.make_image(fill_color=style.fill_color, back_color=style.back_color)
+
+    buffer = BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _render_batch(items: Sequence[tuple[str, QRStyle]]) -> list[bytes]:
+    # One pool round trip for many images
+    return [render_qr_png(data, style) for data, style in items]
+
+
+def _warm_worker() -> None:
+    # Import PIL's PNG encoder before the first real request
+    render_qr_png("warmup", QRStyle())
+
+
+class QRRenderService:
+    """
+    Render QR codes in a process pool.
+
+    At most max_pending renders (or batch chunks) are submitted at once;
+    further callers wait for a slot instead of piling work onto the pool.
+    With workers=0 rendering runs in the default thread pool (no extra
+    processes, but PIL still holds the GIL for part of the work).
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 32):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._slots = asyncio.Semaphore(max_pending)
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Renders submitted or waiting for a slot."""
+        return self._pending
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.workers <= 0:
+            return None
+        if self._executor is None:
+            # spawn: forking would copy the event loop and logging threads' locks
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+            qr_render_pending.set_function(lambda: self._pending)
+        return self._executor
+
+    async def _submit(self, func, *args):
+        self._pending += 1
+        try:
+            async with self._slots:
+                loop = asyncio.get_running_loop()
+                with qr_render_latency.time():
+                    try:
+                        return await loop.run_in_executor(self._get_executor(), func, *args)
+                    except BrokenProcessPool:
+                        # A worker died (OOM kill etc.); start a fresh pool next time
+                        logger.error("qr_render_pool_broken", exc_info=True)
+                        self._executor = None
+                        raise
+        finally:
+            self._pending -= 1
+
+    async def render(self, data: str, style: QRStyle) -> bytes:
+        """Render one QR code to PNG bytes."""
+        return await self._submit(render_qr_png, data, style)
+
+    async def render_many(self, items: Sequence[tuple[str, QRStyle]]) -> list[bytes]:
+        """Render many QR codes, split into one chunk per worker; order is kept."""
+        if not items:
+            return []
+        chunks = max(1, min(self.workers, len(items)))
+        size = -(-len(items) // chunks)
+        results = await asyncio.gather(*(
+            self._submit(_render_batch, list(items[i:i + size]))
+            for i in range(0, len(items), size)
+        ))
+        return [png for chunk in results for png in chunk]
+
+    def shutdown(self) -> None:
+        """Stop worker processes; queued renders are cancelled."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
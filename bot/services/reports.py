@@ -0,0 +1,344 @@
+"""Referral and economy reports computed over exported data with NumPy."""
+import gzip
+import io
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import orjson
+from PIL import Image, ImageDraw, ImageFont
+
+try:
+    import numpy as np
+except ImportError:  # Optional: pip install numpy
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+# Columns read from the export (see bot/jobs/export.py) and their dtypes
+TRANSACTION_COLUMNS = {
+    "id": "int64",
+    "user_id": "int64",
+    "type": "str",
+    "amount": "float64",
+    "created_at": "datetime64[us]",
+}
+USER_COLUMNS = {
+    "id": "int64",
+    "membership_level": "str",
+    "is_member": "bool",
+    "up_coins": "float64",
+    "referred_by_id": "int64",
+    "daily_streak": "int64",
+    "created_at": "datetime64[us]",
+    "updated_at": "datetime64[us]",
+}
+
+# Granted on signup: don't count as activity
+PASSIVE_TRANSACTION_TYPES = ("welcome", "referral_welcome")
+
+STREAK_EDGES = (1, 2, 4, 8, 15, 31)
+STREAK_LABELS = ("0", "1", "2-3", "4-7", "8-14", "15-30", "31+")
+
+_FILL = {"int64": 0, "float64": 0.0, "bool": False, "str": ""}
+# Weeks are counted from a Monday
+_WEEK_ZERO = "1970-01-05"
+
+
+def _from_values(values: list, dtype: str):
+    if dtype.startswith("datetime64"):
+        return np.array(["NaT" if v is None else v for v in values], dtype=dtype)
+    fill = _FILL[dtype]
+    return np.array([fill if v is None else v for v in values], dtype=dtype if dtype != "str" else str)
+
+
+def _from_arrow(column, dtype: str):
+    if dtype.startswith("datetime64"):
+        # Nulls become NaT
+        return column.cast(pa.timestamp("us")).to_numpy()
+    target = {"int64": pa.int64(), "float64": pa.float64(), "bool": pa.bool_(), "str": pa.string()}[dtype]
+    values = pc.fill_null(column.cast(target), _FILL[dtype]).to_numpy()
+    return values.astype(str) if dtype == "str" else values
+
+
+def _read_file(path: Path, columns: dict[str, str]) -> dict:
+    if path.name.endswith(".jsonl.gz"):
+        with gzip.open(path, "rb") as f:
+            rows = [orjson.loads(line) for line in f]
+        return {name: _from_values([r.get(name) for r in rows], dtype) for name, dtype in columns.items()}
+
+    if pa is None:
+        raise RuntimeError(f"pyarrow is required to read {path.name}")
+    if path.suffix == ".parquet":
+        table = pq.read_table(path, columns=list(columns))
+    else:
+        with pa.OSFile(str(path), "rb") as source:
+            table = pa.ipc.open_file(source).read_all().select(list(columns))
+    return {name: _from_arrow(table.column(name), dtype) for name, dtype in columns.items()}
+
+
+def load_export(directory: str, table: str, columns: dict[str, str]) -> dict:
+    """Concatenate every export file of table into one NumPy array per column."""
+    paths = sorted(
+        path for path in (Path(directory) / table).glob(f"{table}-*")
+        if not path.name.endswith(".tmp")
+    )
+    parts = [_read_file(path, columns) for path in paths]
+    if not parts:
+        return {name: _from_values([], dtype) for name, dtype in columns.items()}
+    return {name: np.concatenate([part[name] for part in parts]) for name in columns}
+
+
+def _take(data: dict, index) -> dict:
+    return {name: values[index] for name, values in data.items()}
+
+
+def latest_by_id(data: dict, version: Optional[str] = None) -> dict:
+    """
+    One row per id, sorted by id.
+
+    Incremental exports repeat changed rows (and full exports repeat all
+    of them); with version, the row with the greatest value wins.
+    """
+    if version is None:
+        _, index = np.unique(data["id"], return_index=True)
+        return _take(data, index)
+    order = np.lexsort((data[version], data["id"]))
+    ids = data["id"][order]
+    last = np.ones(len(ids), dtype=bool)
+    last[:-1] = ids[1:] != ids[:-1]
+    return _take(data, order[last])
+
+
+def _week_index(values):
+    return (values - np.datetime64(_WEEK_ZERO, "us")) // np.timedelta64(7, "D")
+
+
+@dataclass
+class EconomyReport:
+    """Aggregates behind the /admin analytics screen."""
+
+    generated_at: datetime
+    users: int
+    transactions: int
+    # Cohort start dates, oldest first; retention[c, k] is the share of
+    # cohort c active k weeks after signup (nan: not reached yet)
+    cohort_weeks: list[date] = field(default_factory=list)
+    cohort_sizes: list[int] = field(default_factory=list)
+    retention: Optional[object] = None
+    funnel: list[tuple[str, int]] = field(default_factory=list)
+    spent_30d: float = 0.0
+    earned_30d: float = 0.0
+    coin_supply: float = 0.0
+    streaks: list[tuple[str, int]] = field(default_factory=list)
+    # (level, users, total spent)
+    level_spend: list[tuple[str, int, float]] = field(default_factory=list)
+
+    @property
+    def velocity_30d(self) -> float:
+        """Coins spent in 30 days per coin in circulation."""
+        return self.spent_30d / self.coin_supply if self.coin_supply else 0.0
+
+
+def build_report(
+    users: dict,
+    transactions: dict,
+    now: Optional[datetime] = None,
+    weeks: int = 8
+) -> EconomyReport:
+    """
+    Compute the report with vectorized joins and group-bys.
+
+    Transactions are joined to users by binary search over the sorted user
+    ids; every group-by is a bincount over integer codes, so the cost is a
+    few passes over the arrays (about 2 s for 5M transactions, see
+    benchmarks/bench_reports.py).
+    """
+    now = now or datetime.utcnow()
+    now64 = np.datetime64(now, "us")
+    users = latest_by_id(users, version="updated_at")
+    transactions = latest_by_id(transactions)
+
+    user_ids = users["id"]
+    tx_user = transactions["user_id"]
+    amount = transactions["amount"]
+    report = EconomyReport(generated_at=now, users=len(user_ids), transactions=len(tx_user))
+
+    # Join: position of each transaction's user (-1 when not exported).
+    # Look up distinct user ids only; random probes into a large sorted
+    # array cost more than factorizing first.
+    distinct, inverse = np.unique(tx_user, return_inverse=True)
+    found = np.minimum(np.searchsorted(user_ids, distinct), max(len(user_ids) - 1, 0))
+    if len(user_ids):
+        found = np.where(user_ids[found] == distinct, found, -1)
+    else:
+        found = np.full(len(distinct), -1)
+    pos = found[inverse]
+    joined = pos >= 0
+
+    # Weekly signup cohorts
+    current_week = _week_index(now64)
+    first_week = current_week - weeks + 1
+    signup = users["created_at"]
+    has_signup = ~np.isnat(signup)
+    user_week = np.full(len(user_ids), -1, dtype=np.int64)
+    user_week[has_signup] = _week_index(signup[has_signup])
+    in_cohort = (user_week >= first_week) & (user_week <= current_week)
+
+    report.cohort_sizes = np.bincount(user_week[in_cohort] - first_week, minlength=weeks).tolist()
+    tx_time = transactions["created_at"]
+    sel = joined & ~np.isnat(tx_time)
+    sel[sel] &= in_cohort[pos[sel]]
+    offset = _week_index(tx_time[sel]) - user_week[pos[sel]]
+    in_range = (offset >= 0) & (offset < weeks)
+    # Distinct (user, week offset) pairs, marked in a users x weeks grid
+    seen = np.zeros(len(user_ids) * weeks, dtype=bool)
+    seen[pos[sel][in_range] * weeks + offset[in_range]] = True
+    pairs = np.flatnonzero(seen)
+    cohort = user_week[pairs // weeks] - first_week
+    active = np.bincount(cohort * weeks + pairs % weeks, minlength=weeks * weeks).reshape(weeks, weeks)
+
+    sizes = np.array(report.cohort_sizes, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        retention = active / sizes[:, None]
+    retention[sizes == 0] = np.nan
+    # Cohort c has only lived through weeks - c weeks so far
+    retention[np.add.outer(np.arange(weeks), np.arange(weeks)) >= weeks] = np.nan
+    report.retention = retention
+    report.cohort_weeks = [
+        date(1970, 1, 5) + timedelta(weeks=int(first_week + c)) for c in range(weeks)
+    ]
+
+    # Referral funnel
+    referred = users["referred_by_id"] != 0
+    activity = joined & ~np.isin(transactions["type"], PASSIVE_TRANSACTION_TYPES)
+    activated = np.zeros(len(user_ids), dtype=bool)
+    activated[pos[activity]] = True
+    spent_any = np.zeros(len(user_ids), dtype=bool)
+    spent_any[pos[joined & (amount < 0)]] = True
+    report.funnel = [
+        ("Пришли по приглашению", int(referred.sum())),
+        ("Активировались", int((referred & activated).sum())),
+        ("Потратили UP Coins", int((referred & spent_any).sum())),
+        ("Стали членами клуба", int((referred & users["is_member"]).sum())),
+    ]
+
+    # Coin velocity over the last 30 days
+    recent = tx_time >= now64 - np.timedelta64(30, "D")
+    report.spent_30d = abs(float(amount[recent & (amount < 0)].sum()))
+    report.earned_30d = float(amount[recent & (amount > 0)].sum())
+    report.coin_supply = float(users["up_coins"].sum())
+
+    # Streak distribution
+    buckets = np.digitize(users["daily_streak"], STREAK_EDGES)
+    counts = np.bincount(buckets, minlength=len(STREAK_LABELS))
+    report.streaks = list(zip(STREAK_LABELS, counts.tolist()))
+
+    # Spend per membership level
+    levels, level_code = np.unique(users["membership_level"], return_inverse=True)
+    spending = joined & (amount < 0)
+    spend = np.bincount(level_code[pos[spending]], weights=-amount[spending], minlength=len(levels))
+    members = np.bincount(level_code, minlength=len(levels))
+    report.level_spend = sorted(
+        ((str(level), int(n), float(total)) for level, n, total in zip(levels, members, spend)),
+        key=lambda item: -item[2]
+    )
+    return report
+
+
+def build_report_from_export(directory: str, now: Optional[datetime] = None) -> EconomyReport:
+    """Load the exported users and transactions and build the report; blocking."""
+    if np is None:
+        raise RuntimeError("numpy is required for analytics reports")
+    return build_report(
+        load_export(directory, "users", USER_COLUMNS),
+        load_export(directory, "transactions", TRANSACTION_COLUMNS),
+        now=now
+    )
+
+
+def format_report(report: EconomyReport) -> str:
+    """Compact plain-text summary."""
+    lines = [
+        f"📈 Аналитика на {report.generated_at:%d.%m.%Y %H:%M} UTC",
+        f"Пользователей: {report.users}, транзакций: {report.transactions}",
+        "",
+        "Удержание по неделям регистрации (неделя 1 / 4):",
+    ]
+    for week, size, row in zip(report.cohort_weeks, report.cohort_sizes, report.retention):
+        if not size:
+            continue
+        shares = [
+            "—" if np.isnan(row[k]) else f"{row[k]:.0%}" for k in (1, 4) if k < len(row)
+        ]
+        lines.append(f"  {week:%d.%m}: {size} чел. → {' / '.join(shares)}")
+
+    lines += ["", "Реферальная воронка:"]
+    base = report.funnel[0][1] if report.funnel else 0
+    for label, count in report.funnel:
+        share = f" ({count / base:.0%})" if base else ""
+        lines.append(f"  {label}: {count}{share}")
+
+    lines += [
+        "",
+        f"Скорость оборота (30 дней): {report.velocity_30d:.2f}",
+        f"  потрачено {report.spent_30d:,.0f}, начислено {report.earned_30d:,.0f}, "
+        f"в обороте {report.coin_supply:,.0f} UP",
+        "",
+        "Серии ежедневных бонусов: " + ", ".join(f"{label}: {n}" for label, n in report.streaks),
+        "",
+        "Траты по уровням:",
+    ]
+    for level, users, spent in report.level_spend:
+        per_user = spent / users if users else 0.0
+        lines.append(f"  {level}: {spent:,.0f} UP ({per_user:,.1f} на пользователя)")
+    return "\n".join(lines)
+
+
+def render_report_png(report: EconomyReport) -> bytes:
+    """Retention heatmap and streak histogram as a PNG."""
+    cell, left, top = 44, 70, 40
+    weeks = len(report.cohort_weeks)
+    chart_top = top + cell * weeks + 60
+    width = left + cell * weeks + 20
+    height = chart_top + 200
+    image = Image.new("RGB", (max(width, 420), height), "white")
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default()
+
+    draw.text((10, 10), "Retention by signup week", fill="black", font=font)
+    for k in range(weeks):
+        draw.text((left + k * cell + 14, top - 14), f"+{k}", fill="black", font=font)
+    for c, week in enumerate(report.cohort_weeks):
+        y = top + c * cell
+        draw.text((10, y + 16), f"{week:%d.%m}", fill="black", font=font)
+        for k in range(weeks):
+            value = report.retention[c, k]
+            x = left + k * cell
+            if np.isnan(value):
+                draw.rectangle((x, y, x + cell - 2, y + cell - 2), fill=(240, 240, 240))
+                continue
+            shade = int(255 - 200 * value)
+            draw.rectangle((x, y, x + cell - 2, y + cell - 2), fill=(shade, shade, 255))
+            draw.text((x + 8, y + 16), f"{value:.0%}", fill="black", font=font)
+
+    draw.text((10, chart_top - 30), "Daily streaks", fill="black", font=font)
+    peak = max((n for _, n in report.streaks), default=0) or 1
+    bar = (image.width - 40) // max(len(report.streaks), 1)
+    for i, (label, n) in enumerate(report.streaks):
+        x = 20 + i * bar
+        bar_height = int(150 * n / peak)
+        draw.rectangle((x, chart_top + 150 - bar_height, x + bar - 6, chart_top + 150), fill=(90, 90, 220))
+        draw.text((x, chart_top + 155), label, fill="black", font=font)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
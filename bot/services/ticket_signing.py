@@ -0,0 +1,43 @@
+"""HMAC-signed ticket QR payloads, verifiable without a network call."""
+import base64
+import hashlib
+import hmac
+from typing import Optional
+
+from bot.config import settings
+
+
+# UPC2.<ticket_id>.<event_id>.<signature>
+PAYLOAD_PREFIX = "UPC2"
+# 16 bytes of HMAC-SHA256, base64url without padding
+_SIGNATURE_BYTES = 16
+
+
+def _signing_key() -> bytes:
+    return (settings.ticket_signing_key or settings.secret_key).encode()
+
+
+def _signature(ticket_id: int, event_id: int) -> str:
+    digest = hmac.new(
+        _signing_key(), f"{ticket_id}.{event_id}".encode(), hashlib.sha256
+    ).digest()
+    return base64.urlsafe_b64encode(digest[:_SIGNATURE_BYTES]).rstrip(b"=").decode()
+
+
+def sign_ticket(ticket_id: int, event_id: int) -> str:
+    """QR payload for a ticket."""
+    return f"{PAYLOAD_PREFIX}.{ticket_id}.{event_id}.{_signature(ticket_id, event_id)}"
+
+
+def verify_ticket(payload: str) -> Optional[tuple[int, int]]:
+    """(ticket_id, event_id) if the payload is well-formed and correctly signed."""
+    parts = payload.strip().split(".")
+    if len(parts) != 4 or parts[0] != PAYLOAD_PREFIX:
+        return None
+    try:
+        ticket_id, event_id = int(parts[1]), int(parts[2])
+    except ValueError:
+        return None
+    if not hmac.compare_digest(parts[3], _signature(ticket_id, event_id)):
+        return None
+    return ticket_id, event_id
@@ -75,6 +75,9 @@ class UserService:
         
         logger.info("new_user_created", user_id=telegram_user.id, referral_code=ref_code)
         
+        # First tap on "referral QR" is then served from the cache
+        self.qr_generator.prewarm_referral_qr(ref_code)
+        
         # Process referral if provided
         if referral_code:
             await self.referral_service.process_referral(telegram_user.id, referral_code)
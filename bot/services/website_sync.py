@@ -1,6 +1,8 @@
 """Service for synchronizing bot data with website."""
 import hashlib
 import hmac
+import re
+import time
 from typing import Optional, Dict, Any
 from datetime import datetime
 
@@ -11,6 +13,26 @@ from bot.config import settings
 from bot.database.models import User
 from bot.database.repositories.user_repository import UserRepository
 from bot.utils.logger import logger
+from bot.utils.metrics import website_request_latency
+
+
+# Numeric path segments (IDs) collapse into one endpoint label
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+async def _start_request_timer(request: httpx.Request) -> None:
+    request.extensions["start_time"] = time.perf_counter()
+
+
+async def _observe_request_latency(response: httpx.Response) -> None:
+    request = response.request
+    start_time = request.extensions.get("start_time")
+    if start_time is None:
+        return
+    endpoint = _ID_SEGMENT.sub("/{id}", request.url.path)
+    website_request_latency.labels(
+        request.method, endpoint, response.status_code
+    ).observe(time.perf_counter() - start_time)
 
 
 class WebsiteSyncService:
@@ -30,6 +52,16 @@ class WebsiteSyncService:
             "X-Bot-Version": "3.0"
         }
     
+    def _client(self) -> httpx.AsyncClient:
+        """HTTP client with per-endpoint latency metrics."""
+        return httpx.AsyncClient(
+            timeout=10.0,
+            event_hooks={
+                "request": [_start_request_timer],
+                "response": [_observe_request_latency],
+            }
+        )
+    
     def verify_telegram_auth(self, auth_data: Dict[str, Any]) -> bool:
         """Verify Telegram Login Widget data."""
         check_hash = auth_data.pop("hash", None)
@@ -53,7 +85,7 @@ class WebsiteSyncService:
     async def sync_user_from_website(self, telegram_id: int) -> Optional[User]:
         """Sync user data from website to bot."""
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
+            async with self._client() as client:
                 response = await client.get(
                     f"{self.base_url}/api/v1/users/telegram/{telegram_id}",
                     headers=self._get_headers()
@@ -120,7 +152,7 @@ class WebsiteSyncService:
                 "total_events_attended": user.total_events_attended,
             }
             
-            async with httpx.AsyncClient(timeout=10.0) as client:
+            async with self._client() as client:
                 response = await client.post(
                     f"{self.base_url}/api/v1/users/sync",
                     headers=self._get_headers(),
@@ -163,7 +195,7 @@ class WebsiteSyncService:
                 "timestamp": datetime.utcnow().isoformat()
             }
             
-            async with httpx.AsyncClient(timeout=10.0) as client:
+            async with self._client() as client:
                 response = await client.post(
                     f"{self.base_url}/api/v1/transactions/sync",
                     headers=self._get_headers(),
@@ -181,7 +213,7 @@ class WebsiteSyncService:
     async def get_user_tickets(self, telegram_id: int) -> list[Dict[str, Any]]:
         """Get user's tickets from website."""
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
+            async with self._client() as client:
                 response = await client.get(
                     f"{self.base_url}/api/v1/tickets/user/{telegram_id}",
                     headers=self._get_headers()
@@ -196,7 +228,7 @@ class WebsiteSyncService:
     async def get_upcoming_events(self, limit: int = 5) -> list[Dict[str, Any]]:
         """Get upcoming events from website with fallback for missing endpoint."""
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
+            async with self._client() as client:
                 response = await client.get(
                     f"{self.base_url}/api/v1/events/upcoming?limit={limit}",
                     headers=self._get_headers()
@@ -240,10 +272,52 @@ class WebsiteSyncService:
             logger.error("events_fetch_unexpected_error", error=str(e), exc_info=True)
             return []
     
+    async def get_changes(
+        self,
+        kind: str,
+        updated_since: Optional[datetime] = None,
+        after_id: Optional[int] = None,
+        limit: int = 200
+    ) -> Optional[list[Dict[str, Any]]]:
+        """
+        Get events or tickets changed on the website, oldest change first.
+        
+        Pages are keyed by (updated_at, id): pass the last item's values to
+        get the next one. Returns None if the website can't serve the feed.
+        """
+        params: Dict[str, Any] = {"limit": limit}
+        if updated_since is not None:
+            params["updated_since"] = updated_since.isoformat()
+            params["after_id"] = after_id or 0
+        try:
+            async with self._client() as client:
+                response = await client.get(
+                    f"{self.base_url}/api/v1/{kind}/changes",
+                    headers=self._get_headers(),
+                    params=params
+                )
+                if response.status_code == 404:
+                    logger.warning("website_changes_endpoint_not_found", kind=kind)
+                    return None
+                response.raise_for_status()
+                data = response.json()
+                
+        except httpx.HTTPError as e:
+            logger.error("website_changes_fetch_error", kind=kind, error=str(e))
+            return None
+        
+        # Same shapes as /events/upcoming: a list or {"<kind>": [...]}
+        if isinstance(data, dict):
+            data = data.get(kind)
+        if not isinstance(data, list):
+            logger.warning("unexpected_changes_response_format", kind=kind)
+            return None
+        return data
+    
     async def validate_qr_code(self, qr_code: str) -> Optional[Dict[str, Any]]:
         """Validate QR code with website."""
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
+            async with self._client() as client:
                 response = await client.post(
                     f"{self.base_url}/api/v1/tickets/validate",
                     headers=self._get_headers(),
@@ -0,0 +1,365 @@
+"""Inbound website webhooks: signature check, in-memory queue, batched apply."""
+import asyncio
+import hashlib
+import hmac
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy import select
+
+from bot.config import settings
+from bot.database.models import Event
+from bot.database.repositories.event_repository import EventRepository
+from bot.database.repositories.user_repository import (
+    WEBSITE_MEMBERSHIP_COLUMNS,
+    WEBSITE_USER_COLUMNS,
+    UserRepository,
+)
+from bot.database.repositories.webhook_event_repository import WebhookEventRepository
+from bot.database.session import SessionFactory, db_manager
+from bot.jobs.website_inbound import parse_timestamp, parse_website_event, parse_website_ticket
+from bot.middlewares.cache import user_cache
+from bot.utils.logger import logger
+from bot.utils.metrics import website_webhook_events
+
+
+# Called with the local ids of events whose tickets changed
+TicketsChanged = Callable[[set[int]], Awaitable[None]]
+
+
+def webhooks_enabled() -> bool:
+    """Whether WEBSITE_WEBHOOK_SECRET is set to something other than its public default."""
+    secret = settings.website_webhook_secret
+    return bool(secret) and secret != type(settings).model_fields["website_webhook_secret"].default
+
+
+def sign_body(body: bytes, secret: Optional[str] = None) -> str:
+    """X-Website-Signature value for a request body."""
+    key = (secret or settings.website_webhook_secret).encode()
+    return "sha256=" + hmac.new(key, body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(body: bytes, signature: Optional[str], secret: Optional[str] = None) -> bool:
+    """Check X-Website-Signature ("sha256=<hex>" or bare hex) in constant time."""
+    if not signature:
+        return False
+    expected = sign_body(body, secret)
+    if not signature.startswith("sha256="):
+        expected = expected[len("sha256="):]
+    return hmac.compare_digest(signature.encode(), expected.encode())
+
+
+def _telegram_id(data: dict) -> Optional[int]:
+    user_id = data.get("telegram_id") or data.get("telegram_user_id")
+    return int(user_id) if user_id is not None else None
+
+
+def parse_website_user(data: dict) -> Optional[dict]:
+    """user.* data -> UserRepository.upsert_website_users row; None if unusable."""
+    user_id = _telegram_id(data)
+    if user_id is None:
+        return None
+    website_user_id = data.get("website_user_id", data.get("id"))
+    return {
+        "id": user_id,
+        "website_user_id": int(website_user_id) if website_user_id is not None else None,
+        "username": data.get("username"),
+        "first_name": data.get("first_name"),
+        "last_name": data.get("last_name"),
+    }
+
+
+def parse_website_membership(data: dict) -> Optional[dict]:
+    """membership.* data -> UserRepository.upsert_website_users row; None if unusable."""
+    user_id = _telegram_id(data)
+    if user_id is None:
+        return None
+    is_member = data.get("is_member")
+    return {
+        "id": user_id,
+        "is_member": bool(is_member) if is_member is not None else None,
+        "membership_level": data.get("membership_level") or data.get("level"),
+        "joined_at": parse_timestamp(data.get("joined_at")),
+    }
+
+
+# Event type prefix -> parser; applied in this order so tickets find new events
+PARSERS = {
+    "user": parse_website_user,
+    "membership": parse_website_membership,
+    "event": parse_website_event,
+    "ticket": parse_website_ticket,
+}
+
+
+@dataclass
+class WebhookEvent:
+    """One delivered event, e.g. {"id": "evt_1", "type": "ticket.updated", "data": {...}}."""
+
+    id: str
+    type: str
+    data: dict
+    attempts: int = 0
+
+    @property
+    def kind(self) -> str:
+        return self.type.split(".", 1)[0]
+
+    @classmethod
+    def from_payload(cls, payload: Any) -> "WebhookEvent":
+        """Validate one event object; raises ValueError."""
+        if not isinstance(payload, dict):
+            raise ValueError("event must be an object")
+        event_id, event_type, data = payload.get("id"), payload.get("type"), payload.get("data")
+        if not event_id or not isinstance(event_type, str) or not isinstance(data, dict):
+            raise ValueError("event needs id, type and data")
+        event = cls(id=str(event_id)[:100], type=event_type[:50], data=data)
+        event.parse()
+        return event
+
+    def parse(self) -> Optional[dict]:
+        """Upsert row for the data; None for unknown types or missing fields, ValueError if malformed."""
+        parse = PARSERS.get(self.kind)
+        if parse is None:
+            return None
+        try:
+            return parse(self.data)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"malformed {self.type} data: {e}") from e
+
+
+@dataclass
+class ApplyResult:
+    """Outcome of applying one batch."""
+
+    # New events handed to the upserts (stale or unknown-user rows included)
+    applied: int = 0
+    duplicates: int = 0
+    # Unknown types, missing fields or malformed data
+    ignored: int = 0
+    rows_written: int = 0
+    user_ids: set[int] = field(default_factory=set)
+    event_ids: set[int] = field(default_factory=set)
+
+
+class WebsiteWebhookReceiver:
+    """
+    Apply website pushes in batches off the request path.
+
+    push() only queues (bounded; False when full, so the endpoint can
+    answer 503 and the website redelivers later). A background task
+    drains the queue every flush_interval seconds, or as soon as a full
+    batch is waiting, and applies each batch in one transaction: the
+    event ids go into website_webhook_events with ON CONFLICT DO NOTHING
+    and only the ids inserted now are applied, as one INSERT ... ON
+    CONFLICT per kind. Redeliveries are therefore no-ops, and a failed
+    batch rolls its ids back with it, to be retried up to max_attempts
+    times; the last attempt applies the events one by one, so only the
+    ones that still fail are dropped (and logged by id). Afterwards the
+    changed users are dropped from user_cache and on_tickets_changed gets
+    the events whose tickets changed.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory = db_manager.session,
+        max_queue_size: int = 5000,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        max_attempts: int = 3,
+        on_tickets_changed: Optional[TicketsChanged] = None,
+    ):
+        self.session_factory = session_factory
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.on_tickets_changed = on_tickets_changed
+        self._buffer: deque[WebhookEvent] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @property
+    def pending(self) -> int:
+        """Events waiting to be applied."""
+        return len(self._buffer)
+
+    def push(self, events: list[WebhookEvent]) -> bool:
+        """Queue a delivery; returns False (nothing queued) if it doesn't fit."""
+        if len(self._buffer) + len(events) > self.max_queue_size:
+            website_webhook_events.labels("shed").inc(len(events))
+            return False
+
+        self._buffer.extend(events)
+        website_webhook_events.labels("accepted").inc(len(events))
+        if self._wakeup is not None and len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def start(self) -> None:
+        """Start the background applier."""
+        if self._task is not None:
+            return
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="website_webhooks")
+        logger.info("website_webhooks_started", batch_size=self.batch_size)
+
+    async def stop(self) -> None:
+        """Stop the applier and apply what is queued."""
+        if self._task is not None:
+            self._closing = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        logger.info("website_webhooks_stopped", pending=len(self._buffer))
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Apply queued events in batches of batch_size."""
+        while self._buffer:
+            count = min(self.batch_size, len(self._buffer))
+            batch = [self._buffer.popleft() for _ in range(count)]
+            try:
+                result = await self.apply(batch)
+            except Exception as e:
+                for event in batch:
+                    event.attempts += 1
+                retry = [event for event in batch if event.attempts < self.max_attempts]
+                last = [event for event in batch if event.attempts >= self.max_attempts]
+                # Back to the front, in order; retried on the next flush
+                self._buffer.extendleft(reversed(retry))
+                website_webhook_events.labels("failed").inc(len(retry))
+                logger.warning(
+                    "website_webhooks_apply_failed",
+                    events=len(batch),
+                    retried=len(retry),
+                    error=str(e)
+                )
+                if last:
+                    await self._apply_each(last)
+                return
+
+            self._applied(batch, result)
+
+    async def _apply_each(self, events: list[WebhookEvent]) -> None:
+        """Last attempt: apply events one by one, so only the failing ones are dropped."""
+        dropped = []
+        for event in events:
+            try:
+                result = await self.apply([event])
+            except Exception as e:
+                dropped.append(event.id)
+                logger.error(
+                    "website_webhook_dropped",
+                    event_id=event.id,
+                    type=event.type,
+                    attempts=event.attempts,
+                    error=str(e)
+                )
+                continue
+            self._applied([event], result)
+        website_webhook_events.labels("dropped").inc(len(dropped))
+        if dropped:
+            logger.warning("website_webhooks_dropped", event_ids=dropped)
+
+    def _applied(self, batch: list[WebhookEvent], result: ApplyResult) -> None:
+        website_webhook_events.labels("applied").inc(result.applied)
+        website_webhook_events.labels("duplicate").inc(result.duplicates)
+        website_webhook_events.labels("ignored").inc(result.ignored)
+        logger.info(
+            "website_webhooks_applied",
+            events=len(batch),
+            applied=result.applied,
+            duplicates=result.duplicates,
+            ignored=result.ignored,
+            rows_written=result.rows_written
+        )
+
+    async def apply(self, batch: list[WebhookEvent]) -> ApplyResult:
+        """Apply the batch's new events in one transaction, then invalidate caches."""
+        result = ApplyResult()
+        unique = {}
+        for event in batch:
+            unique.setdefault(event.id, event)
+        result.duplicates = len(batch) - len(unique)
+
+        rows: dict[str, list[dict]] = {kind: [] for kind in PARSERS}
+        async with self.session_factory() as session:
+            new_ids = await WebhookEventRepository(session).record(
+                [(event.id, event.type) for event in unique.values()]
+            )
+            result.duplicates += len(unique) - len(new_ids)
+
+            for event in unique.values():
+                if event.id not in new_ids:
+                    continue
+                # Validated on push, but one bad event must not roll back the
+                # batch: it is ignored and its id kept
+                try:
+                    row = event.parse()
+                except ValueError:
+                    row = None
+                if row is None:
+                    logger.warning("website_webhook_ignored", event_id=event.id, type=event.type)
+                    result.ignored += 1
+                    continue
+                rows[event.kind].append(row)
+
+            users = UserRepository(session)
+            for kind, columns in (
+                ("user", WEBSITE_USER_COLUMNS),
+                ("membership", WEBSITE_MEMBERSHIP_COLUMNS),
+            ):
+                updated = await users.upsert_website_users(rows[kind], columns)
+                result.user_ids |= updated
+                result.rows_written += len(updated)
+
+            events = EventRepository(session)
+            result.rows_written += await events.upsert_website_events(rows["event"])
+            tickets = await events.upsert_website_tickets(rows["ticket"])
+            result.rows_written += tickets
+            if tickets:
+                result.user_ids |= {row["user_id"] for row in rows["ticket"]}
+                result.event_ids = set((await session.execute(
+                    select(Event.id).where(
+                        Event.website_event_id.in_({row["website_event_id"] for row in rows["ticket"]})
+                    )
+                )).scalars().all())
+
+        result.applied = sum(len(kind_rows) for kind_rows in rows.values())
+        for user_id in result.user_ids:
+            await user_cache.invalidate(user_id)
+        if result.event_ids and self.on_tickets_changed is not None:
+            await self.on_tickets_changed(result.event_ids)
+        return result
+
+    async def prune(self, days: Optional[int] = None) -> int:
+        """Forget event ids older than `days` (WEBSITE_WEBHOOK_DEDUPE_DAYS)."""
+        days = days if days is not None else settings.website_webhook_dedupe_days
+        async with self.session_factory() as session:
+            deleted = await WebhookEventRepository(session).prune(
+                datetime.utcnow() - timedelta(days=days)
+            )
+        logger.info("website_webhook_events_pruned", deleted=deleted, days=days)
+        return deleted
+
+
+# Global instance
+website_webhooks = WebsiteWebhookReceiver(
+    max_queue_size=settings.website_webhook_queue_size,
+    batch_size=settings.website_webhook_batch_size,
+    flush_interval=settings.website_webhook_flush_interval,
+)
@@ -6,6 +6,8 @@ from telegram import Update
 from telegram.ext import ContextTypes
 
 from bot.config import settings
+from bot.database.snapshots import USER_SNAPSHOT_KEY, UserSnapshot, get_user_snapshot
+from bot.services.analytics import analytics
 from bot.utils.logger import logger
 
 
@@ -39,9 +41,9 @@ def member_only(func: Callable) -> Callable:
     """Decorator to restrict handler to club members only."""
     @wraps(func)
     async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        db_user = context.user_data.get("db_user")
+        user = get_user_snapshot(context)
         
-        if not db_user or not db_user.is_member:
+        if not user or not user.is_member:
             if update.message:
                 await update.message.reply_text(
                     "🔒 Эта функция доступна только членам клуба.\n"
@@ -114,76 +116,6 @@ def handle_errors(func: Callable) -> Callable:
     return wrapper
 
 
-def logging_middleware(func: Callable) -> Callable:
-    """
-    Middleware decorator for comprehensive request/response logging.
-    Logs handler execution time, user info, and action details.
-    """
-    @wraps(func)
-    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        import time
-        
-        # Extract user information
-        user = update.effective_user
-        user_id = user.id if user else None
-        username = user.username if user else "Unknown"
-        
-        # Determine message type
-        message_type = None
-        if update.message:
-            message_type = "message"
-            text = update.message.text or "[media]"
-        elif update.callback_query:
-            message_type = "callback_query"
-            text = update.callback_query.data or "[no_data]"
-        else:
-            message_type = "unknown"
-            text = "[unknown_update]"
-        
-        # Log request start
-        logger.info(
-            "handler_start",
-            handler=func.__name__,
-            user_id=user_id,
-            username=username,
-            message_type=message_type,
-            text=text[:100]  # Limit text length
-        )
-        
-        # Execute handler with timing
-        start_time = time.time()
-        
-        try:
-            result = await func(update, context)
-            execution_time = time.time() - start_time
-            
-            # Log successful completion
-            logger.info(
-                "handler_success",
-                handler=func.__name__,
-                user_id=user_id,
-                execution_time=f"{execution_time:.3f}s"
-            )
-            
-            return result
-            
-        except Exception as e:
-            execution_time = time.time() - start_time
-            
-            # Log error
-            logger.error(
-                "handler_error",
-                handler=func.__name__,
-                user_id=user_id,
-                error=str(e),
-                error_type=type(e).__name__,
-                execution_time=f"{execution_time:.3f}s"
-            )
-            raise
-    
-    return wrapper
-
-
 def auth_middleware(func: Callable) -> Callable:
     """
     Authentication middleware that ensures user exists in database.
@@ -235,15 +167,12 @@ def auth_middleware(func: Callable) -> Callable:
                     
                     return None
                 
-                # Store user data in context for handler access
-                context.user_data["db_user"] = db_user
-                context.user_data["user_id"] = user_id
-                context.user_data["is_member"] = db_user.is_member
-                context.user_data["membership_level"] = db_user.membership_level
-                context.user_data["up_coins"] = float(db_user.up_coins)
-                
-                # Execute handler
-                return await func(update, context)
+                # Snapshot for handler access, dropped after the update
+                context.user_data[USER_SNAPSHOT_KEY] = UserSnapshot.from_user(db_user)
+                try:
+                    return await func(update, context)
+                finally:
+                    context.user_data.pop(USER_SNAPSHOT_KEY, None)
                 
         except Exception as e:
             logger.error(
@@ -371,36 +300,19 @@ def analytics_tracker(event_name: str):
     """
     Decorator for tracking user actions and analytics.
     
+    Events go to the bounded analytics pipeline and are written to the
+    analytics_events table in batches.
+    
     Args:
         event_name: Name of the event to track
     """
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
-            from datetime import datetime
-            
             user = update.effective_user
             
             if user:
-                # Log analytics event
-                logger.info(
-                    "analytics_event",
-                    event=event_name,
-                    user_id=user.id,
-                    username=user.username,
-                    handler=func.__name__
-                )
-                
-                # Store in context for potential external analytics
-                if "analytics_events" not in context.bot_data:
-                    context.bot_data["analytics_events"] = []
-                
-                context.bot_data["analytics_events"].append({
-                    "event": event_name,
-                    "user_id": user.id,
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "handler": func.__name__
-                })
+                analytics.track(event_name, user_id=user.id, handler=func.__name__)
             
             return await func(update, context)
         
@@ -1,9 +1,19 @@
-"""Logging configuration with structured logging."""
+"""Logging configuration with structured logging.
+
+Records are handed to a QueueHandler on the calling thread and formatted,
+serialized and written by a background listener thread, so logging never
+blocks the event loop on stdout.
+"""
+import atexit
 import logging
+import queue
 import sys
-import json
-from typing import Any, Dict
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict
 from bot.config import settings
+from bot.utils.serialization import dumps_str
 
 
 class StructuredFormatter(logging.Formatter):
@@ -27,7 +37,7 @@ class StructuredFormatter(logging.Formatter):
             log_data["exception"] = self.formatException(record.exc_info)
         
         if settings.log_format == "json":
-            return json.dumps(log_data, ensure_ascii=False)
+            return dumps_str(log_data)
         else:
             # Plain text format
             msg = record.getMessage()
@@ -42,9 +52,175 @@ class StructuredFormatter(logging.Formatter):
                     params_list.append(f"{k}={v_str}")
                 params = ", ".join(params_list)
                 msg = f"{msg} | {params}"
+            if "exception" in log_data:
+                msg = f"{msg}\n{log_data['exception']}"
             return f"[{record.levelname}] {msg}"
 
 
+class DeferredQueueHandler(QueueHandler):
+    """Queue handler that leaves formatting to the listener thread.
+
+    The stock QueueHandler formats the record on the calling thread; here
+    only the record itself is enqueued, exception info included, so
+    traceback rendering and JSON serialization happen off the event loop.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class BatchStreamHandler(logging.StreamHandler):
+    """Stream handler that writes a batch of records with one write and flush."""
+
+    def emit_batch(self, records: list[logging.LogRecord]) -> None:
+        """Format records and write them to the stream in one call."""
+        lines = []
+        for record in records:
+            if record.levelno < self.level:
+                continue
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+
+        if not lines:
+            return
+
+        try:
+            self.acquire()
+            try:
+                self.stream.write(self.terminator.join(lines) + self.terminator)
+                self.flush()
+            finally:
+                self.release()
+        except Exception:
+            self.handleError(records[-1])
+
+
+class BatchingQueueListener(QueueListener):
+    """Queue listener that drains all pending records into a single batch."""
+
+    def __init__(self, log_queue, handler: BatchStreamHandler, batch_size: int = 512):
+        super().__init__(log_queue, handler)
+        self.batch_size = batch_size
+
+    def _monitor(self) -> None:
+        q = self.queue
+        handler = self.handlers[0]
+
+        while True:
+            record = q.get()
+            batch = []
+            stopping = False
+
+            while True:
+                if record is self._sentinel:
+                    stopping = True
+                    break
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    record = q.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                handler.emit_batch(batch)
+            if stopping:
+                break
+
+
+class LogSampler:
+    """Per-event sampling, burst suppression and a hot-path budget.
+
+    Counters reset every ``window`` seconds. Events with a rule log their
+    first ``head`` occurrences, then every ``every``-th one (``every=0``
+    drops the rest). Events without a rule are capped at ``burst_limit``
+    per window. DEBUG/INFO lines also draw from a token bucket refilled at
+    ``budget`` lines per second; WARNING and above never do. Anything
+    dropped is reported once per window as a ``log_suppressed`` summary.
+    """
+
+    def __init__(
+        self,
+        rules: dict[str, tuple[int, int]],
+        window: float = 1.0,
+        burst_limit: int = 0,
+        budget: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rules = rules
+        self.window = window
+        self.burst_limit = burst_limit
+        self.budget = budget
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counts: dict[str, int] = {}
+        self._suppressed: dict[str, int] = {}
+        now = clock()
+        self._window_end = now + window
+        self._tokens = float(budget)
+        self._refilled_at = now
+
+    @staticmethod
+    def parse_rules(spec: str) -> dict[str, tuple[int, int]]:
+        """Parse "event=head:every,..." into a rules dict."""
+        rules = {}
+        for item in spec.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            event, _, rule = item.partition("=")
+            head, _, every = rule.partition(":")
+            rules[event.strip()] = (int(head or 0), int(every or 0))
+        return rules
+
+    def check(self, event: str, level: int) -> tuple[bool, list[tuple[str, int]]]:
+        """Decide whether to log event; also return summaries of a closed window."""
+        with self._lock:
+            now = self._clock()
+            summaries = self._roll(now) if now >= self._window_end else []
+
+            count = self._counts.get(event, 0) + 1
+            self._counts[event] = count
+
+            rule = self.rules.get(event)
+            if rule is not None:
+                head, every = rule
+                allowed = count <= head or (every > 0 and (count - head) % every == 0)
+            else:
+                allowed = not self.burst_limit or count <= self.burst_limit
+
+            if allowed and self.budget and level < logging.WARNING:
+                self._tokens = min(
+                    float(self.budget),
+                    self._tokens + (now - self._refilled_at) * self.budget
+                )
+                self._refilled_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                else:
+                    allowed = False
+
+            if not allowed:
+                self._suppressed[event] = self._suppressed.get(event, 0) + 1
+
+            return allowed, summaries
+
+    def drain(self) -> list[tuple[str, int]]:
+        """Close the current window and return its summaries."""
+        with self._lock:
+            return self._roll(self._clock())
+
+    def _roll(self, now: float) -> list[tuple[str, int]]:
+        summaries = list(self._suppressed.items())
+        self._counts.clear()
+        self._suppressed.clear()
+        self._window_end = now + self.window
+        return summaries
+
+
 class StructuredLogger:
     """Wrapper for structured logging."""
     
@@ -53,15 +229,25 @@ class StructuredLogger:
         
     def _log(self, level: int, event: str, **kwargs):
         """Internal log method with structured data."""
-        # CRITICAL: Print to stdout for immediate visibility in Railway
-        if level >= logging.ERROR:
-            print(f"[ERROR] {event}")
-            for key, value in kwargs.items():
-                value_str = str(value)
-                if len(value_str) > 500:
-                    value_str = value_str[:500] + "\n... (truncated)"
-                print(f"  {key}: {value_str}")
-            print()
+        # Level check first: disabled calls cost nothing beyond this
+        if not self.logger.isEnabledFor(level):
+            return
+
+        if _sampler is not None:
+            allowed, summaries = _sampler.check(event, level)
+            if summaries:
+                self._log_summaries(summaries)
+            if not allowed:
+                return
+
+        exc_info = kwargs.pop("exc_info", None)
+        if exc_info:
+            if isinstance(exc_info, BaseException):
+                exc_info = (type(exc_info), exc_info, exc_info.__traceback__)
+            elif not isinstance(exc_info, tuple):
+                exc_info = sys.exc_info()
+            if exc_info[0] is None:
+                exc_info = None
         
         # Create log record with extra data
         record = self.logger.makeRecord(
@@ -71,11 +257,25 @@ class StructuredLogger:
             0,
             event,
             (),
-            None,
+            exc_info or None,
             func=None
         )
-        record.extra_data = kwargs if kwargs else {}
+        record.extra_data = kwargs
         self.logger.handle(record)
+
+    def _log_summaries(self, summaries: list[tuple[str, int]]):
+        """Report events dropped by the sampler, bypassing sampling."""
+        for event, suppressed in summaries:
+            record = self.logger.makeRecord(
+                self.logger.name, logging.INFO, "(unknown file)", 0,
+                "log_suppressed", (), None, func=None
+            )
+            record.extra_data = {
+                "event": event,
+                "suppressed": suppressed,
+                "window_seconds": _sampler.window if _sampler else None,
+            }
+            self.logger.handle(record)
     
     def debug(self, event: str, **kwargs):
         """Log debug message."""
@@ -90,21 +290,7 @@ class StructuredLogger:
         self._log(logging.WARNING, event, **kwargs)
     
     def error(self, event: str, **kwargs):
-        """Log error message with full details."""
-        # CRITICAL: Always print errors to stdout for Railway logs
-        print("=" * 60)
-        print(f"\u274c ERROR: {event}")
-        print("=" * 60)
-        for key, value in kwargs.items():
-            # Truncate very long values
-            value_str = str(value)
-            if len(value_str) > 2000:
-                value_str = value_str[:2000] + "\n... (truncated)"
-            print(f"{key}:")
-            print(value_str)
-            print()
-        print("=" * 60)
-        
+        """Log error message; pass exc_info=True to attach the traceback."""
         self._log(logging.ERROR, event, **kwargs)
     
     def critical(self, event: str, **kwargs):
@@ -112,24 +298,41 @@ class StructuredLogger:
         self._log(logging.CRITICAL, event, **kwargs)
 
 
+_listener: BatchingQueueListener | None = None
+_sampler: LogSampler | None = None
+
+
 # Configure root logger
 def setup_logging():
     """Setup logging configuration."""
+    global _listener, _sampler
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, settings.log_level.upper(), logging.INFO))
     
     # Remove existing handlers
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
+    shutdown_logging()
     
-    # Create console handler
-    handler = logging.StreamHandler(sys.stdout)
+    # Single stdout sink, written from the listener thread
+    handler = BatchStreamHandler(sys.stdout)
     handler.setLevel(getattr(logging, settings.log_level.upper(), logging.INFO))
     
     # Set formatter
     formatter = StructuredFormatter()
     handler.setFormatter(formatter)
-    root_logger.addHandler(handler)
+    
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(DeferredQueueHandler(log_queue))
+    _listener = BatchingQueueListener(log_queue, handler)
+    _listener.start()
+
+    _sampler = LogSampler(
+        LogSampler.parse_rules(settings.log_sample_rules),
+        window=settings.log_sample_window,
+        burst_limit=settings.log_burst_limit,
+        budget=settings.log_hot_path_budget,
+    )
     
     # Suppress noisy loggers
     logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -137,6 +340,21 @@ def setup_logging():
     logging.getLogger("telegram").setLevel(logging.WARNING)
 
 
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _sampler is not None:
+        summaries = _sampler.drain()
+        if summaries:
+            logger._log_summaries(summaries)
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
 # Initialize logging
 setup_logging()
 
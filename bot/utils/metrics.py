@@ -0,0 +1,363 @@
+"""In-process metrics with Prometheus text exposition.
+
+Dependency-free counters, gauges and histograms aggregated in memory and
+rendered on demand by the /metrics endpoint. All updates happen on the
+event loop thread (SQLAlchemy event hooks run there too), so children are
+plain attribute updates without locks.
+"""
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+
+# Seconds; covers fast DB queries up to slow Telegram/website calls
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def _format_value(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value == float("inf"):
+        return "+Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    """Base for labelled metrics; children are cached per label tuple."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._default = self._new_child()
+            self._children[()] = self._default
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **kwargs):
+        """Get child metric for label values (positional or by name)."""
+        if kwargs:
+            values = tuple(str(kwargs[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for values, child in self._children.items():
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values, child) -> list[str]:
+        labels = _format_labels(self.labelnames, values)
+        return [f"{self.name}{labels} {_format_value(child.get())}"]
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def get(self) -> float:
+        return self.value
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+
+class _GaugeChild:
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Evaluate function at scrape time instead of storing a value."""
+        self.function = function
+
+    def get(self) -> float:
+        if self.function is not None:
+            try:
+                return float(self.function())
+            except Exception:
+                return float("nan")
+        return self.value
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed at scrape time."""
+
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._default.set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default.dec(amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._default.set_function(function)
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        # Per-bucket (non-cumulative) counts; last slot is +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the duration of the with-block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Metric):
+    """Distribution of observations in fixed buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+    def _render_child(self, values, child) -> list[str]:
+        lines = []
+        cumulative = 0
+        bounds = self.buckets + (float("inf"),)
+        for bound, count in zip(bounds, child.counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames + ("le",), values + (_format_value(bound),))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry and application metrics
+registry = MetricsRegistry()
+
+handler_latency = registry.histogram(
+    "bot_handler_duration_seconds",
+    "Telegram handler execution time",
+    ["handler"],
+)
+handler_errors = registry.counter(
+    "bot_handler_errors_total",
+    "Telegram handler exceptions",
+    ["handler"],
+)
+update_queue_depth = registry.gauge(
+    "bot_update_queue_depth",
+    "Updates waiting in the application update queue",
+)
+updates_in_flight = registry.gauge(
+    "bot_updates_in_flight",
+    "Updates currently being handled",
+)
+updates_queued = registry.gauge(
+    "bot_updates_queued",
+    "Accepted updates waiting for a user lock or a concurrency slot",
+)
+updates_shed = registry.counter(
+    "bot_updates_shed_total",
+    "Updates dropped by the update processor",
+    ["reason"],
+)
+webhook_updates = registry.counter(
+    "bot_webhook_updates_total",
+    "Webhook deliveries by result",
+    ["result"],
+)
+telegram_api_latency = registry.histogram(
+    "bot_telegram_api_duration_seconds",
+    "Telegram Bot API call time",
+    ["method"],
+)
+db_query_latency = registry.histogram(
+    "bot_db_query_duration_seconds",
+    "Database statement execution time",
+    ["operation"],
+)
+db_pool_connections = registry.gauge(
+    "bot_db_pool_connections",
+    "Database pool connections by state",
+    ["state"],
+)
+cache_requests = registry.counter(
+    "bot_user_cache_requests_total",
+    "UserCacheManager lookups by result",
+    ["result"],
+)
+cache_hit_ratio = registry.gauge(
+    "bot_user_cache_hit_ratio",
+    "UserCacheManager hit ratio since start",
+)
+website_request_latency = registry.histogram(
+    "bot_website_request_duration_seconds",
+    "Website API request time",
+    ["method", "endpoint", "status"],
+)
+analytics_events = registry.counter(
+    "bot_analytics_events_total",
+    "Analytics events by outcome (written, dropped, failed)",
+    ["result"],
+)
+qr_cache_requests = registry.counter(
+    "bot_qr_cache_requests_total",
+    "QR image lookups by tier that served them (memory, disk, render)",
+    ["result"],
+)
+qr_render_latency = registry.histogram(
+    "bot_qr_render_duration_seconds",
+    "QR render time including waiting for a pool slot",
+)
+qr_render_pending = registry.gauge(
+    "bot_qr_render_pending",
+    "QR renders submitted to or waiting for the render pool",
+)
+analytics_queue_depth = registry.gauge(
+    "bot_analytics_queue_depth",
+    "Analytics events waiting for the batch writer",
+)
+daily_streaks = registry.counter(
+    "bot_daily_streaks_total",
+    "Streak job outcomes (reset, reminded, reminder_failed)",
+    ["result"],
+)
+website_webhook_events = registry.counter(
+    "bot_website_webhooks_total",
+    "Website webhook events by result",
+    ["result"],
+)
+
+
+def _cache_hit_ratio() -> float:
+    hits = cache_requests.labels("hit").get()
+    total = hits + cache_requests.labels("miss").get()
+    return hits / total if total else 0.0
+
+
+cache_hit_ratio.set_function(_cache_hit_ratio)
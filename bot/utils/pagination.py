@@ -0,0 +1,31 @@
+"""Opaque keyset cursors for paginated listings."""
+import base64
+import binascii
+import struct
+from datetime import datetime, timedelta
+from typing import Optional
+
+_EPOCH = datetime(1970, 1, 1)
+# created_at in microseconds since epoch, row id
+_CURSOR = struct.Struct(">qq")
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Encode a (created_at, id) position as a URL- and callback-safe token.
+
+    Always 22 characters, so it fits Telegram's 64-byte callback_data
+    together with a short prefix.
+    """
+    micros = (created_at.replace(tzinfo=None) - _EPOCH) // timedelta(microseconds=1)
+    return base64.urlsafe_b64encode(_CURSOR.pack(micros, row_id)).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Optional[tuple[datetime, int]]:
+    """Position encoded by encode_cursor, or None for a malformed token."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        micros, row_id = _CURSOR.unpack(raw)
+        return _EPOCH + timedelta(microseconds=micros), row_id
+    except (binascii.Error, struct.error, ValueError, OverflowError):
+        return None
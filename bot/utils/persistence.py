@@ -0,0 +1,188 @@
+"""Redis-backed PTB persistence for compact per-user state."""
+import asyncio
+from typing import Any, Dict, Optional
+
+import redis.asyncio as aioredis
+from telegram.ext import BasePersistence, PersistenceInput
+
+from bot.utils.logger import logger
+from bot.utils.serialization import dumps, loads
+
+
+# Only these user_data keys survive restarts. Values must be JSON primitives
+# (or flat dicts/lists of them); anything else - ORM objects, sessions,
+# Decimals - stays in memory only.
+PERSISTED_USER_KEYS = frozenset({
+    "nav_message_id",
+    "nav_chat_id",
+    "ticket_selection",
+})
+
+_PRIMITIVES = (str, int, float, bool, type(None))
+
+
+def _is_primitive(value: Any) -> bool:
+    if isinstance(value, _PRIMITIVES):
+        return True
+    if isinstance(value, dict):
+        return all(isinstance(k, str) and isinstance(v, _PRIMITIVES) for k, v in value.items())
+    if isinstance(value, list):
+        return all(isinstance(v, _PRIMITIVES) for v in value)
+    return False
+
+
+def compact_user_data(user_data: Dict[Any, Any]) -> Dict[str, Any]:
+    """Keep whitelisted keys with primitive values."""
+    return {
+        key: value
+        for key, value in user_data.items()
+        if key in PERSISTED_USER_KEYS and _is_primitive(value)
+    }
+
+
+class RedisUserDataPersistence(BasePersistence):
+    """
+    Persist compact user_data in Redis, one JSON string per user.
+
+    - Lazy: nothing is loaded at startup; a user's state is read the first
+      time one of their updates is processed (refresh_user_data).
+    - Write-behind: PTB hands over changed users every update_interval
+      seconds; writes are staged and sent in one pipelined round trip.
+    - Unchanged state is not rewritten; keys expire after USER_DATA_TTL_DAYS.
+    """
+
+    KEY_PREFIX = "ptb:user_data:"
+
+    def __init__(self, redis_url: str, update_interval: float = 10, ttl_seconds: int = 30 * 86400):
+        super().__init__(
+            store_data=PersistenceInput(
+                bot_data=False, chat_data=False, user_data=True, callback_data=False
+            ),
+            update_interval=update_interval,
+        )
+        self.redis_url = redis_url
+        self.ttl_seconds = ttl_seconds
+        self._redis: Optional[aioredis.Redis] = None
+        self._loaded: set[int] = set()
+        self._written: Dict[int, bytes] = {}
+        self._staged: Dict[int, Optional[bytes]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def _client(self) -> aioredis.Redis:
+        if self._redis is None:
+            self._redis = aioredis.from_url(self.redis_url, socket_keepalive=True)
+        return self._redis
+
+    def _key(self, user_id: int) -> str:
+        return f"{self.KEY_PREFIX}{user_id}"
+
+    # ----- user_data -----
+
+    async def get_user_data(self) -> Dict[int, Dict[Any, Any]]:
+        # Loaded lazily per user in refresh_user_data
+        return {}
+
+    async def refresh_user_data(self, user_id: int, user_data: Dict[Any, Any]) -> None:
+        if user_id in self._loaded:
+            return
+        self._loaded.add(user_id)
+
+        try:
+            raw = await self._client().get(self._key(user_id))
+        except Exception as e:
+            logger.warning("user_data_load_failed", user_id=user_id, error=str(e))
+            return
+
+        if raw:
+            self._written[user_id] = raw
+            for key, value in loads(raw).items():
+                # In-memory values are newer than what's stored
+                user_data.setdefault(key, value)
+
+    async def update_user_data(self, user_id: int, data: Dict[Any, Any]) -> None:
+        payload = dumps(compact_user_data(data))
+        if self._written.get(user_id) == payload:
+            return
+        self._staged[user_id] = payload
+        self._schedule_flush()
+
+    async def drop_user_data(self, user_id: int) -> None:
+        self._loaded.discard(user_id)
+        self._written.pop(user_id, None)
+        self._staged[user_id] = None
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        # PTB stages all changed users in one pass; flush after it yields
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._write_staged())
+
+    async def _write_staged(self) -> None:
+        staged, self._staged = self._staged, {}
+        if not staged:
+            return
+
+        try:
+            async with self._client().pipeline(transaction=False) as pipe:
+                for user_id, payload in staged.items():
+                    if payload is None or payload == b"{}":
+                        pipe.delete(self._key(user_id))
+                    else:
+                        pipe.set(self._key(user_id), payload, ex=self.ttl_seconds)
+                await pipe.execute()
+        except Exception as e:
+            # Keep for the next round unless newer state was staged meanwhile
+            for user_id, payload in staged.items():
+                self._staged.setdefault(user_id, payload)
+            logger.warning("user_data_flush_failed", users=len(staged), error=str(e))
+            return
+
+        for user_id, payload in staged.items():
+            if payload is None:
+                self._written.pop(user_id, None)
+            else:
+                self._written[user_id] = payload
+        logger.debug("user_data_flushed", users=len(staged))
+
+    async def flush(self) -> None:
+        if self._flush_task is not None:
+            await self._flush_task
+        await self._write_staged()
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    # ----- not persisted -----
+
+    async def get_chat_data(self) -> Dict[int, Any]:
+        return {}
+
+    async def get_bot_data(self) -> Dict[Any, Any]:
+        return {}
+
+    async def get_callback_data(self) -> None:
+        return None
+
+    async def get_conversations(self, name: str) -> Dict:
+        return {}
+
+    async def update_conversation(self, name: str, key, new_state) -> None:
+        pass
+
+    async def update_chat_data(self, chat_id: int, data: Dict[Any, Any]) -> None:
+        pass
+
+    async def update_bot_data(self, data: Dict[Any, Any]) -> None:
+        pass
+
+    async def update_callback_data(self, data) -> None:
+        pass
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: Dict[Any, Any]) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: Dict[Any, Any]) -> None:
+        pass
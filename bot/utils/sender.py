@@ -0,0 +1,60 @@
+"""Paced Bot API sends for bulk notifications."""
+import asyncio
+import time
+from datetime import timedelta
+
+from telegram import Bot
+from telegram.error import Forbidden, RetryAfter, TelegramError
+
+from bot.utils.logger import logger
+
+
+class RateLimitedSender:
+    """
+    Send messages at no more than rate per second, shared by all callers.
+
+    The Bot API allows about 30 messages per second across chats; bulk
+    sends stay below that so interactive replies keep going through. On
+    flood control (RetryAfter) every caller pauses for the requested time
+    and the message is retried.
+    """
+
+    def __init__(self, bot: Bot, rate: float = 20.0, max_retries: int = 2):
+        self.bot = bot
+        self.interval = 1.0 / rate
+        self.max_retries = max_retries
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _wait_turn(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _pause(self, seconds: float) -> None:
+        self._next = max(self._next, time.monotonic() + seconds)
+
+    async def send(self, chat_id: int, text: str, **kwargs) -> bool:
+        """Send a message; False if it could not be delivered."""
+        for _ in range(self.max_retries + 1):
+            await self._wait_turn()
+            try:
+                await self.bot.send_message(chat_id=chat_id, text=text, **kwargs)
+                return True
+            except RetryAfter as e:
+                retry_after = e.retry_after
+                if isinstance(retry_after, timedelta):
+                    retry_after = retry_after.total_seconds()
+                logger.warning("send_flood_wait", chat_id=chat_id, retry_after=retry_after)
+                self._pause(retry_after)
+            except Forbidden:
+                # Blocked the bot or deactivated
+                logger.debug("send_forbidden", chat_id=chat_id)
+                return False
+            except TelegramError as e:
+                logger.warning("send_failed", chat_id=chat_id, error=str(e))
+                return False
+        return False
@@ -0,0 +1,31 @@
+"""Fast JSON serialization shared by the API and structured logging."""
+from decimal import Decimal
+from typing import Any
+
+import orjson
+
+
+# Like json.dumps: dicts keyed by ints (per-id counters etc.) are allowed
+_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for types orjson doesn't handle natively."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return str(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize object to UTF-8 JSON bytes."""
+    return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+
+def dumps_str(obj: Any) -> str:
+    """Serialize object to JSON string."""
+    return orjson.dumps(obj, default=_default, option=_OPTIONS).decode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    """Deserialize JSON bytes or string."""
+    return orjson.loads(data)
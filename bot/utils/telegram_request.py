@@ -0,0 +1,19 @@
+"""Telegram HTTP request backend with API latency metrics."""
+import time
+
+from telegram.request import HTTPXRequest
+
+from bot.utils.metrics import telegram_api_latency
+
+
+class InstrumentedHTTPXRequest(HTTPXRequest):
+    """HTTPXRequest that records Bot API call latency per method."""
+
+    async def do_request(self, url, method, request_data=None, *args, **kwargs):
+        # url is .../bot<token>/<apiMethod>; only the method name is a label
+        api_method = url.rsplit("/", 1)[-1]
+        start_time = time.perf_counter()
+        try:
+            return await super().do_request(url, method, request_data, *args, **kwargs)
+        finally:
+            telegram_api_latency.labels(api_method).observe(time.perf_counter() - start_time)
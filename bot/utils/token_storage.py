@@ -106,7 +106,7 @@ class TokenStorage:
             del cls._codes[code]
         
         if expired_codes:
-            logger.info(
+            logger.debug(
                 "token_storage_cleanup",
                 removed_count=len(expired_codes),
                 remaining_count=len(cls._codes)
@@ -0,0 +1,132 @@
+"""Update processor with per-user ordering and bounded concurrency."""
+import asyncio
+from typing import Any, Awaitable, Dict, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from bot.utils.logger import logger
+from bot.utils.metrics import updates_in_flight, updates_queued, updates_shed
+
+
+class _KeyState:
+    """Lock and pending count for one user's updates."""
+
+    __slots__ = ("lock", "pending")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.pending = 0
+
+
+class KeyedUpdateProcessor(BaseUpdateProcessor):
+    """
+    Process updates of different users in parallel, each user's in order.
+
+    Updates of one user wait on that user's lock (FIFO) *before* taking a
+    slot of the global concurrency cap, so a user spamming buttons queues
+    behind themselves without occupying slots other users need. Updates
+    beyond the global or per-user pending limit are dropped.
+
+    The cap is this class's own semaphore, not the base class's: that one
+    is taken in process_update before do_process_update could take the
+    user's lock. max_concurrent_updates therefore reports the pending
+    limit; the concurrency cap is `concurrency`.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_updates: int,
+        max_pending_updates: int = 1000,
+        max_pending_per_user: int = 10,
+    ):
+        # The base class wraps do_process_update in a semaphore of this size,
+        # taken before the per-user lock could be; sized above the pending
+        # limit it never blocks, and the real cap is self._slots
+        super().__init__(max_pending_updates + 1)
+        self.concurrency = max_concurrent_updates
+        self.max_pending_updates = max_pending_updates
+        self.max_pending_per_user = max_pending_per_user
+        self._slots = asyncio.BoundedSemaphore(max_concurrent_updates)
+        self._keys: Dict[int, _KeyState] = {}
+        self._pending = 0
+        self._in_flight = 0
+
+    @property
+    def pending(self) -> int:
+        """Accepted updates not yet finished (queued + in flight)."""
+        return self._pending
+
+    @property
+    def in_flight(self) -> int:
+        """Updates currently being handled."""
+        return self._in_flight
+
+    @property
+    def is_saturated(self) -> bool:
+        """Whether new updates would be shed."""
+        return self._pending >= self.max_pending_updates
+
+    @staticmethod
+    def _key(update: object) -> Optional[int]:
+        if isinstance(update, Update) and update.effective_user:
+            return update.effective_user.id
+        return None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = self._key(update)
+
+        if self._pending >= self.max_pending_updates:
+            self._shed(update, coroutine, key, "max_pending")
+            return
+
+        state = None
+        if key is not None:
+            state = self._keys.get(key)
+            if state is None:
+                state = self._keys[key] = _KeyState()
+            if state.pending >= self.max_pending_per_user:
+                self._shed(update, coroutine, key, "max_pending_per_user")
+                return
+            state.pending += 1
+
+        self._pending += 1
+        try:
+            if state is not None:
+                async with state.lock:
+                    await self._run(coroutine)
+            else:
+                await self._run(coroutine)
+        finally:
+            self._pending -= 1
+            if state is not None:
+                state.pending -= 1
+                if state.pending == 0:
+                    del self._keys[key]
+
+    async def _run(self, coroutine: Awaitable[Any]) -> None:
+        async with self._slots:
+            self._in_flight += 1
+            try:
+                await coroutine
+            finally:
+                self._in_flight -= 1
+
+    def _shed(self, update: object, coroutine: Awaitable[Any], key: Optional[int], reason: str) -> None:
+        # Close the never-awaited coroutine to avoid a RuntimeWarning
+        coroutine.close()
+        updates_shed.labels(reason).inc()
+        logger.warning(
+            "update_shed",
+            reason=reason,
+            user_id=key,
+            update_id=getattr(update, "update_id", None),
+            pending=self._pending
+        )
+
+    async def initialize(self) -> None:
+        updates_in_flight.set_function(lambda: self._in_flight)
+        updates_queued.set_function(lambda: self._pending - self._in_flight)
+
+    async def shutdown(self) -> None:
+        """Nothing to release; pending updates finish with their tasks."""
@@ -2,14 +2,24 @@
 
 import asyncio
 import os
+from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 import pytest
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import pytest_asyncio
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, AsyncSession
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import sessionmaker
 
 from bot.config import settings
-from bot.database.models import Base
+from bot.database.models import Base, User
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    """Render JSONB columns as JSON so the models can be created on SQLite."""
+    return "JSON"
 
 
 @pytest.fixture(scope="session")
@@ -53,6 +63,66 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
     await engine.dispose()
 
 
+@pytest.fixture
+def database_url() -> str:
+    """Database behind session_factory; override per module (e.g. a file under tmp_path)."""
+    return "sqlite+aiosqlite:///:memory:"
+
+
+@pytest_asyncio.fixture
+async def session_factory(database_url):
+    """
+    Session factory over a fresh database with all tables.
+    
+    Like db_manager.session, each session commits on exit. Modules seed
+    their rows with the seed / seed_users fixtures below.
+    """
+    engine = create_async_engine(database_url, connect_args={"timeout": 30})
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def session():
+        async with maker() as session:
+            yield session
+            await session.commit()
+
+    yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+def seed(session_factory):
+    """Add rows in one committed session: await seed(Ticket(...), ...)."""
+    async def seed(*rows):
+        async with session_factory() as session:
+            session.add_all(rows)
+
+    return seed
+
+
+@pytest.fixture
+def seed_users(seed):
+    """
+    Add users by id, or by a dict of columns for the ones that need more.
+    
+    await seed_users(1, {"id": 2, "daily_streak": 7}); first_name and
+    referral_code default to U<id> and REF<id>.
+    """
+    async def seed_users(*users):
+        rows = []
+        for user in users:
+            fields = {"id": user} if isinstance(user, int) else dict(user)
+            fields.setdefault("first_name", f"U{fields['id']}")
+            fields.setdefault("referral_code", f"REF{fields['id']}")
+            rows.append(User(**fields))
+        await seed(*rows)
+
+    return seed_users
+
+
 @pytest.fixture
 def mock_settings():
     """Mock settings for testing."""
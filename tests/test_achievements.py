@@ -0,0 +1,133 @@
+"""Test achievement rules, incremental awards and backfill."""
+
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+
+from bot.database.models import Achievement, Transaction, User, UserAchievement
+from bot.database.repositories.user_repository import UserRepository
+from bot.services.achievements import AchievementEngine, CompiledRules
+
+
+ACHIEVEMENTS = [
+    # id, code, requirement_type, requirement_value, up_coins_reward
+    (1, "ambassador", "referrals", 3, 100),
+    (2, "referral_king", "referrals", 8, 250),
+    (3, "week_streak", "daily_streak", 7, 50),
+    (4, "month_streak", "daily_streak", 30, 200),
+    (5, "rich", "up_coins", 1000, 0),
+    (6, "legacy", "unknown_metric", 1, 10),
+]
+
+
+def _achievement(id, code, requirement_type, requirement_value, reward) -> Achievement:
+    return Achievement(
+        id=id, code=code, title=code.title(), description=code,
+        requirement_type=requirement_type, requirement_value=requirement_value,
+        up_coins_reward=reward, is_active=True, order=id,
+    )
+
+
+@pytest_asyncio.fixture
+async def achievements(seed, seed_users):
+    """ACHIEVEMENTS and three users."""
+    await seed(*(_achievement(*row) for row in ACHIEVEMENTS))
+    await seed_users(
+        {"id": 1, "referral_count": 9, "daily_streak": 7},
+        {"id": 2, "up_coins": Decimal("1500")},
+        3,
+    )
+
+
+def test_rules_bisect_thresholds():
+    """Only thresholds in (old, new] are crossed; unknown metrics are skipped."""
+    rules = CompiledRules([_achievement(*row) for row in ACHIEVEMENTS])
+
+    assert [r.code for r in rules.crossed("referrals", 2, 3)] == ["ambassador"]
+    assert [r.code for r in rules.crossed("referrals", 3, 9)] == ["referral_king"]
+    assert rules.crossed("referrals", 3, 7) == [] and rules.crossed("referrals", 9, 2) == []
+    assert [r.code for r in rules.reached("daily_streak", 30)] == ["week_streak", "month_streak"]
+    assert "unknown_metric" not in rules.rules
+
+
+async def _balance_and_awards(session_factory, user_id: int):
+    async with session_factory() as session:
+        user = await session.get(User, user_id)
+        codes = (await session.execute(
+            select(Achievement.code)
+            .join(UserAchievement, UserAchievement.achievement_id == Achievement.id)
+            .where(UserAchievement.user_id == user_id)
+            .order_by(Achievement.id)
+        )).scalars().all()
+    return user.up_coins, codes
+
+
+@pytest.mark.asyncio
+async def test_evaluate_awards_once_with_reward(session_factory, achievements):
+    """A crossing awards the achievement and its coins; repeating it does nothing."""
+    engine = AchievementEngine()
+    async with session_factory() as session:
+        assert await engine.evaluate(session, 3, {"referrals": (2, 3)}) == []  # not loaded yet
+    await engine.load(session_factory)
+
+    async with session_factory() as session:
+        awarded = await engine.evaluate(session, 3, {"referrals": (2, 3), "daily_streak": (0, 1)})
+        assert [rule.code for rule in awarded] == ["ambassador"]
+    async with session_factory() as session:
+        assert await engine.evaluate(session, 3, {"referrals": (2, 3)}) == []
+
+    assert await _balance_and_awards(session_factory, 3) == (Decimal("100"), ["ambassador"])
+    async with session_factory() as session:
+        transaction = (await session.execute(select(Transaction))).scalar_one()
+    assert (transaction.type, transaction.extra_metadata) == ("achievement", {"achievement": "ambassador"})
+
+
+@pytest.mark.asyncio
+async def test_backfill_awards_all_reached(session_factory, achievements):
+    """Backfill awards every reached achievement once, across chunks."""
+    engine = AchievementEngine()
+
+    result = await engine.backfill(session_factory, chunk_size=2)
+
+    assert (result.users, result.awarded, result.coins) == (3, 4, Decimal("400"))
+    assert await _balance_and_awards(session_factory, 1) == (
+        Decimal("400"), ["ambassador", "referral_king", "week_streak"]
+    )
+    assert await _balance_and_awards(session_factory, 2) == (Decimal("1500"), ["rich"])
+
+    again = await engine.backfill(session_factory, chunk_size=2)
+    assert again.awarded == 0
+    async with session_factory() as session:
+        count = (await session.execute(select(func.count()).select_from(UserAchievement))).scalar_one()
+    assert count == 4
+
+
+@pytest.mark.asyncio
+async def test_repository_counters_trigger_evaluation(session_factory, achievements, monkeypatch):
+    """UserRepository hands counter changes to on_counters_changed."""
+    engine = AchievementEngine()
+    await engine.load(session_factory)
+    monkeypatch.setattr(UserRepository, "on_counters_changed", engine.evaluate)
+
+    async with session_factory() as session:
+        for _ in range(3):
+            await UserRepository(session).increment_referral_count(3)
+
+    assert await _balance_and_awards(session_factory, 3) == (Decimal("100"), ["ambassador"])
+
+
+@pytest.mark.asyncio
+async def test_reward_crossing_up_coins_threshold_is_awarded(session_factory, achievements):
+    """A reward that lifts the balance past an up_coins threshold awards it too."""
+    engine = AchievementEngine()
+    await engine.load(session_factory)
+    async with session_factory() as session:
+        (await session.get(User, 3)).up_coins = Decimal("950")
+
+    async with session_factory() as session:
+        awarded = await engine.evaluate(session, 3, {"referrals": (2, 3)})
+
+    assert [rule.code for rule in awarded] == ["ambassador", "rich"]
+    assert await _balance_and_awards(session_factory, 3) == (Decimal("1050"), ["ambassador", "rich"])
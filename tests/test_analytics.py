@@ -0,0 +1,111 @@
+"""Test analytics pipeline and aggregate queries."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from bot.database.models import AnalyticsEvent
+from bot.database.repositories.analytics_repository import AnalyticsRepository
+from bot.services.analytics import AnalyticsPipeline
+
+
+class RecordingWriter:
+    """Batch writer that records batches instead of writing them."""
+
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    async def __call__(self, batch):
+        if self.fail:
+            raise ConnectionError("database down")
+        self.batches.append(batch)
+
+
+def test_buffer_is_bounded():
+    """Events over max_queue_size are dropped, not buffered."""
+    pipeline = AnalyticsPipeline(max_queue_size=3, writer=RecordingWriter())
+
+    accepted = [pipeline.track("click", user_id=i) for i in range(5)]
+
+    assert accepted == [True, True, True, False, False]
+    assert pipeline.pending == 3
+
+
+@pytest.mark.asyncio
+async def test_full_batch_written_without_waiting_for_interval():
+    """A full batch wakes the writer before flush_interval elapses."""
+    writer = RecordingWriter()
+    pipeline = AnalyticsPipeline(batch_size=2, flush_interval=60, writer=writer)
+    await pipeline.start()
+
+    pipeline.track("click", user_id=1, handler="shop")
+    pipeline.track("click", user_id=2, handler="shop")
+    await asyncio.sleep(0.01)
+
+    assert [len(batch) for batch in writer.batches] == [2]
+    await pipeline.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_remaining_events():
+    """stop() writes the partial batch left in the buffer."""
+    writer = RecordingWriter()
+    pipeline = AnalyticsPipeline(batch_size=100, flush_interval=60, writer=writer)
+    await pipeline.start()
+
+    for i in range(3):
+        pipeline.track("click", user_id=i)
+    await pipeline.stop()
+
+    assert [len(batch) for batch in writer.batches] == [3]
+    assert pipeline.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_not_requeued():
+    """A failing writer drops the batch instead of growing the buffer."""
+    pipeline = AnalyticsPipeline(writer=RecordingWriter(fail=True))
+    pipeline.track("click", user_id=1)
+
+    await pipeline.flush()
+
+    assert pipeline.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_aggregate_queries():
+    """DAU counts distinct users per day; handlers are ranked by events."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(
+                AnalyticsEvent.metadata.create_all, tables=[AnalyticsEvent.__table__]
+            )
+
+        now = datetime.utcnow()
+        yesterday = now - timedelta(days=1)
+        async with AsyncSession(engine) as session:
+            repo = AnalyticsRepository(session)
+            # Explicit ids: SQLite doesn't generate them for the (id, created_at) key
+            await repo.insert_many([
+                {"id": id, "event": "handler_call", "user_id": user_id, "handler": handler,
+                 "created_at": created_at}
+                for id, (user_id, handler, created_at) in enumerate([
+                    (1, "shop", yesterday),
+                    (1, "shop", now),
+                    (2, "shop", now),
+                    (2, "profile", now),
+                ], start=1)
+            ])
+            await session.commit()
+
+            dau = await repo.daily_active_users(days=2)
+            per_handler = await repo.events_per_handler(since=now - timedelta(days=2))
+
+        assert dau == [(yesterday.date(), 1), (now.date(), 2)]
+        assert per_handler == [("shop", 3), ("profile", 1)]
+    finally:
+        await engine.dispose()
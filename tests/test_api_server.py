@@ -0,0 +1,192 @@
+"""Test API server helpers."""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+
+from bot.api_server import (
+    app,
+    attach_telegram_application,
+    cache_control_for,
+    etag_matches,
+    make_weak_etag,
+)
+from bot.config import settings
+from bot.services.website_webhooks import sign_body, website_webhooks
+
+
+def test_weak_etag_changes_with_updated_at():
+    """ETag is stable for the same row version and changes when it is updated."""
+    updated_at = datetime(2024, 5, 1, 12, 0, 0)
+
+    etag = make_weak_etag(123, updated_at)
+
+    assert etag.startswith('W/"')
+    assert etag == make_weak_etag(123, updated_at)
+    assert etag != make_weak_etag(123, datetime(2024, 5, 1, 12, 0, 1))
+    assert etag != make_weak_etag(124, updated_at)
+    assert make_weak_etag(123, None) is None
+
+
+def test_etag_matches_if_none_match_forms():
+    """If-None-Match supports lists, wildcard and weak comparison."""
+    etag = make_weak_etag(1, datetime(2024, 1, 1))
+    strong = etag[2:]
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(strong, etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"other"', etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches(etag, None)
+
+
+def test_cache_control_policies():
+    """Exact routes and prefixes resolve to their policies."""
+    assert cache_control_for("/api/users/me") == "private, no-cache"
+    assert cache_control_for("/api/auth/telegram") == "no-store"
+    assert cache_control_for("/docs") is None
+
+
+def test_cache_control_header_applied():
+    """Middleware adds Cache-Control to responses of configured routes."""
+    client = TestClient(app)
+
+    response = client.get("/api/health")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-store"
+
+
+def test_metrics_endpoint_exposes_prometheus_text():
+    """The /metrics endpoint renders registered metrics as Prometheus text."""
+    client = TestClient(app)
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE bot_handler_duration_seconds histogram" in response.text
+
+
+@pytest.fixture
+def webhook_app(monkeypatch):
+    """Attach a stub PTB application with a small update queue."""
+    monkeypatch.setattr(settings, "webhook_secret_token", "s3cret")
+    monkeypatch.setattr(settings, "webhook_max_queue_size", 1)
+    application = SimpleNamespace(update_queue=asyncio.Queue(), bot=None)
+    attach_telegram_application(application)
+    yield application
+    attach_telegram_application(None)
+
+
+def test_webhook_rejects_wrong_secret(webhook_app):
+    """Updates without the configured secret token are refused."""
+    client = TestClient(app)
+
+    response = client.post(
+        "/telegram/webhook",
+        json={"update_id": 1},
+        headers={"X-Telegram-Bot-Api-Secret-Token": "wrong"},
+    )
+
+    assert response.status_code == 403
+    assert webhook_app.update_queue.qsize() == 0
+
+
+def test_webhook_enqueues_update_then_sheds_load(webhook_app):
+    """Valid updates are queued; a full queue answers 503 so Telegram retries."""
+    client = TestClient(app)
+    headers = {"X-Telegram-Bot-Api-Secret-Token": "s3cret"}
+
+    accepted = client.post("/telegram/webhook", json={"update_id": 1}, headers=headers)
+    shed = client.post("/telegram/webhook", json={"update_id": 2}, headers=headers)
+
+    assert accepted.status_code == 200
+    assert webhook_app.update_queue.get_nowait().update_id == 1
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "1"
+
+
+@pytest.fixture
+def website_queue(monkeypatch):
+    """Website webhook receiver with room for two events and no applier task."""
+    monkeypatch.setattr(settings, "website_webhook_secret", "web-s3cret")
+    monkeypatch.setattr(website_webhooks, "max_queue_size", 2)
+
+    async def start():
+        pass
+
+    monkeypatch.setattr(website_webhooks, "start", start)
+    yield website_webhooks
+    website_webhooks._buffer.clear()
+
+
+def _signed(payload: bytes) -> dict:
+    return {"X-Website-Signature": sign_body(payload), "Content-Type": "application/json"}
+
+
+def test_website_webhook_checks_signature_and_payload(website_queue):
+    """Unsigned or malformed deliveries are refused and nothing is queued."""
+    client = TestClient(app)
+    body = b'{"id": "evt_1", "type": "user.updated", "data": {"telegram_id": 1}}'
+
+    forged = client.post("/api/webhooks/website", content=body, headers={
+        "X-Website-Signature": sign_body(body, "other-secret")
+    })
+    missing = client.post("/api/webhooks/website", content=body)
+    invalid = client.post("/api/webhooks/website", content=b'{"id": "evt_1"}', headers=_signed(b'{"id": "evt_1"}'))
+    bad_id = b'{"id": "evt_2", "type": "user.updated", "data": {"telegram_id": "abc"}}'
+    malformed = client.post("/api/webhooks/website", content=bad_id, headers=_signed(bad_id))
+
+    assert (forged.status_code, missing.status_code) == (403, 403)
+    assert (invalid.status_code, malformed.status_code) == (400, 400)
+    assert website_queue.pending == 0
+
+
+@pytest.mark.parametrize("secret", [None, "", "dev_webhook_secret_change_in_production"])
+def test_website_webhook_disabled_without_real_secret(website_queue, monkeypatch, secret):
+    """Without a secret of its own the endpoint is not there, whatever the signature."""
+    monkeypatch.setattr(settings, "website_webhook_secret", secret)
+    body = b'{"id": "evt_1", "type": "user.updated", "data": {"telegram_id": 1}}'
+    signature = sign_body(body, "dev_webhook_secret_change_in_production")
+
+    response = TestClient(app).post("/api/webhooks/website", content=body, headers={
+        "X-Website-Signature": signature
+    })
+
+    assert response.status_code == 404
+    assert website_queue.pending == 0
+
+
+def test_website_webhook_queues_then_sheds_load(website_queue):
+    """Signed events are queued (202); a delivery that doesn't fit gets 503."""
+    client = TestClient(app)
+    body = (
+        b'[{"id": "evt_1", "type": "user.updated", "data": {"telegram_id": 1}},'
+        b' {"id": "evt_2", "type": "membership.updated", "data": {"telegram_id": 1}}]'
+    )
+    single = b'{"id": "evt_3", "type": "event.updated", "data": {}}'
+
+    accepted = client.post("/api/webhooks/website", content=body, headers=_signed(body))
+    shed = client.post("/api/webhooks/website", content=single, headers=_signed(single))
+
+    assert accepted.status_code == 202
+    assert [event.id for event in website_queue._buffer] == ["evt_1", "evt_2"]
+    assert shed.status_code == 503 and shed.headers["retry-after"] == "5"
+
+
+@pytest.mark.parametrize("claims", [{}, {"sub": "not-a-number"}])
+def test_token_without_numeric_sub_is_unauthorized(claims):
+    """A validly signed token without a usable sub gets 401, not 500."""
+    client = TestClient(app)
+    token = jwt.encode(claims, settings.jwt_secret, algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/api/users/me/transactions", headers=headers).status_code == 401
+    assert client.get("/api/users/me", headers=headers).status_code == 401
@@ -0,0 +1,139 @@
+"""Test signed ticket payloads and offline door check-in."""
+
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+from bot.database.models import Event, Ticket
+from bot.services.checkin_service import CheckInRegistry, CheckInService
+from bot.services.ticket_signing import sign_ticket, verify_ticket
+
+
+@pytest_asyncio.fixture
+async def tickets(seed):
+    """Three tickets of event 1."""
+    await seed(*(
+        Ticket(
+            id=i, user_id=100 + i, event_id=1, ticket_type="standard", price=Decimal("10"),
+            qr_code=f"CODE{i}", status=status, payment_method="coins"
+        )
+        for i, status in [(1, "active"), (2, "active"), (3, "refunded")]
+    ))
+
+
+def test_signature_round_trip_and_tampering():
+    """Valid payloads verify; changing any field or the signature fails."""
+    payload = sign_ticket(42, 7)
+
+    assert verify_ticket(payload) == (42, 7)
+    assert verify_ticket(payload.replace(".42.", ".43.")) is None
+    assert verify_ticket(payload[:-1] + ("A" if payload[-1] != "A" else "B")) is None
+    assert verify_ticket("UPC-TICKET-42-CODE") is None
+
+
+@pytest.mark.asyncio
+async def test_check_in_marks_used_and_rejects_repeats(session_factory, tickets):
+    """First scan passes, second is already_used; other failures are classified."""
+    service = CheckInService(event_id=1, session_factory=session_factory)
+    assert await service.load() == 3
+
+    assert (await service.check_in(sign_ticket(1, 1))).ok
+    assert (await service.check_in(sign_ticket(1, 1))).reason == "already_used"
+    assert (await service.check_in(sign_ticket(2, 2))).reason == "wrong_event"
+    assert (await service.check_in(sign_ticket(3, 1))).reason == "not_active"
+    assert (await service.check_in(sign_ticket(99, 1))).reason == "unknown_ticket"
+    assert (await service.check_in("garbage")).reason == "invalid"
+    # Codes printed before signing still work
+    assert (await service.check_in("UPC-TICKET-2-CODE2")).ok
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_used_marks(session_factory, tickets):
+    """Pending check-ins are written in one batch and survive a reload."""
+    service = CheckInService(event_id=1, session_factory=session_factory)
+    await service.load()
+    await service.check_in(sign_ticket(1, 1))
+
+    assert await service.flush() == 1
+    assert service.pending == 0
+
+    async with session_factory() as session:
+        status, used_at = (await session.execute(
+            select(Ticket.status, Ticket.used_at).where(Ticket.id == 1)
+        )).one()
+    assert status == "used" and used_at is not None
+
+    reloaded = CheckInService(event_id=1, session_factory=session_factory)
+    await reloaded.load()
+    assert (await reloaded.check_in(sign_ticket(1, 1))).reason == "already_used"
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_pending(session_factory, tickets):
+    """Check-ins stay pending while the database is unreachable."""
+    service = CheckInService(event_id=1, session_factory=session_factory)
+    await service.load()
+    await service.check_in(sign_ticket(1, 1))
+
+    @asynccontextmanager
+    async def unreachable():
+        raise ConnectionError("venue Wi-Fi down")
+        yield
+
+    service.session_factory = unreachable
+    assert await service.flush() == 0
+    assert service.pending == 1
+
+
+@pytest.mark.asyncio
+async def test_scan_is_fast(session_factory, tickets):
+    """A scan is an in-memory operation, far below the 10 ms door budget."""
+    service = CheckInService(event_id=1, session_factory=session_factory)
+    await service.load()
+    payload = sign_ticket(1, 1)
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        await service.check_in(payload)
+    per_scan = (time.perf_counter() - start) / 1000
+
+    assert per_scan < 0.001
+
+
+@pytest.mark.asyncio
+async def test_ticket_bought_after_load_is_looked_up(session_factory, tickets):
+    """A signed ticket missing from the index is read once and indexed."""
+    service = CheckInService(event_id=1, session_factory=session_factory)
+    await service.load()
+    async with session_factory() as session:
+        session.add(Ticket(
+            id=4, user_id=104, event_id=1, ticket_type="standard", price=Decimal("10"),
+            qr_code="CODE4", payment_method="coins"
+        ))
+
+    # Unsigned legacy codes are never looked up
+    assert (await service.check_in("UPC-TICKET-4-CODE4")).reason == "unknown_ticket"
+    assert (await service.check_in(sign_ticket(4, 1))).ok
+    assert (await service.check_in(sign_ticket(4, 1))).reason == "already_used"
+
+
+@pytest.mark.asyncio
+async def test_registry_preloads_events_starting_soon(session_factory, tickets):
+    """Events starting within the window are loaded ahead of the first scan."""
+    now = datetime.utcnow()
+    async with session_factory() as session:
+        session.add_all([
+            Event(id=1, title="Tonight", description="", location="Club", event_date=now + timedelta(hours=2)),
+            Event(id=2, title="Next week", description="", location="Club", event_date=now + timedelta(days=7)),
+        ])
+    registry = CheckInRegistry(session_factory)
+
+    assert await registry.preload(hours=24) == 1
+    assert await registry.preload(hours=24) == 0
+    assert registry.loaded(1) is not None and registry.loaded(2) is None
+    await registry.shutdown()
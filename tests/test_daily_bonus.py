@@ -0,0 +1,81 @@
+"""Test the atomic daily bonus claim."""
+
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select, update
+
+from bot.database.models import Transaction, User
+from bot.database.repositories.user_repository import UserRepository
+
+
+@pytest.fixture
+def database_url(tmp_path) -> str:
+    """A file database, so sessions use separate connections."""
+    return f"sqlite+aiosqlite:///{tmp_path / 'bonus.db'}"
+
+
+@pytest_asyncio.fixture
+async def users(seed_users):
+    """User 1."""
+    await seed_users(1)
+
+
+async def _claim(session_factory) -> tuple[bool, Decimal]:
+    async with session_factory() as session:
+        return await UserRepository(session).claim_daily_bonus(1)
+
+
+async def _set_last_claim(session_factory, hours_ago: float, streak: int) -> None:
+    async with session_factory() as session:
+        await session.execute(
+            update(User).where(User.id == 1).values(
+                last_daily_claim=datetime.utcnow() - timedelta(hours=hours_ago),
+                daily_streak=streak,
+            )
+        )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_claims_pay_once(session_factory, users):
+    """Of simultaneous claims from separate sessions exactly one wins."""
+    results = await asyncio.gather(*(_claim(session_factory) for _ in range(8)))
+
+    assert sorted(success for success, _ in results) == [False] * 7 + [True]
+    assert [bonus for success, bonus in results if success] == [Decimal("15")]
+
+    async with session_factory() as session:
+        user = await session.get(User, 1)
+        transactions = (await session.execute(
+            select(func.count()).select_from(Transaction)
+        )).scalar_one()
+    assert transactions == 1
+    assert (user.up_coins, user.total_earned, user.daily_streak) == (15, 15, 1)
+
+
+@pytest.mark.asyncio
+async def test_streak_continues_resets_and_caps(session_factory, users):
+    """Streak grows within 48 hours, restarts after, and the bonus caps at 7 days."""
+    await _set_last_claim(session_factory, hours_ago=30, streak=3)
+    assert await _claim(session_factory) == (True, Decimal("30"))
+
+    await _set_last_claim(session_factory, hours_ago=21, streak=9)
+    assert await _claim(session_factory) == (True, Decimal("45"))
+
+    await _set_last_claim(session_factory, hours_ago=50, streak=9)
+    assert await _claim(session_factory) == (True, Decimal("15"))
+
+    # Too early for the next one
+    assert await _claim(session_factory) == (False, None)
+
+    async with session_factory() as session:
+        rows = (await session.execute(
+            select(Transaction.amount, Transaction.balance_after, Transaction.description,
+                   Transaction.extra_metadata)
+            .order_by(Transaction.id)
+        )).all()
+    assert rows[-1] == (Decimal("15"), Decimal("90"), "Daily bonus (Streak: 1)", {"streak": 1})
+    assert [r.extra_metadata["streak"] for r in rows] == [4, 10, 1]
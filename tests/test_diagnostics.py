@@ -0,0 +1,56 @@
+"""Test query diagnostics."""
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from bot.database import diagnostics
+from bot.database.diagnostics import query_budget, query_scope
+from bot.database.models import User
+
+
+@pytest.fixture
+def engine():
+    """In-memory SQLite engine with diagnostics hooks installed."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    diagnostics.install(engine.sync_engine)
+    return engine
+
+
+async def run_user_lookups(engine, user_ids):
+    """Create the users table and select each user individually (N+1 shape)."""
+    async with engine.begin() as conn:
+        await conn.run_sync(User.metadata.create_all, tables=[User.__table__])
+
+    async with engine.connect() as conn:
+        for user_id in user_ids:
+            await conn.execute(select(User.id).where(User.id == user_id))
+
+
+@pytest.mark.asyncio
+async def test_scope_counts_repeated_statements(engine):
+    """Queries inside a scope are counted per identical statement."""
+    try:
+        with query_scope("referral_stats") as scope:
+            await run_user_lookups(engine, [1, 2, 3, 4])
+
+        lookups = [count for statement, count in scope.statements.items() if "FROM users" in statement]
+        assert lookups == [4]
+        assert scope.count >= 4
+        assert diagnostics.current_scope() is None
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_query_budget_fails_when_exceeded(engine):
+    """query_budget raises AssertionError listing the offending statements."""
+    try:
+        with pytest.raises(AssertionError, match="budget is 2"):
+            with query_budget(2):
+                await run_user_lookups(engine, [1, 2, 3])
+
+        with query_budget(10):
+            await run_user_lookups(engine, [1])
+    finally:
+        await engine.dispose()
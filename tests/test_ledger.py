@@ -0,0 +1,98 @@
+"""Test ledger writes, summary reconciliation and the job scheduler."""
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, update
+
+from bot.database.models import Transaction, User
+from bot.database.repositories.user_repository import UserRepository
+from bot.jobs.ledger import LedgerReconciler
+from bot.jobs.scheduler import JobScheduler
+
+
+@pytest_asyncio.fixture
+async def users(seed_users):
+    """Users 1 and 2."""
+    await seed_users(1, 2)
+
+
+@pytest.mark.asyncio
+async def test_transactions_update_summary(session_factory, users):
+    """Each write moves balance and lifetime totals with the ledger row."""
+    async with session_factory() as session:
+        repo = UserRepository(session)
+        user = await repo.get_by_id(1)
+
+        await repo.add_coins(1, Decimal("100"), "bonus", "Bonus")
+        entry = await repo.deduct_coins(1, Decimal("30"), "purchase", "Shop")
+
+        assert entry.balance_after == Decimal("70")
+        # Already loaded instance reflects the write without a reload
+        assert (user.up_coins, user.total_earned, user.total_spent) == (70, 100, 30)
+
+    async with session_factory() as session:
+        balances = (await session.execute(
+            select(Transaction.amount, Transaction.balance_after).order_by(Transaction.id)
+        )).all()
+    assert balances == [(Decimal("100"), Decimal("100")), (Decimal("-30"), Decimal("70"))]
+
+
+@pytest.mark.asyncio
+async def test_insufficient_balance_writes_nothing(session_factory, users):
+    """A debit over the balance raises and leaves no ledger row."""
+    async with session_factory() as session:
+        repo = UserRepository(session)
+        with pytest.raises(ValueError, match="Insufficient balance"):
+            await repo.deduct_coins(2, Decimal("5"), "purchase", "Shop")
+        with pytest.raises(ValueError, match="not found"):
+            await repo.deduct_coins(99, Decimal("5"), "purchase", "Shop")
+
+        count = (await session.execute(select(Transaction.id))).all()
+    assert count == []
+
+
+@pytest.mark.asyncio
+async def test_reconciler_fixes_drifted_summaries(session_factory, users):
+    """Summaries that disagree with the ledger are corrected from it."""
+    async with session_factory() as session:
+        repo = UserRepository(session)
+        await repo.add_coins(1, Decimal("50"), "bonus", "Bonus")
+        await repo.deduct_coins(1, Decimal("20"), "purchase", "Shop")
+
+    async with session_factory() as session:
+        await session.execute(update(User).where(User.id == 1).values(total_earned=999))
+        await session.execute(update(User).where(User.id == 2).values(total_spent=5))
+
+    result = await LedgerReconciler(session_factory, chunk_size=1).run()
+    assert (result.users, result.drifted, result.fixed) == (2, 2, 2)
+
+    async with session_factory() as session:
+        totals = (await session.execute(
+            select(User.total_earned, User.total_spent).order_by(User.id)
+        )).all()
+    assert totals == [(Decimal("50"), Decimal("20")), (Decimal("0"), Decimal("0"))]
+
+    assert (await LedgerReconciler(session_factory).run()).drifted == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_keeps_running_after_failure():
+    """A failing run is logged and the job runs again on schedule."""
+    calls = 0
+
+    async def flaky():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("boom")
+
+    scheduler = JobScheduler()
+    scheduler.add("flaky", interval=0.01, func=flaky)
+    await scheduler.start()
+    await asyncio.sleep(0.05)
+    await scheduler.stop()
+
+    assert calls >= 2
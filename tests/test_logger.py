@@ -0,0 +1,154 @@
+"""Test structured logging pipeline."""
+
+import io
+import logging
+import queue
+import sys
+
+import orjson
+import pytest
+
+from bot.utils.logger import (
+    BatchingQueueListener,
+    BatchStreamHandler,
+    DeferredQueueHandler,
+    LogSampler,
+    StructuredFormatter,
+    StructuredLogger,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingStream(io.StringIO):
+    """StringIO that counts write calls."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, s):
+        self.writes += 1
+        return super().write(s)
+
+
+@pytest.fixture(autouse=True)
+def no_global_sampler(monkeypatch):
+    """Keep the process-wide sampler out of pipeline tests."""
+    # bot.utils re-exports the `logger` instance, shadowing the module name
+    monkeypatch.setattr(sys.modules["bot.utils.logger"], "_sampler", None)
+
+
+def make_pipeline(name: str, level: int = logging.INFO):
+    """Build an isolated logger wired through queue, listener and stream."""
+    stream = CountingStream()
+    handler = BatchStreamHandler(stream)
+    handler.setFormatter(StructuredFormatter())
+
+    log_queue = queue.SimpleQueue()
+    listener = BatchingQueueListener(log_queue, handler)
+
+    structured = StructuredLogger(name)
+    structured.logger.handlers = [DeferredQueueHandler(log_queue)]
+    structured.logger.propagate = False
+    structured.logger.setLevel(level)
+    return structured, listener, stream
+
+
+def test_disabled_level_skips_record_creation(monkeypatch):
+    """Calls below the logger level return before building a record."""
+    structured, _, _ = make_pipeline("test.disabled", level=logging.INFO)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("record built for disabled level")
+
+    monkeypatch.setattr(structured.logger, "makeRecord", fail)
+
+    structured.debug("noisy_event", payload="x" * 1000)
+
+
+def test_queued_records_written_as_one_batch():
+    """Records queued before the listener runs are flushed in one write."""
+    structured, listener, stream = make_pipeline("test.batch")
+
+    for i in range(50):
+        structured.info("batched_event", index=i)
+
+    listener.start()
+    listener.stop()
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 50
+    assert stream.writes == 1
+    assert orjson.loads(lines[-1])["index"] == 49
+
+
+def test_exc_info_captured_on_calling_thread():
+    """exc_info=True attaches the active exception, formatted by the writer."""
+    structured, listener, stream = make_pipeline("test.exc")
+
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        structured.error("failed_event", user_id=1, exc_info=True)
+
+    listener.start()
+    listener.stop()
+
+    data = orjson.loads(stream.getvalue())
+    assert data["message"] == "failed_event"
+    assert data["user_id"] == 1
+    assert "exc_info" not in data
+    assert "ValueError: boom" in data["exception"]
+
+
+def test_sampler_rule_head_and_every():
+    """A rule logs the head, then every N-th occurrence in the window."""
+    sampler = LogSampler({"update_processed": (3, 5)}, clock=FakeClock())
+
+    allowed = [sampler.check("update_processed", logging.INFO)[0] for _ in range(20)]
+
+    # 1-3 head, then occurrences 8, 13, 18
+    assert [i + 1 for i, ok in enumerate(allowed) if ok] == [1, 2, 3, 8, 13, 18]
+
+
+def test_sampler_burst_summary_on_next_window():
+    """Bursts beyond the limit are dropped and summarized once per window."""
+    clock = FakeClock()
+    sampler = LogSampler({}, window=1.0, burst_limit=2, clock=clock)
+
+    results = [sampler.check("db_error", logging.ERROR)[0] for _ in range(5)]
+    assert results == [True, True, False, False, False]
+
+    clock.now = 1.5
+    allowed, summaries = sampler.check("db_error", logging.ERROR)
+    assert allowed
+    assert summaries == [("db_error", 3)]
+    assert sampler.drain() == []
+
+
+def test_sampler_budget_only_limits_below_warning():
+    """The hot-path budget drops DEBUG/INFO lines but never warnings."""
+    clock = FakeClock()
+    sampler = LogSampler({}, window=60.0, budget=2, clock=clock)
+
+    info = [sampler.check(f"event_{i}", logging.INFO)[0] for i in range(4)]
+    assert info == [True, True, False, False]
+    assert sampler.check("warn_event", logging.WARNING)[0]
+
+    # Bucket refills at `budget` tokens per second
+    clock.now = 0.5
+    assert sampler.check("event_late", logging.INFO)[0]
+
+
+def test_parse_rules():
+    """Rules parse from "event=head:every" with optional every."""
+    assert LogSampler.parse_rules("a=5:10, b=3,") == {"a": (5, 10), "b": (3, 0)}
@@ -0,0 +1,38 @@
+"""Test in-process metrics."""
+
+from bot.utils.metrics import MetricsRegistry
+
+
+def test_histogram_buckets_are_cumulative():
+    """Observations land in the first bucket that fits and render cumulatively."""
+    registry = MetricsRegistry()
+    latency = registry.histogram("handler_seconds", "Handler time", ["handler"], buckets=(0.1, 1.0))
+
+    child = latency.labels("start_command")
+    for value in (0.05, 0.1, 0.5, 3.0):
+        child.observe(value)
+
+    text = registry.render()
+    assert 'handler_seconds_bucket{handler="start_command",le="0.1"} 2' in text
+    assert 'handler_seconds_bucket{handler="start_command",le="1"} 3' in text
+    assert 'handler_seconds_bucket{handler="start_command",le="+Inf"} 4' in text
+    assert 'handler_seconds_count{handler="start_command"} 4' in text
+    assert 'handler_seconds_sum{handler="start_command"} 3.65' in text
+
+
+def test_counter_and_function_gauge():
+    """Counters accumulate per label set and gauges can be computed at scrape time."""
+    registry = MetricsRegistry()
+    requests = registry.counter("cache_requests_total", "Lookups", ["result"])
+    depth = registry.gauge("queue_depth", "Queue depth")
+
+    requests.labels("hit").inc()
+    requests.labels(result="hit").inc()
+    requests.labels("miss").inc()
+    depth.set_function(lambda: 7)
+
+    text = registry.render()
+    assert "# TYPE cache_requests_total counter" in text
+    assert 'cache_requests_total{result="hit"} 2' in text
+    assert 'cache_requests_total{result="miss"} 1' in text
+    assert "queue_depth 7" in text
@@ -0,0 +1,67 @@
+"""Test monthly partition planning and archival."""
+
+import gzip
+from datetime import date
+
+import orjson
+import pytest
+from sqlalchemy import text
+
+from bot.database.partitions import add_months, partition_month, plan_partitions
+from bot.jobs import partitions as partitions_job
+from bot.jobs.partitions import PartitionMaintenanceJob
+
+
+def test_month_arithmetic_and_names():
+    """Months roll over years in both directions; only monthly names parse."""
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+    assert partition_month("transactions", "transactions_2024_05") == date(2024, 5, 1)
+    assert partition_month("transactions", "transactions_default") is None
+    assert partition_month("transactions", "analytics_events_2024_05") is None
+
+
+def test_plan_creates_ahead_and_archives_past_retention():
+    """Missing upcoming months are created; months beyond retention are archived."""
+    existing = [
+        "transactions_default",
+        "transactions_2023_12",
+        "transactions_2024_01",
+        "transactions_2024_02",
+        "transactions_2024_03",
+    ]
+
+    plan = plan_partitions("transactions", existing, date(2024, 3, 15), months_ahead=2, retention_months=2)
+
+    assert plan.create == [date(2024, 4, 1), date(2024, 5, 1)]
+    assert plan.archive == ["transactions_2023_12"]
+    assert plan_partitions("transactions", existing, date(2024, 3, 15), 0, 0).archive == []
+
+
+@pytest.mark.asyncio
+async def test_archive_exports_rows_then_drops(session_factory, tmp_path, monkeypatch):
+    """The partition's rows end up in a gzip JSON-lines file before the drop."""
+    async with session_factory() as session:
+        await session.execute(text(
+            "CREATE TABLE transactions_2020_01 (id INTEGER, amount NUMERIC, created_at TIMESTAMP)"
+        ))
+        await session.execute(text(
+            "INSERT INTO transactions_2020_01 VALUES "
+            "(1, 10.5, '2020-01-01 10:00:00'), (2, -3, '2020-01-02 10:00:00')"
+        ))
+
+    dropped = []
+
+    async def fake_drop(session, table, name):
+        dropped.append(name)
+
+    monkeypatch.setattr(partitions_job, "drop_partition", fake_drop)
+    job = PartitionMaintenanceJob(session_factory, archive_dir=str(tmp_path), chunk_size=1)
+
+    assert await job._archive("transactions", "transactions_2020_01") == 2
+
+    path = tmp_path / "transactions" / "transactions_2020_01.jsonl.gz"
+    rows = [orjson.loads(line) for line in gzip.decompress(path.read_bytes()).splitlines()]
+    assert [row["id"] for row in rows] == [1, 2]
+    assert dropped == ["transactions_2020_01"]
+    assert list(tmp_path.rglob("*.tmp")) == []
@@ -0,0 +1,109 @@
+"""Test user_data persistence."""
+
+from decimal import Decimal
+
+import pytest
+
+from bot.utils.persistence import RedisUserDataPersistence, compact_user_data
+from bot.utils.serialization import loads
+
+
+class FakePipeline:
+    """Records pipelined commands into FakeRedis on execute."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, ex=None):
+        self.commands.append(("set", key, value))
+
+    def delete(self, key):
+        self.commands.append(("delete", key, None))
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        for command, key, value in self.commands:
+            if command == "set":
+                self.redis.data[key] = value
+            else:
+                self.redis.data.pop(key, None)
+
+
+class FakeRedis:
+    """Minimal async Redis stand-in."""
+
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def persistence():
+    persistence = RedisUserDataPersistence("redis://unused")
+    persistence._redis = FakeRedis()
+    return persistence
+
+
+def test_compact_user_data_keeps_whitelisted_primitives():
+    """ORM objects, unknown keys and non-JSON values are dropped."""
+    data = {
+        "nav_message_id": 10,
+        "nav_chat_id": 20,
+        "ticket_selection": {"type": "vip", "price": "2700.0"},
+        "db_user": object(),
+        "up_coins": 5.0,
+    }
+
+    assert compact_user_data(data) == {
+        "nav_message_id": 10,
+        "nav_chat_id": 20,
+        "ticket_selection": {"type": "vip", "price": "2700.0"},
+    }
+    assert compact_user_data({"ticket_selection": {"price": Decimal("1")}}) == {}
+
+
+@pytest.mark.asyncio
+async def test_staged_writes_flush_in_one_round_trip(persistence):
+    """Changed users are written together; unchanged state is skipped."""
+    redis = persistence._redis
+
+    await persistence.update_user_data(1, {"nav_message_id": 11})
+    await persistence.update_user_data(2, {"nav_message_id": 22, "db_user": object()})
+    await persistence.flush()
+
+    assert redis.round_trips == 1
+    assert loads(redis.data[persistence._key(2)]) == {"nav_message_id": 22}
+
+    persistence._redis = redis
+    await persistence.update_user_data(1, {"nav_message_id": 11})
+    await persistence.flush()
+    assert redis.round_trips == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_loads_each_user_once(persistence):
+    """Stored state is merged lazily without overwriting in-memory values."""
+    persistence._redis.data[persistence._key(5)] = b'{"nav_message_id":1,"nav_chat_id":2}'
+    user_data = {"nav_message_id": 99}
+
+    await persistence.refresh_user_data(5, user_data)
+    persistence._redis.data[persistence._key(5)] = b'{"nav_chat_id":3}'
+    await persistence.refresh_user_data(5, user_data)
+
+    assert user_data == {"nav_message_id": 99, "nav_chat_id": 2}
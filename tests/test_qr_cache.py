@@ -0,0 +1,103 @@
+"""Test QR code cache."""
+
+from datetime import datetime
+
+import pytest
+
+from bot.database.models import User
+from bot.database.repositories.user_repository import UserRepository
+from bot.services.qr_cache import QRCodeCache, cache_key, file_id_for, make_file_ref
+from bot.services.qr_generator import REFERRAL_STYLE, QRCodeGenerator, qr_cache, qr_renderer, render_qr_png
+
+
+class CountingRender:
+    """Render callable counting its calls."""
+
+    def __init__(self, data: bytes = b"png"):
+        self.calls = 0
+        self.data = data
+
+    async def __call__(self) -> bytes:
+        self.calls += 1
+        return self.data
+
+
+@pytest.mark.asyncio
+async def test_memory_tier_serves_repeats():
+    """Second lookup of a key does not render again."""
+    cache = QRCodeCache(directory=None)
+    render = CountingRender()
+
+    assert await cache.get_or_render("k", render) == b"png"
+    assert await cache.get_or_render("k", render) == b"png"
+    assert render.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_new_instance(tmp_path):
+    """A fresh cache (e.g. after restart) reads the content-addressed file."""
+    key = cache_key("https://example.com/join?ref=ABC", REFERRAL_STYLE.cache_id)
+    await QRCodeCache(str(tmp_path)).get_or_render(key, CountingRender())
+
+    render = CountingRender(b"other")
+    data = await QRCodeCache(str(tmp_path)).get_or_render(key, render)
+
+    assert data == b"png"
+    assert render.calls == 0
+    assert (tmp_path / key[:2] / f"{key}.png").exists()
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_least_recently_used():
+    """Memory tier keeps at most max_items entries."""
+    cache = QRCodeCache(directory=None, max_items=2)
+    render = CountingRender()
+
+    for key in ("a", "b", "a", "c"):
+        await cache.get_or_render(key, render)
+    await cache.get_or_render("a", render)
+    await cache.get_or_render("b", render)
+
+    # a, b, c rendered once each; b was evicted by c and rendered again
+    assert render.calls == 4
+
+
+def test_file_ref_bound_to_cache_key():
+    """A stored file_id is reused only for the image it was uploaded from."""
+    key = cache_key("payload", "style")
+    stored = make_file_ref(key, "AgACAgIAAx0")
+
+    assert file_id_for(stored, key) == "AgACAgIAAx0"
+    assert file_id_for(stored, cache_key("payload", "other-style")) is None
+    assert file_id_for("https://legacy.example/qr.png", key) is None
+    assert file_id_for(None, key) is None
+
+
+@pytest.mark.asyncio
+async def test_generator_key_matches_rendered_key(monkeypatch):
+    """referral_qr_key predicts the key of the cached render."""
+    monkeypatch.setattr(qr_cache, "store", None)
+    monkeypatch.setattr(qr_renderer, "workers", 0)
+    generator = QRCodeGenerator()
+
+    png, key = await generator.referral_qr("UPABC123")
+
+    assert key == generator.referral_qr_key("UPABC123")
+    assert png == render_qr_png(generator.referral_url("UPABC123"), REFERRAL_STYLE)
+    assert png.startswith(b"\x89PNG")
+
+
+@pytest.mark.asyncio
+async def test_storing_file_ref_keeps_updated_at(session_factory):
+    """The QR file reference isn't profile data: updated_at (the ETag) is unchanged."""
+    updated_at = datetime(2024, 1, 1)
+    async with session_factory() as session:
+        session.add(User(id=1, first_name="A", referral_code="REF1", updated_at=updated_at))
+
+    async with session_factory() as session:
+        await UserRepository(session).set_qr_code_url(1, make_file_ref("key", "file-id"))
+
+    async with session_factory() as session:
+        user = await session.get(User, 1)
+    assert user.qr_code_url == make_file_ref("key", "file-id")
+    assert user.updated_at == updated_at
@@ -0,0 +1,61 @@
+"""Test QR render service."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from bot.services import qr_render
+from bot.services.qr_render import QRRenderService, QRStyle, render_qr_png
+
+
+STYLE = QRStyle()
+
+
+@pytest.mark.asyncio
+async def test_process_pool_render_matches_inline():
+    """Pool workers produce the same PNG as rendering in-process."""
+    service = QRRenderService(workers=1)
+    try:
+        png = await service.render("https://example.com/u/UP-1", STYLE)
+    finally:
+        service.shutdown()
+
+    assert png == render_qr_png("https://example.com/u/UP-1", STYLE)
+
+
+@pytest.mark.asyncio
+async def test_render_many_keeps_order():
+    """Batch results come back in input order across chunks."""
+    service = QRRenderService(workers=0)
+    items = [(f"ticket-{i}", STYLE) for i in range(5)]
+
+    pngs = await service.render_many(items)
+
+    assert pngs == [render_qr_png(data, style) for data, style in items]
+
+
+@pytest.mark.asyncio
+async def test_pending_renders_are_bounded(monkeypatch):
+    """No more than max_pending renders are submitted at once."""
+    service = QRRenderService(workers=0, max_pending=2)
+    lock = threading.Lock()
+    running = peak = 0
+
+    def slow_render(data, style):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return b"png"
+
+    monkeypatch.setattr(qr_render, "render_qr_png", slow_render)
+
+    await asyncio.gather(*(service.render(str(i), STYLE) for i in range(6)))
+
+    assert peak == 2
+    assert service.pending == 0
@@ -0,0 +1,98 @@
+"""Test vectorized economy reports."""
+
+import gzip
+from datetime import datetime
+
+import orjson
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from bot.services.reports import (
+    TRANSACTION_COLUMNS, USER_COLUMNS, build_report, format_report, load_export, render_report_png
+)
+
+
+NOW = datetime(2024, 3, 20, 12, 0)  # Wednesday
+
+
+def _users(rows: list[tuple]) -> dict:
+    # id, level, is_member, coins, referred_by, streak, created_at, updated_at
+    columns = list(zip(*rows))
+    return {
+        name: np.array(values, dtype=dtype if dtype != "str" else str)
+        for (name, dtype), values in zip(USER_COLUMNS.items(), columns)
+    }
+
+
+def _transactions(rows: list[tuple]) -> dict:
+    # id, user_id, type, amount, created_at
+    columns = list(zip(*rows))
+    return {
+        name: np.array(values, dtype=dtype if dtype != "str" else str)
+        for (name, dtype), values in zip(TRANSACTION_COLUMNS.items(), columns)
+    }
+
+
+@pytest.fixture
+def data():
+    users = _users([
+        (1, "guest", False, 100.0, 0, 0, "2024-03-04T10:00", "2024-03-04T10:00"),
+        (2, "member", True, 50.0, 1, 5, "2024-03-05T10:00", "2024-03-05T10:00"),
+        (3, "guest", False, 25.0, 1, 1, "2024-03-12T10:00", "2024-03-12T10:00"),
+        # Older copy of user 3 from a previous export
+        (3, "guest", False, 0.0, 1, 0, "2024-03-12T10:00", "2024-03-11T10:00"),
+    ])
+    transactions = _transactions([
+        (1, 1, "welcome", 100.0, "2024-03-04T10:00"),
+        (2, 2, "referral_welcome", 25.0, "2024-03-05T10:00"),
+        (3, 2, "daily_bonus", 40.0, "2024-03-12T09:00"),
+        (4, 2, "ticket_purchase", -15.0, "2024-03-13T09:00"),
+        (5, 3, "referral_welcome", 25.0, "2024-03-12T10:00"),
+        (5, 3, "referral_welcome", 25.0, "2024-03-12T10:00"),  # repeated by a full export
+    ])
+    return users, transactions
+
+
+def test_report_aggregates(data):
+    """Cohorts, funnel, velocity, streaks and level spend from small arrays."""
+    report = build_report(*data, now=NOW, weeks=3)
+
+    assert (report.users, report.transactions) == (3, 5)
+    # Weeks of 04.03, 11.03 and 18.03
+    assert report.cohort_sizes == [2, 1, 0]
+    # Week 0: both users of 04.03 active; week 1: only user 2
+    assert report.retention[0, 0] == 1.0 and report.retention[0, 1] == 0.5
+    assert report.retention[1, 0] == 1.0
+    assert np.isnan(report.retention[1, 2]) and np.isnan(report.retention[2, 0])
+
+    assert report.funnel == [
+        ("Пришли по приглашению", 2),
+        ("Активировались", 1),
+        ("Потратили UP Coins", 1),
+        ("Стали членами клуба", 1),
+    ]
+    assert report.spent_30d == 15.0 and report.coin_supply == 175.0
+    assert dict(report.streaks)["4-7"] == 1 and dict(report.streaks)["0"] == 1
+    assert report.level_spend[0] == ("member", 1, 15.0)
+
+    assert "Реферальная воронка" in format_report(report)
+    assert render_report_png(report).startswith(b"\x89PNG")
+
+
+def test_load_export_reads_jsonl_files(tmp_path):
+    """Gzip JSON-lines exports load into typed arrays across files."""
+    directory = tmp_path / "transactions"
+    directory.mkdir()
+    for i in (1, 2):
+        with gzip.open(directory / f"transactions-2024010{i}T000000.jsonl.gz", "wb") as f:
+            f.write(orjson.dumps({
+                "id": i, "user_id": 7, "type": "bonus", "amount": "1.50",
+                "created_at": "2024-01-01T00:00:00",
+            }) + b"\n")
+
+    columns = load_export(str(tmp_path), "transactions", TRANSACTION_COLUMNS)
+
+    assert columns["id"].tolist() == [1, 2]
+    assert columns["amount"].dtype == np.float64 and columns["amount"].sum() == 3.0
+    assert columns["created_at"].dtype == np.dtype("datetime64[us]")
@@ -0,0 +1,13 @@
+"""Test the shared JSON serialization helpers."""
+
+from decimal import Decimal
+
+from bot.utils.serialization import dumps, dumps_str, loads
+
+
+def test_non_str_keys_and_fallback_types():
+    """Int-keyed dicts serialize like json.dumps; Decimals become floats."""
+    counters = {1: 3, 42: Decimal("1.5")}
+
+    assert loads(dumps(counters)) == {"1": 3, "42": 1.5}
+    assert dumps_str({"users": {7: "ok"}}) == '{"users":{"7":"ok"}}'
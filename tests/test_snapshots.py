@@ -0,0 +1,54 @@
+"""Test user snapshots."""
+
+import dataclasses
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from bot.database.models import User
+from bot.database.repositories.user_repository import UserRepository
+from bot.database.snapshots import UserSnapshot
+
+
+@pytest.mark.asyncio
+async def test_get_snapshot_is_detached_and_immutable():
+    """Snapshots come from a column query and are not tracked by the session."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(User.metadata.create_all, tables=[User.__table__])
+
+        async with AsyncSession(engine) as session:
+            session.add(User(
+                id=1, username="neo", first_name="Neo", referral_code="UP-NEO",
+                is_member=True, membership_level="member", up_coins=Decimal("150"),
+            ))
+            await session.commit()
+
+            snapshot = await UserRepository(session).get_snapshot(1)
+
+            assert snapshot.is_member
+            assert snapshot.up_coins == Decimal("150")
+            assert snapshot.referral_code == "UP-NEO"
+            assert isinstance(snapshot, UserSnapshot)
+            assert await UserRepository(session).get_snapshot(2) is None
+    finally:
+        await engine.dispose()
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snapshot.up_coins = Decimal("0")
+    assert not hasattr(snapshot, "__dict__")
+
+
+def test_snapshot_from_loaded_user():
+    """from_user copies exactly the snapshot fields from an ORM instance."""
+    user = User(
+        id=5, username=None, first_name="A", is_member=False, membership_level="guest",
+        up_coins=Decimal("0"), referral_code="UP-A", is_banned=False, ban_reason=None,
+    )
+
+    assert UserSnapshot.from_user(user) == UserSnapshot(
+        id=5, username=None, first_name="A", is_member=False, membership_level="guest",
+        up_coins=Decimal("0"), referral_code="UP-A", is_banned=False, ban_reason=None,
+    )
@@ -0,0 +1,85 @@
+"""Test streak expiry, reminders and the paced sender."""
+
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from telegram.error import Forbidden, RetryAfter
+
+from bot.database.models import User
+from bot.jobs.streaks import StreakMaintenanceJob
+from bot.utils.sender import RateLimitedSender
+
+
+# hours since last claim, streak, banned
+USERS = {
+    1: (50, 5, False),   # lapsed
+    2: (49, 2, False),   # lapsed
+    3: (72, 0, False),   # no streak to reset
+    4: (44.5, 3, False),  # lapses within 4 hours
+    5: (44.5, 8, True),  # lapses soon, but banned
+    6: (30, 4, False),   # safe
+}
+
+
+@pytest_asyncio.fixture
+async def users(seed_users):
+    """USERS, claimed `hours` ago."""
+    now = datetime.utcnow()
+    await seed_users(*(
+        {
+            "id": user_id, "last_daily_claim": now - timedelta(hours=hours),
+            "daily_streak": streak, "is_banned": banned,
+        }
+        for user_id, (hours, streak, banned) in USERS.items()
+    ))
+
+
+class _Sender:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, chat_id, text, **kwargs):
+        self.sent.append((chat_id, text))
+        return True
+
+
+@pytest.mark.asyncio
+async def test_lapsed_streaks_reset_and_reminders_sent_once(session_factory, users):
+    """Lapsed streaks reset in chunks; a lapsing streak is reminded once."""
+    sender = _Sender()
+    job = StreakMaintenanceJob(session_factory, sender=sender, chunk_size=1)
+
+    result = await job.run()
+
+    assert (result.reset, result.reminded, result.reminder_failed) == (2, 1, 0)
+    assert sender.sent[0][0] == 4 and "3 дн." in sender.sent[0][1]
+
+    async with session_factory() as session:
+        streaks = dict((await session.execute(select(User.id, User.daily_streak))).all())
+    assert streaks == {1: 0, 2: 0, 3: 0, 4: 3, 5: 8, 6: 4}
+
+    again = await job.run()
+    assert (again.reset, again.reminded) == (0, 0)
+
+
+class _Bot:
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.sent = 0
+
+    async def send_message(self, chat_id, text, **kwargs):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent += 1
+
+
+@pytest.mark.asyncio
+async def test_sender_waits_out_flood_control():
+    """RetryAfter pauses and retries; a blocked user is reported undelivered."""
+    bot = _Bot(RetryAfter(0))
+    sender = RateLimitedSender(bot, rate=1000)
+    assert await sender.send(1, "hi") is True and bot.sent == 1
+
+    assert await RateLimitedSender(_Bot(Forbidden("blocked")), rate=1000).send(1, "hi") is False
@@ -0,0 +1,100 @@
+"""Test batch ticket QR generation."""
+
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from bot.config import settings
+from bot.database.models import Ticket
+from bot.jobs.ticket_qr import TicketQRBatchJob, ticket_qr_url
+from bot.services.qr_cache import ContentAddressedStore
+from bot.services.qr_render import QRRenderService
+
+
+PUBLIC_URL = "https://bot.example.com"
+
+
+async def add_tickets(session_factory, statuses):
+    """Create one ticket per status for event 1."""
+    async with session_factory() as session:
+        session.add_all([
+            Ticket(
+                user_id=100 + i, event_id=1, ticket_type="standard", price=Decimal("10"),
+                qr_code=f"CODE{i}", status=status, payment_method="coins"
+            )
+            for i, status in enumerate(statuses)
+        ])
+
+
+async def image_urls(session_factory):
+    async with session_factory() as session:
+        result = await session.execute(select(Ticket.status, Ticket.qr_image_url).order_by(Ticket.id))
+        return result.all()
+
+
+@pytest.mark.asyncio
+async def test_batch_renders_active_tickets_once(session_factory, tmp_path):
+    """Active tickets get stored images; a second run has nothing to do."""
+    await add_tickets(session_factory, ["active"] * 5 + ["refunded"])
+    store = ContentAddressedStore(str(tmp_path))
+    job = TicketQRBatchJob(
+        session_factory, QRRenderService(workers=0), store, chunk_size=2, public_url=PUBLIC_URL
+    )
+
+    result = await job.run(event_id=1)
+
+    assert (result.tickets, result.rendered, result.chunks) == (5, 5, 3)
+    rows = await image_urls(session_factory)
+    for status, url in rows:
+        if status == "active":
+            assert url.startswith(f"{PUBLIC_URL}/api/qr/tickets/")
+            key = url.rsplit("/", 1)[1].removesuffix(".png")
+            assert store.read(key).startswith(b"\x89PNG")
+        else:
+            assert url is None
+
+    again = await job.run(event_id=1)
+    assert again.tickets == 0
+
+
+@pytest.mark.asyncio
+async def test_interrupted_run_resumes_and_reuses_stored_images(session_factory, tmp_path):
+    """Tickets whose URL was not committed are picked up; stored images are not re-rendered."""
+    await add_tickets(session_factory, ["active"] * 3)
+    store = ContentAddressedStore(str(tmp_path))
+    job = TicketQRBatchJob(
+        session_factory, QRRenderService(workers=0), store, public_url=PUBLIC_URL
+    )
+    await job.run(event_id=1)
+
+    # Simulate a crash after the images were written but before the UPDATE
+    async with session_factory() as session:
+        ticket = await session.get(Ticket, 2)
+        ticket.qr_image_url = None
+
+    result = await job.run(event_id=1)
+
+    assert (result.tickets, result.rendered, result.reused) == (1, 0, 1)
+    assert all(url for _, url in await image_urls(session_factory))
+
+
+def test_ticket_qr_url_is_absolute():
+    """Stored URLs are absolute under the public API base URL."""
+    assert ticket_qr_url("abc", "https://bot.example.com/") == (
+        "https://bot.example.com/api/qr/tickets/abc.png"
+    )
+
+
+@pytest.mark.asyncio
+async def test_job_is_skipped_without_public_url(session_factory, tmp_path, monkeypatch):
+    """Without API_PUBLIC_URL nothing is rendered or stored."""
+    monkeypatch.setattr(settings, "api_public_url", None)
+    await add_tickets(session_factory, ["active"])
+    store = ContentAddressedStore(str(tmp_path))
+    job = TicketQRBatchJob(session_factory, QRRenderService(workers=0), store)
+
+    result = await job.run(event_id=1)
+
+    assert result.skipped and result.tickets == 0
+    assert await image_urls(session_factory) == [("active", None)]
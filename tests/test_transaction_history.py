@@ -0,0 +1,64 @@
+"""Test keyset pagination of transaction history."""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+
+from bot.database.models import Transaction
+from bot.database.repositories.transaction_repository import TransactionRepository
+from bot.keyboards.inline import kb
+from bot.utils.pagination import decode_cursor, encode_cursor
+
+
+@pytest_asyncio.fixture
+async def transactions(seed, seed_users):
+    """25 transactions of user 1, two sharing a timestamp."""
+    start = datetime(2024, 1, 1)
+    await seed_users(1)
+    await seed(*(
+        Transaction(
+            id=i, user_id=1, type="bonus", amount=Decimal(i), balance_after=Decimal(i),
+            description=f"t{i}", created_at=start + timedelta(minutes=min(i, 20))
+        )
+        for i in range(1, 26)
+    ))
+
+
+def test_cursor_round_trip():
+    """Cursors decode to their position and fit in callback_data."""
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    cursor = encode_cursor(created_at, 2**40)
+
+    assert decode_cursor(cursor) == (created_at, 2**40)
+    assert decode_cursor("not a cursor") is None
+    assert decode_cursor("") is None
+
+    markup = kb.transactions_nav(cursor, cursor)
+    assert all(len(b.callback_data.encode()) <= 64 for row in markup.inline_keyboard for b in row)
+
+
+@pytest.mark.asyncio
+async def test_pages_walk_forward_and_back(session_factory, transactions):
+    """Every row appears exactly once going forward; prev returns the same pages."""
+    async with session_factory() as session:
+        repo = TransactionRepository(session)
+
+        pages = [await repo.get_user_transactions_page(1, limit=10)]
+        while pages[-1].next_cursor:
+            pages.append(await repo.get_user_transactions_page(1, 10, pages[-1].next_cursor))
+
+        ids = [t.id for page in pages for t in page.items]
+        # Newest first; ties on created_at (20..25) ordered by id
+        assert ids == list(range(25, 0, -1))
+        assert pages[0].prev_cursor is None and pages[-1].next_cursor is None
+
+        back = await repo.get_user_transactions_page(1, 10, pages[2].prev_cursor, backward=True)
+        assert [t.id for t in back.items] == [t.id for t in pages[1].items]
+        first = await repo.get_user_transactions_page(1, 10, pages[1].prev_cursor, backward=True)
+        assert [t.id for t in first.items] == [t.id for t in pages[0].items]
+        assert first.prev_cursor is None
+
+        with pytest.raises(ValueError):
+            await repo.get_user_transactions_page(1, 10, "garbage!")
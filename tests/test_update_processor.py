@@ -0,0 +1,71 @@
+"""Test keyed update processor."""
+
+import asyncio
+
+import pytest
+from telegram import CallbackQuery, Update, User as TGUser
+
+from bot.utils.update_processor import KeyedUpdateProcessor
+
+
+def make_update(update_id: int, user_id: int) -> Update:
+    """Create a callback query update from user_id."""
+    user = TGUser(id=user_id, is_bot=False, first_name="Test")
+    query = CallbackQuery(id=str(update_id), from_user=user, chat_instance="test", data="pay")
+    return Update(update_id=update_id, callback_query=query)
+
+
+async def handle(log: list, update_id: int, delay: float = 0.01):
+    """Simulated handler recording start and end order."""
+    log.append(("start", update_id))
+    await asyncio.sleep(delay)
+    log.append(("end", update_id))
+
+
+@pytest.mark.asyncio
+async def test_same_user_updates_run_in_order():
+    """Two updates of one user never overlap and run in arrival order."""
+    processor = KeyedUpdateProcessor(max_concurrent_updates=8)
+    log = []
+
+    await asyncio.gather(
+        processor.process_update(make_update(1, 42), handle(log, 1)),
+        processor.process_update(make_update(2, 42), handle(log, 2)),
+    )
+
+    assert log == [("start", 1), ("end", 1), ("start", 2), ("end", 2)]
+    assert processor.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_different_users_run_in_parallel_under_cap():
+    """Different users overlap, but never more than the global cap."""
+    processor = KeyedUpdateProcessor(max_concurrent_updates=2)
+    peak = 0
+
+    async def tracked():
+        nonlocal peak
+        peak = max(peak, processor.in_flight)
+        await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(
+        processor.process_update(make_update(i, 100 + i), tracked())
+        for i in range(5)
+    ))
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_updates_over_limit_are_shed():
+    """Per-user pending limit drops the excess updates without running them."""
+    processor = KeyedUpdateProcessor(max_concurrent_updates=4, max_pending_per_user=2)
+    log = []
+
+    await asyncio.gather(*(
+        processor.process_update(make_update(i, 7), handle(log, i))
+        for i in range(4)
+    ))
+
+    started = [update_id for event, update_id in log if event == "start"]
+    assert started == [0, 1]
@@ -0,0 +1,130 @@
+"""Test mirroring website events and tickets into local tables."""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+from bot.database.models import Event, Ticket
+from bot.database.repositories.event_repository import EventRepository
+from bot.jobs.website_inbound import WebsiteInboundSync, parse_website_event
+from bot.services.website_sync import WebsiteSyncService
+
+
+@pytest_asyncio.fixture
+async def local_ticket(seed, seed_users):
+    """User 1 and a ticket bought in the bot for event 10."""
+    await seed_users(1)
+    await seed(Event(
+        id=5, title="Old", description="", location="Club",
+        event_date=datetime.utcnow() + timedelta(days=3), website_event_id=10,
+    ))
+    await seed(Ticket(
+        user_id=1, event_id=5, ticket_type="standard", price=Decimal("500"),
+        qr_code="local-qr", payment_method="up_coins",
+    ))
+
+
+def _iso(days: float) -> str:
+    return (datetime(2026, 1, 1) + timedelta(days=days)).isoformat() + "Z"
+
+
+class _Feed:
+    """Website change feed ordered by (updated_at, id)."""
+
+    def __init__(self):
+        self.items = {"events": [], "tickets": []}
+        self.requests = []
+
+    async def get_changes(self, service, kind, updated_since=None, after_id=None, limit=200):
+        self.requests.append((kind, updated_since, after_id))
+        items = sorted(self.items[kind], key=lambda i: (i["updated_at"], i["id"]))
+        if updated_since is not None:
+            position = (updated_since.isoformat() + "Z", after_id)
+            items = [i for i in items if (i["updated_at"], i["id"]) > position]
+        return items[:limit]
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    feed = _Feed()
+    monkeypatch.setattr(
+        WebsiteSyncService, "get_changes",
+        lambda service, *args, **kwargs: feed.get_changes(service, *args, **kwargs)
+    )
+    return feed
+
+
+def _event(website_id: int, days: float, title: str, status: str = "upcoming") -> dict:
+    event_date = (datetime.utcnow() + timedelta(days=website_id)).isoformat()
+    return {
+        "id": website_id, "title": title, "location": "Warehouse", "event_date": event_date,
+        "status": status, "updated_at": _iso(days),
+    }
+
+
+@pytest.mark.asyncio
+async def test_sync_mirrors_events_and_tickets(session_factory, local_ticket, feed):
+    """Events and tickets are upserted page by page; handlers read them locally."""
+    feed.items["events"] = [
+        _event(10, 1, "Rave"), _event(11, 2, "Afterparty"), _event(12, 3, "Gone", "cancelled"),
+    ]
+    feed.items["tickets"] = [
+        # The bot-bought ticket, now known to the website
+        {"id": 100, "telegram_id": 1, "event_id": 10, "type": "vip", "price": "3000",
+         "status": "active", "updated_at": _iso(1)},
+        {"id": 101, "telegram_id": 1, "event_id": 11, "type": "standard", "price": "500",
+         "status": "active", "qr_code": "web-qr", "updated_at": _iso(2)},
+        # Unknown user: skipped
+        {"id": 102, "telegram_id": 999, "event_id": 11, "type": "standard", "price": "500",
+         "updated_at": _iso(3)},
+        # Malformed: skipped, the rest of the page still applies
+        {"id": 103, "telegram_id": "abc", "event_id": 11, "updated_at": _iso(3)},
+    ]
+    sync = WebsiteInboundSync(session_factory, page_size=2)
+
+    result = await sync.run()
+
+    assert [(k.kind, k.fetched, k.applied, k.pages) for k in result.kinds] == [
+        ("events", 3, 3, 2), ("tickets", 4, 2, 2),
+    ]
+    async with session_factory() as session:
+        repo = EventRepository(session)
+        upcoming = await repo.get_upcoming_events()
+        tickets = await repo.get_user_tickets(1)
+    assert [e.title for e in upcoming] == ["Rave", "Afterparty"]
+    assert upcoming[0].id == 5  # updated in place
+    linked = {t.event.title: t for t in tickets}
+    assert (linked["Rave"].website_ticket_id, linked["Rave"].ticket_type) == (100, "vip")
+    assert linked["Rave"].qr_code == "local-qr"
+    assert linked["Afterparty"].qr_code == "web-qr"
+
+    # Next run continues after the last change polled; a webhook writing a
+    # newer website_updated_at doesn't move it
+    async with session_factory() as session:
+        await EventRepository(session).upsert_website_events([parse_website_event(
+            _event(13, 30, "Pushed by webhook")
+        )])
+    feed.requests.clear()
+    feed.items["events"].append(_event(11, 4, "Afterparty (moved)"))
+    feed.items["events"].append(_event(10, 0.5, "Stale title"))
+    second = await sync.run()
+    assert second.kinds[0].applied == 1
+    assert feed.requests[0][1] == datetime(2026, 1, 4)
+
+    async with session_factory() as session:
+        titles = {e.website_event_id: e.title for e in (await session.execute(select(Event))).scalars()}
+    assert titles == {10: "Rave", 11: "Afterparty (moved)", 12: "Gone", 13: "Pushed by webhook"}
+
+    # A full resync replays everything but can't roll changes back, nor the cursor
+    await sync.run(full=True)
+    async with session_factory() as session:
+        # As a full run's first page would
+        await EventRepository(session).set_sync_cursor("events", datetime(2026, 1, 2), 10)
+    async with session_factory() as session:
+        event = (await session.execute(select(Event).where(Event.website_event_id == 11))).scalar_one()
+        cursor = await EventRepository(session).get_sync_cursor("events")
+    assert event.title == "Afterparty (moved)"
+    assert cursor == (datetime(2026, 1, 5), 11)
@@ -0,0 +1,138 @@
+"""Test applying website webhook events in batches."""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+
+from bot.database.models import Event, Ticket, User, WebsiteWebhookEvent
+from bot.middlewares.cache import user_cache
+from bot.services.website_webhooks import (
+    ApplyResult,
+    WebhookEvent,
+    WebsiteWebhookReceiver,
+    sign_body,
+    verify_signature,
+)
+
+
+@pytest_asyncio.fixture
+async def users(seed_users):
+    """Users 1 and 2."""
+    await seed_users(
+        {"id": 1, "username": "old", "first_name": "A", "photo_url": "tg.jpg"},
+        {"id": 2, "is_member": True, "membership_level": "member"},
+    )
+
+
+def _event(delivery_id: str, event_type: str, **data) -> WebhookEvent:
+    return WebhookEvent.from_payload({"id": delivery_id, "type": event_type, "data": data})
+
+
+def test_verify_signature():
+    """Prefixed or bare HMAC-SHA256 of the raw body; anything else fails."""
+    body = b'{"id": "evt_1"}'
+    signature = sign_body(body, "secret")
+
+    assert verify_signature(body, signature, "secret")
+    assert verify_signature(body, signature[len("sha256="):], "secret")
+    assert not verify_signature(body + b" ", signature, "secret")
+    assert not verify_signature(body, sign_body(body, "other"), "secret")
+    assert not verify_signature(body, None, "secret")
+    with pytest.raises(ValueError):
+        WebhookEvent.from_payload({"id": "evt_1", "type": "user.updated"})
+    with pytest.raises(ValueError):
+        WebhookEvent.from_payload({"id": "evt_1", "type": "user.updated", "data": {"telegram_id": "abc"}})
+
+
+@pytest.mark.asyncio
+async def test_batch_applies_each_kind_once(session_factory, users):
+    """One batch upserts users, memberships, events and tickets; redeliveries are skipped."""
+    changed_events = []
+
+    async def on_tickets_changed(event_ids):
+        changed_events.append(event_ids)
+
+    receiver = WebsiteWebhookReceiver(session_factory, batch_size=100, on_tickets_changed=on_tickets_changed)
+    await user_cache.set(1, {"username": "old"})
+    event_date = (datetime.utcnow() + timedelta(days=7)).isoformat()
+    updated_at = "2026-01-01T12:00:00+03:00"
+
+    batch = [
+        _event("evt_1", "user.updated", telegram_id=1, id=55, username="new", first_name=None),
+        _event("evt_2", "user.updated", telegram_id=999, id=56, username="stranger"),
+        _event("evt_3", "membership.updated", telegram_id=2, is_member=False, level="guest"),
+        _event("evt_4", "event.created", id=10, title="Rave", event_date=event_date, updated_at=updated_at),
+        _event("evt_5", "ticket.created", id=100, telegram_id=1, event_id=10, ticket_type="vip",
+               price="3000", updated_at=updated_at),
+        _event("evt_6", "newsletter.sent", id=1),
+        # Not validated by from_payload: ignored, the rest of the batch still applies
+        WebhookEvent(id="evt_7", type="ticket.updated", data={"id": "x", "telegram_id": 1,
+                                                                "event_id": 10, "updated_at": updated_at}),
+        _event("evt_1", "user.updated", telegram_id=1, username="replayed"),
+    ]
+    receiver.push(batch)
+    await receiver.flush()
+
+    async with session_factory() as session:
+        user = await session.get(User, 1)
+        member = await session.get(User, 2)
+        event = (await session.execute(select(Event))).scalar_one()
+        ticket = (await session.execute(select(Ticket))).scalar_one()
+        stranger = await session.get(User, 999)
+
+    assert (user.username, user.first_name, user.website_user_id, user.photo_url) == ("new", "A", 55, "tg.jpg")
+    assert user.is_synced and stranger is None
+    assert (member.is_member, member.membership_level) == (False, "guest")
+    assert (event.title, event.website_event_id, event.website_updated_at) == (
+        "Rave", 10, datetime(2026, 1, 1, 9, 0)
+    )
+    assert (ticket.user_id, ticket.event_id, ticket.ticket_type, ticket.price) == (1, event.id, "vip", Decimal("3000"))
+    assert await user_cache.get(1) is None
+    assert changed_events == [{event.id}]
+
+    # Redelivery of applied ids changes nothing
+    result = await receiver.apply([
+        _event("evt_1", "user.updated", telegram_id=1, username="replayed"),
+        _event("evt_3", "membership.updated", telegram_id=2, is_member=True),
+    ])
+    assert (result.applied, result.duplicates) == (0, 2)
+    async with session_factory() as session:
+        assert (await session.get(User, 1)).username == "new"
+        recorded = (await session.execute(
+            select(func.count()).select_from(WebsiteWebhookEvent)
+        )).scalar_one()
+    assert recorded == 7
+
+    assert await receiver.prune(days=0) == 7
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_then_applied_one_by_one(session_factory):
+    """A failing batch is re-queued in order; the last attempt drops only failing events."""
+    receiver = WebsiteWebhookReceiver(session_factory, max_attempts=2)
+    calls, applied = [], []
+
+    async def apply(batch):
+        calls.append([event.id for event in batch])
+        if any(event.id == "evt_bad" for event in batch):
+            raise RuntimeError("constraint violated")
+        applied.extend(event.id for event in batch)
+        return ApplyResult(applied=len(batch))
+
+    receiver.apply = apply
+    receiver.push([
+        _event("evt_1", "user.updated", telegram_id=1),
+        _event("evt_bad", "user.updated", telegram_id=2),
+        _event("evt_3", "user.updated", telegram_id=3),
+    ])
+
+    await receiver.flush()
+    assert receiver.pending == 3 and applied == []
+    await receiver.flush()
+    assert receiver.pending == 0
+    assert calls[:2] == [["evt_1", "evt_bad", "evt_3"]] * 2
+    assert calls[2:] == [["evt_1"], ["evt_bad"], ["evt_3"]]
+    assert applied == ["evt_1", "evt_3"]